@@ -1,13 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request
 from typing import List
-from ..database.dependency import get_db
+from ..database.dependency import get_db, DBSession
 
-from .. import crud
-from ..database.models import DBUser
+from .. import async_crud as crud
+from ..models.reorder import ReorderRequest, ReorderResult
+from ..models.user import UserPublic
 from ..dependencies import get_current_user
 from ..models.categories import Category, CategoryCreate
 from ..models.repair_types import RepairType, RepairTypeCreate
+from ..utils.serialization import cached_json, json_response
+from ..utils.snapshot import catalog_snapshot, categories_key, repair_types_key, snapshot_response
 
 router = APIRouter()
 
@@ -15,30 +17,41 @@ router = APIRouter()
 # --- 一级分类 (Category) ---
 
 @router.get("/", response_model=List[Category])
-async def get_categories(db: Session = Depends(get_db)):
-    return crud.get_categories(db)
+async def get_categories(request: Request, db: DBSession = Depends(get_db)):
+    entry = catalog_snapshot.get(categories_key())
+    if entry is not None:
+        return snapshot_response(request, entry)
+    encoded = await cached_json("categories", List[Category], lambda: crud.get_categories(db))
+    return json_response(encoded)
 
 
 @router.post("/", response_model=Category)
-async def add_category(cat_in: CategoryCreate, db: Session = Depends(get_db),
-                       current_user: DBUser = Depends(get_current_user)):
-    return crud.create_category(db, cat_in)
+async def add_category(cat_in: CategoryCreate, db: DBSession = Depends(get_db),
+                       current_user: UserPublic = Depends(get_current_user)):
+    return await crud.create_category(db, cat_in)
+
+
+@router.patch("/reorder", response_model=ReorderResult)
+async def reorder_categories(reorder_in: ReorderRequest, db: DBSession = Depends(get_db),
+                             current_user: UserPublic = Depends(get_current_user)):
+    """拖拽排序：按 ids 顺序一次性更新 sort_order（第一个排在最前）"""
+    return {"updated": await crud.reorder_categories(db, reorder_in.ids)}
 
 
 @router.put("/{cat_id}", response_model=Category)
-async def update_category(cat_id: int, cat_in: CategoryCreate, db: Session = Depends(get_db),
-                          current_user: DBUser = Depends(get_current_user)):
-    db_cat = crud.update_category(db, cat_id, cat_in)
+async def update_category(cat_id: int, cat_in: CategoryCreate, db: DBSession = Depends(get_db),
+                          current_user: UserPublic = Depends(get_current_user)):
+    db_cat = await crud.update_category(db, cat_id, cat_in)
     if not db_cat:
         raise HTTPException(status_code=404, detail="Category not found")
     return db_cat
 
 
 @router.delete("/{cat_id}")
-async def delete_category(cat_id: int, db: Session = Depends(get_db),
-                          current_user: DBUser = Depends(get_current_user)):
+async def delete_category(cat_id: int, db: DBSession = Depends(get_db),
+                          current_user: UserPublic = Depends(get_current_user)):
     """【补全】删除一级分类"""
-    success = crud.delete_category(db, cat_id)
+    success = await crud.delete_category(db, cat_id)
     if not success:
         raise HTTPException(status_code=404, detail="Category not found")
     return {"message": "Category deleted successfully"}
@@ -47,30 +60,41 @@ async def delete_category(cat_id: int, db: Session = Depends(get_db),
 # --- 二级维修项目 (RepairType) ---
 
 @router.get("/repair-types", response_model=List[RepairType])
-async def get_repair_types(db: Session = Depends(get_db)):
-    return crud.get_repair_types(db)
+async def get_repair_types(request: Request, db: DBSession = Depends(get_db)):
+    entry = catalog_snapshot.get(repair_types_key())
+    if entry is not None:
+        return snapshot_response(request, entry)
+    encoded = await cached_json("repair_types", List[RepairType], lambda: crud.get_repair_types(db))
+    return json_response(encoded)
 
 
 @router.post("/repair-types", response_model=RepairType)
-async def add_repair_type(rt_in: RepairTypeCreate, db: Session = Depends(get_db),
-                          current_user: DBUser = Depends(get_current_user)):
-    return crud.create_repair_type(db, rt_in)
+async def add_repair_type(rt_in: RepairTypeCreate, db: DBSession = Depends(get_db),
+                          current_user: UserPublic = Depends(get_current_user)):
+    return await crud.create_repair_type(db, rt_in)
+
+
+@router.patch("/repair-types/reorder", response_model=ReorderResult)
+async def reorder_repair_types(reorder_in: ReorderRequest, db: DBSession = Depends(get_db),
+                               current_user: UserPublic = Depends(get_current_user)):
+    """拖拽排序：按 ids 顺序一次性更新 sort_order（第一个排在最前）"""
+    return {"updated": await crud.reorder_repair_types(db, reorder_in.ids)}
 
 
 @router.put("/repair-types/{rt_id}", response_model=RepairType)
-async def update_repair_type(rt_id: int, rt_in: RepairTypeCreate, db: Session = Depends(get_db),
-                             current_user: DBUser = Depends(get_current_user)):
-    db_rt = crud.update_repair_type(db, rt_id, rt_in)
+async def update_repair_type(rt_id: int, rt_in: RepairTypeCreate, db: DBSession = Depends(get_db),
+                             current_user: UserPublic = Depends(get_current_user)):
+    db_rt = await crud.update_repair_type(db, rt_id, rt_in)
     if not db_rt:
         raise HTTPException(status_code=404, detail="Repair type not found")
     return db_rt
 
 
 @router.delete("/repair-types/{rt_id}")
-async def delete_repair_type(rt_id: int, db: Session = Depends(get_db),
-                             current_user: DBUser = Depends(get_current_user)):
+async def delete_repair_type(rt_id: int, db: DBSession = Depends(get_db),
+                             current_user: UserPublic = Depends(get_current_user)):
     """【补全】删除二级维修项目"""
-    success = crud.delete_repair_type(db, rt_id)
+    success = await crud.delete_repair_type(db, rt_id)
     if not success:
         raise HTTPException(status_code=404, detail="Repair type not found")
     return {"message": "Repair type deleted successfully"}
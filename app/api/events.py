@@ -0,0 +1,28 @@
+from typing import Optional
+
+from fastapi import APIRouter, Header, Query
+from fastapi.responses import StreamingResponse
+
+from ..utils.events import change_events
+
+router = APIRouter()
+
+
+@router.get("")
+async def stream_events(
+        last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+        resume_from: Optional[str] = Query(None, alias="last_event_id",
+                                           description="无法设置请求头的客户端用来续传"),
+):
+    """
+    目录变更通知（Server-Sent Events）。每次写操作提交后推送
+    `event: change`，data 为 {"entity": 表名, "id": 记录 id 或 null, "version": 新版本号}；
+    客户端据此重新拉取对应接口或调用 /sync。断线重连时浏览器会自动带上 Last-Event-ID，
+    收到 `event: reset` 表示无法补发中间的事件，应全量刷新。
+    事件只在当前进程内广播，多 worker 部署时每个连接只能收到其所在 worker 上的写操作。
+    """
+    return StreamingResponse(
+        change_events.stream(last_event_id or resume_from),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,44 +1,85 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-from ..database.dependency import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from typing import List, Optional, Union
+from ..database.dependency import get_db, DBSession
 
-from .. import crud
-from ..database.models import DBUser, DBFaq
+from .. import async_crud as crud
+from ..models.reorder import ReorderRequest, ReorderResult
+from ..models.user import UserPublic
 from ..dependencies import get_current_user
-from ..models.faq import FAQResponse, FAQCreate  # 确保导入了对应的模型
+from ..models.faq import FAQResponse, FAQCreate, FAQPage  # 确保导入了对应的模型
+from ..utils.serialization import cached_json, conditional_json_response
+from ..utils.pagination import encode_cursor, decode_cursor
 
 router = APIRouter()
 
 
-@router.get("/", response_model=List[FAQResponse])
-async def read_faqs(db: Session = Depends(get_db)):
+@router.get("/", response_model=Union[FAQPage, List[FAQResponse]])
+async def read_faqs(
+        request: Request,
+        limit: int = Query(20, ge=1, le=100),
+        cursor: Optional[str] = None,
+        paginate: bool = Query(False, description="true 时返回 keyset 分页的对象；默认返回旧版不分页的完整列表（兼容旧客户端）"),
+        db: DBSession = Depends(get_db)
+):
     """
-    获取所有 FAQ 列表（按权重排序）
+    获取 FAQ 列表（按权重排序）
+    paginate=true 时按 keyset 分页，翻页时把上一页返回的 next_cursor 作为 cursor 传入
+    支持 If-None-Match：ETag 为响应内容的摘要，进程内缓存命中且内容未变化时直接返回 304，不查询数据库
     """
-    return crud.get_all_faqs(db)
+    if not paginate:
+        encoded = await cached_json("faqs", List[FAQResponse], lambda: crud.get_all_faqs(db),
+                                    timestamps=lambda faqs: (f.updated_at or f.created_at for f in faqs))
+        return conditional_json_response(request, encoded)
+
+    after = None
+    if cursor:
+        try:
+            sort_order, faq_id = decode_cursor(cursor, 2)
+            after = (int(sort_order), int(faq_id))
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    async def load_page():
+        rows, next_key = await crud.get_faq_page(db, limit, after)
+        return {"items": rows, "next_cursor": encode_cursor(*next_key) if next_key else None}
+
+    encoded = await cached_json("faqs", FAQPage, load_page, key=(cursor, limit),
+                                timestamps=lambda page: (f.updated_at or f.created_at for f in page.items))
+    return conditional_json_response(request, encoded)
 
 
 @router.post("/", response_model=FAQResponse)
 async def create_new_faq(
         faq_in: FAQCreate,  # FastAPI 会自动将 Request Body 映射到这里
-        db: Session = Depends(get_db),
-        current_user: DBUser = Depends(get_current_user)
+        db: DBSession = Depends(get_db),
+        current_user: UserPublic = Depends(get_current_user)
 ):
-    return crud.create_faq(db, faq_in)
+    return await crud.create_faq(db, faq_in)
+
+
+@router.patch("/reorder", response_model=ReorderResult)
+async def reorder_faqs(
+        reorder_in: ReorderRequest,
+        db: DBSession = Depends(get_db),
+        current_user: UserPublic = Depends(get_current_user)
+):
+    """
+    拖拽排序：按 ids 顺序一次性更新 sort_order（第一个排在最前）
+    """
+    return {"updated": await crud.reorder_faqs(db, reorder_in.ids)}
 
 
 @router.put("/{faq_id}", response_model=FAQResponse)
 async def update_faq(
         faq_id: int,
         faq_in: FAQCreate,
-        db: Session = Depends(get_db),
-        current_user: DBUser = Depends(get_current_user)
+        db: DBSession = Depends(get_db),
+        current_user: UserPublic = Depends(get_current_user)
 ):
     """
     更新指定 ID 的 FAQ（用于编辑内容或调整排序权重）
     """
-    db_faq = crud.update_faq(db, faq_id, faq_in)
+    db_faq = await crud.update_faq(db, faq_id, faq_in)
     if not db_faq:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -50,20 +91,16 @@ async def update_faq(
 @router.delete("/{faq_id}")
 async def delete_faq(
         faq_id: int,
-        db: Session = Depends(get_db),
-        current_user: DBUser = Depends(get_current_user)
+        db: DBSession = Depends(get_db),
+        current_user: UserPublic = Depends(get_current_user)
 ):
     """
     删除指定 ID 的 FAQ
     """
-    # 1. 直接获取数据库对象进行检查
-    db_faq = db.get(DBFaq, faq_id)
-    if not db_faq:
+    # crud.delete_faq 在记录不存在时返回 False
+    if not await crud.delete_faq(db, faq_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="FAQ not found"
         )
-
-    # 2. 执行删除
-    crud.delete_faq(db, faq_id)
     return {"message": "FAQ deleted successfully"}
\ No newline at end of file
@@ -1,39 +1,70 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-from ..database.dependency import get_db
+import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from typing import List, Optional, Union
+from ..database.dependency import get_db, DBSession
 
-from .. import crud
-from ..database.models import DBUser
+from .. import async_crud as crud
+from ..models.user import UserPublic
 from ..dependencies import get_current_user
-from ..models.news import News, NewsCreate
+from ..models.news import News, NewsCreate, NewsPage
+from ..utils.serialization import cached_json, conditional_json_response
+from ..utils.pagination import encode_cursor, decode_cursor
 
 
 
 router = APIRouter()
-@router.get("/", response_model=List[News])
-async def read_all_news(db: Session = Depends(get_db)):
-    """获取所有通知列表"""
-    return crud.get_all_news(db)
+@router.get("/", response_model=Union[NewsPage, List[News]])
+async def read_all_news(
+        request: Request,
+        limit: int = Query(20, ge=1, le=100),
+        cursor: Optional[str] = None,
+        paginate: bool = Query(False, description="true 时返回 keyset 分页的对象；默认返回旧版不分页的完整列表（兼容旧客户端）"),
+        db: DBSession = Depends(get_db)
+):
+    """
+    获取通知列表（按发布日期倒序，支持 If-None-Match 条件请求）
+    paginate=true 时按 keyset 分页，翻页时把上一页返回的 next_cursor 作为 cursor 传入
+    """
+    if not paginate:
+        encoded = await cached_json("news", List[News], lambda: crud.get_all_news(db),
+                                    timestamps=lambda news: (n.updated_at or n.created_at for n in news))
+        return conditional_json_response(request, encoded)
+
+    after = None
+    if cursor:
+        try:
+            publish_date, news_id = decode_cursor(cursor, 2)
+            after = (datetime.date.fromisoformat(publish_date), int(news_id))
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    async def load_page():
+        rows, next_key = await crud.get_news_page(db, limit, after)
+        return {"items": rows, "next_cursor": encode_cursor(*next_key) if next_key else None}
+
+    encoded = await cached_json("news", NewsPage, load_page, key=(cursor, limit),
+                                timestamps=lambda page: (n.updated_at or n.created_at for n in page.items))
+    return conditional_json_response(request, encoded)
 
 
 @router.post("/", response_model=News)
-async def create_new_notice(news_in: NewsCreate, db: Session = Depends(get_db), current_user: DBUser = Depends(get_current_user)):
+async def create_new_notice(news_in: NewsCreate, db: DBSession = Depends(get_db), current_user: UserPublic = Depends(get_current_user)):
     """新建通知"""
-    return crud.create_news(db, news_in)
+    return await crud.create_news(db, news_in)
 
 
 @router.put("/{news_id}", response_model=News)
-async def update_notice(news_id: int, news_in: NewsCreate, db: Session = Depends(get_db), current_user: DBUser = Depends(get_current_user)):
+async def update_notice(news_id: int, news_in: NewsCreate, db: DBSession = Depends(get_db), current_user: UserPublic = Depends(get_current_user)):
     """更新通知"""
-    db_news = crud.update_news(db, news_id, news_in)
+    db_news = await crud.update_news(db, news_id, news_in)
     if not db_news:
         raise HTTPException(status_code=404, detail="通知が見つかりません")
     return db_news
 
 
 @router.delete("/{news_id}")
-async def delete_notice(news_id: int, db: Session = Depends(get_db), current_user: DBUser = Depends(get_current_user)):
+async def delete_notice(news_id: int, db: DBSession = Depends(get_db), current_user: UserPublic = Depends(get_current_user)):
     """删除通知"""
-    crud.delete_news(db, news_id)
+    if not await crud.delete_news(db, news_id):
+        raise HTTPException(status_code=404, detail="通知が見つかりません")
     return {"message": "Successfully deleted"}
@@ -1,13 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException
-from rest_framework import status
-from sqlalchemy.orm import Session
+import datetime
+import time
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import SQLAlchemyError
+from starlette.concurrency import iterate_in_threadpool
 from typing import List, Optional
-from ..database.dependency import get_db
+from ..database.dependency import get_db, session_scope, DBSession
 
-from .. import crud
-from ..database.models import DBUser
+from .. import async_crud as crud
+from ..crud import PriceConflict
+from ..models.reorder import ReorderRequest, ReorderResult
+from ..models.user import UserPublic
 from ..dependencies import get_current_user
-from ..models.repair_prices import RepairPrice, RepairPriceCreate
+from ..models.repair_prices import (
+    RepairPrice, RepairPriceCreate, PriceListResponse, PriceImportError, PriceImportReport, PriceSearchResult,
+)
+from ..utils.cache import price_pair_namespace, PRICES_ALL
+from ..utils.serialization import cached_json, conditional_json_response
+from ..utils.price_export import MEDIA_TYPES, encode_export
+from ..utils.price_import import SUPPORTED_FORMATS, detect_format, iter_price_rows, iter_batches
+from ..utils.search import price_index
+from ..utils.snapshot import catalog_snapshot, matrix_key, prices_key, snapshot_response
+
+# 导入报告中最多返回的错误条数
+MAX_REPORTED_ERRORS = 1000
 
 router = APIRouter()
 
@@ -16,31 +32,190 @@ router = APIRouter()
 async def read_prices(
         category_id: int,
         repair_type_id: int,
-        db: Session = Depends(get_db)
+        request: Request,
+        db: DBSession = Depends(get_db)
+):
+    """根据分类和维修项目筛选价格列表（缓存按 分类 × 维修种类 组合失效，ETag 为内容摘要）"""
+    entry = catalog_snapshot.get(prices_key(category_id, repair_type_id))
+    if entry is not None:
+        return snapshot_response(request, entry)
+
+    namespaces = (PRICES_ALL, price_pair_namespace(category_id, repair_type_id))
+    encoded = await cached_json(namespaces, List[RepairPrice],
+                                lambda: crud.get_prices_by_filter(db, category_id, repair_type_id),
+                                timestamps=lambda prices: (p.updated_at for p in prices))
+    return conditional_json_response(request, encoded)
+
+
+@router.get("/matrix", response_model=PriceListResponse)
+async def read_price_matrix(
+        request: Request,
+        category_id: Optional[int] = None,
+        db: DBSession = Depends(get_db)
+):
+    """
+    一次返回全部分类、维修种类和可见价格，前端据此在本地组装价格表。
+    可通过 category_id 只取某一个分类。
+    """
+    entry = catalog_snapshot.get(matrix_key(category_id))
+    if entry is not None:
+        return snapshot_response(request, entry)
+
+    namespaces = ("categories", "repair_types", "repair_prices")
+    encoded = await cached_json(namespaces, PriceListResponse, lambda: crud.get_price_matrix(db, category_id),
+                                key=category_id, timestamps=lambda matrix: (p.updated_at for p in matrix.prices))
+    return conditional_json_response(request, encoded)
+
+
+@router.get("/search", response_model=List[PriceSearchResult])
+async def search_prices(
+        q: str = Query(..., min_length=1, max_length=100, description="机型名，如 iphone15pro、ギャラクシー S23"),
+        category_id: Optional[int] = None,
+        repair_type_id: Optional[int] = None,
+        limit: int = Query(20, ge=1, le=100),
+        db: DBSession = Depends(get_db)
 ):
-    """根据分类和维修项目筛选价格列表"""
-    return crud.get_prices_by_filter(db, category_id, repair_type_id)
+    """
+    按机型名模糊检索可见价格，结果按相关度排序。
+    忽略大小写、全角 / 半角、空格和平假名 / 片假名的差异，并容忍少量错字；
+    检索走进程内 2-gram 索引，不执行 LIKE 扫描。
+    """
+    await price_index.ensure_loaded(lambda: crud.get_all_prices(db))
+    hits = price_index.search(q, limit, category_id=category_id, repair_type_id=repair_type_id)
+    return [PriceSearchResult(**price.model_dump(), score=score) for price, score in hits]
+
+
+@router.get("/export")
+async def export_prices(
+        format: str = Query("csv", pattern="^(csv|ndjson)$"),
+        updated_since: Optional[datetime.datetime] = Query(None, description="只导出该时间之后更新过的价格"),
+        gzip: bool = Query(False, description="以 Content-Encoding: gzip 压缩传输"),
+        batch_size: int = Query(1000, ge=100, le=10000),
+        current_user: UserPublic = Depends(get_current_user)
+):
+    """
+    流式导出全部价格（含分类名、维修种类名）。
+    通过服务端游标分批读取、边读边写，内存占用与价格表大小无关。
+    """
+    async def body():
+        # 响应体在路由函数返回之后才开始发送，因此使用独立的会话而不是 get_db
+        async with session_scope() as db:
+            partitions = crud.stream_price_export(db, updated_since, batch_size)
+            async for chunk in encode_export(partitions, format, gzip=gzip):
+                yield chunk
+
+    headers = {"Content-Disposition": f'attachment; filename="prices.{format}"'}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(body(), media_type=MEDIA_TYPES[format], headers=headers)
+
+
+@router.post("/import", response_model=PriceImportReport)
+async def import_prices(
+        file: UploadFile = File(..., description="CSV（首行为表头）或 JSONL，字段同 RepairPriceCreate"),
+        format: Optional[str] = Query(None, description="csv / jsonl，默认根据文件名或 Content-Type 判断"),
+        batch_size: int = Query(500, ge=1, le=5000),
+        db: DBSession = Depends(get_db),
+        current_user: UserPublic = Depends(get_current_user)
+):
+    """
+    批量导入价格：逐行读取并校验上传文件，按 (category_id, repair_type_id, model_name) 分批 upsert。
+    单行校验失败不影响其他行，结果中返回每个出错行的行号和原因。
+    """
+    fmt = format or detect_format(file.filename, file.content_type)
+    if fmt not in SUPPORTED_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format, expected one of {SUPPORTED_FORMATS}")
+
+    # 外键预先校验，避免一行无效数据导致整批写入失败
+    category_ids = {c.id for c in await crud.get_categories(db)}
+    repair_type_ids = {rt.id for rt in await crud.get_repair_types(db)}
+
+    started = time.perf_counter()
+    total = imported = failed = 0
+    errors: List[PriceImportError] = []
+
+    def record_error(row: int, error: str):
+        nonlocal failed
+        failed += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append(PriceImportError(row=row, error=error))
+
+    # 读取和校验在线程池中进行，不阻塞事件循环
+    batches = iter_batches(iter_price_rows(file.file, fmt), batch_size)
+    async for batch in iterate_in_threadpool(batches):
+        valid = []
+        for row, price_in, error in batch:
+            total += 1
+            if error is None and price_in.category_id not in category_ids:
+                error = f"category_id: category {price_in.category_id} does not exist"
+            elif error is None and price_in.repair_type_id not in repair_type_ids:
+                error = f"repair_type_id: repair type {price_in.repair_type_id} does not exist"
+            if error is not None:
+                record_error(row, error)
+            else:
+                valid.append((row, price_in))
+
+        if not valid:
+            continue
+        try:
+            await crud.bulk_upsert_repair_prices(db, [price_in for _, price_in in valid])
+            imported += len(valid)
+        except SQLAlchemyError as exc:
+            for row, _ in valid:
+                record_error(row, f"database error: {exc.__class__.__name__}")
+
+    elapsed = time.perf_counter() - started
+    return PriceImportReport(
+        total_rows=total,
+        imported=imported,
+        failed=failed,
+        errors=errors,
+        elapsed_seconds=round(elapsed, 4),
+        rows_per_second=round(total / elapsed, 1) if elapsed > 0 else 0.0
+    )
 
 
 @router.post("/", response_model=RepairPrice)
 async def create_or_update_price(
         price_in: RepairPriceCreate,
         price_id: Optional[int] = None,
-        db: Session = Depends(get_db)
+        db: DBSession = Depends(get_db)
 ):
     """保存价格（支持新增和修改）"""
-    return crud.upsert_repair_price(db, price_in, price_id)
+    try:
+        db_price = await crud.upsert_repair_price(db, price_in, price_id)
+    except PriceConflict as exc:
+        raise _conflict(exc)
+    if not db_price:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Price record not found"
+        )
+    return db_price
+
+
+@router.patch("/reorder", response_model=ReorderResult)
+async def reorder_prices(
+        reorder_in: ReorderRequest,
+        db: DBSession = Depends(get_db),
+        current_user: UserPublic = Depends(get_current_user)
+):
+    """拖拽排序：按 ids 顺序一次性更新 sort_order（第一个排在最前）"""
+    return {"updated": await crud.reorder_repair_prices(db, reorder_in.ids)}
 
 
 @router.put("/{price_id}", response_model=RepairPrice)
 async def update_price(
         price_id: int,
         price_in: RepairPriceCreate,
-        db: Session = Depends(get_db),
-        current_user: DBUser = Depends(get_current_user)
+        db: DBSession = Depends(get_db),
+        current_user: UserPublic = Depends(get_current_user)
 ):
     """【补全】更新指定 ID 的价格记录"""
-    db_price = crud.update_repair_price(db, price_id, price_in)
+    try:
+        db_price = await crud.update_repair_price(db, price_id, price_in)
+    except PriceConflict as exc:
+        raise _conflict(exc)
     if not db_price:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -50,8 +225,17 @@ async def update_price(
 
 
 @router.delete("/{price_id}")
-async def delete_price(price_id: int, db: Session = Depends(get_db)):
-    crud.delete_repair_price(db, price_id)
+async def delete_price(price_id: int, db: DBSession = Depends(get_db)):
+    if not await crud.delete_repair_price(db, price_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Price record not found"
+        )
     return {"message": "Price deleted"}
 
 
+def _conflict(exc: PriceConflict) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=f"A price for this category, repair type and model_name already exists (id={exc.existing_id})"
+    )
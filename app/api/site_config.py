@@ -1,18 +1,19 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from ..database.dependency import get_db
-from .. import crud
+from ..database.dependency import get_db, DBSession
+from .. import async_crud as crud
 from ..models.config import SiteConfigResponse, SiteConfigBase
+from ..utils.serialization import cached_json, json_response
 
 router = APIRouter()
 
 
 @router.get("/", response_model=SiteConfigResponse)
-def read_config(db: Session = Depends(get_db)):
-    return crud.get_site_config(db)
+async def read_config(db: DBSession = Depends(get_db)):
+    encoded = await cached_json("site_configs", SiteConfigResponse, lambda: crud.get_site_config(db))
+    return json_response(encoded)
 
 
 @router.put("/", response_model=SiteConfigResponse)
-def update_config(config_in: SiteConfigBase, db: Session = Depends(get_db)):
+async def update_config(config_in: SiteConfigBase, db: DBSession = Depends(get_db)):
     # 可以在这里加上 get_current_user 权限校验
-    return crud.update_site_config(db, config_in)
+    return await crud.update_site_config(db, config_in)
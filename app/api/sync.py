@@ -0,0 +1,40 @@
+import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Optional
+from ..database.dependency import get_db, DBSession
+
+from .. import async_crud as crud
+from ..config import SYNC_SAFETY_WINDOW_SECONDS
+from ..models.sync import SyncDelta
+from ..utils.pagination import encode_cursor, decode_cursor
+
+router = APIRouter()
+
+
+@router.get("", response_model=SyncDelta)
+async def read_sync_delta(
+        since: Optional[str] = Query(None, description="上次返回的 token；不传时返回全量数据"),
+        db: DBSession = Depends(get_db)
+):
+    """
+    增量同步（价格 / FAQ / 通知）：只返回 since 之后新增、修改、删除的记录和新的 token。
+    token 比数据库当前时间提前 SYNC_SAFETY_WINDOW_SECONDS 秒，相邻两次结果可能有少量重复行。
+    """
+    since_at = None
+    if since:
+        try:
+            (value,) = decode_cursor(since, 1)
+            since_at = datetime.datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid sync token")
+
+    delta = await crud.get_sync_delta(db, since_at)
+    token_at = delta["now"] - datetime.timedelta(seconds=SYNC_SAFETY_WINDOW_SECONDS)
+    return {
+        "token": encode_cursor(token_at.isoformat()),
+        "full": delta["full"],
+        "prices": delta["price"],
+        "faqs": delta["faq"],
+        "news": delta["news"],
+        "deleted": delta["deleted"],
+    }
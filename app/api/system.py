@@ -0,0 +1,42 @@
+from fastapi import APIRouter, Depends
+
+from ..models.user import UserPublic
+from ..dependencies import get_current_user
+from ..database.database import engine, async_engine, liveness_checker, replica_set
+from ..database.pool import pool_stats
+from ..utils.auth import password_hasher
+from ..utils.cache import catalog_cache
+from ..utils.events import change_events
+from ..utils.search import price_index
+from ..utils.snapshot import catalog_snapshot
+from ..utils.token_cache import token_cache
+
+router = APIRouter()
+
+
+@router.get("/cache")
+async def read_cache_stats(current_user: UserPublic = Depends(get_current_user)):
+    """进程内缓存的命中率统计、/events 订阅情况、机型名检索索引和共享目录快照（仅管理员）"""
+    return {
+        "catalog": catalog_cache.stats(),
+        "token": token_cache.stats(),
+        "events": change_events.stats(),
+        "price_search": price_index.stats(),
+        "snapshot": catalog_snapshot.stats(),
+    }
+
+
+@router.get("/pool")
+async def read_pool_stats(current_user: UserPublic = Depends(get_current_user)):
+    """
+    各引擎连接池的使用情况（仅管理员）：已借出 / 空闲 / 溢出连接数、取连接的等待时间，
+    只读副本的健康状态，以及后台存活检查的最近结果。用于在压测下调整 DB_POOL_SIZE / DB_MAX_OVERFLOW。
+    另附密码哈希线程池的排队情况（调整 PASSWORD_HASH_WORKERS / PASSWORD_HASH_MAX_PENDING）。
+    """
+    engines = {"sync": pool_stats(engine)}
+    if async_engine is not None:
+        engines["async"] = pool_stats(async_engine.sync_engine)
+    for replica in replica_set.replicas:
+        engines[replica.name] = pool_stats(replica.engine)
+    return {"engines": engines, "replicas": replica_set.stats(), "liveness": liveness_checker.snapshot(),
+            "password_hash": password_hasher.stats()}
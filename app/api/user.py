@@ -1,30 +1,35 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.models.user import  UserLogin, TokenResponse
-from ..database.dependency import get_db
-from ..crud import get_user_by_loginid, update_user_token
-from ..utils.auth import generate_token, verify_password
+from app.models.user import  UserLogin, TokenResponse, UserPublic
+from ..database.dependency import get_db, DBSession
+from ..async_crud import get_login_user, update_user_token
+from ..utils.auth import generate_token, needs_rehash, password_hasher, PasswordHasherBusy
+from ..utils.token_cache import token_cache
 
 router = APIRouter()
 
 
 @router.post("/login", response_model=TokenResponse)
-async def login_for_token(user_credentials: UserLogin, db: Session = Depends(get_db)):
+async def login_for_token(user_credentials: UserLogin, db: DBSession = Depends(get_db)):
     """
     根据 login_id 查询用户详情（排除密码）。
     """
-    # 1. 调用数据库 CRUD 函数获取用户数据
-    # 假设 user_crud.get_user 返回一个数据库 ORM 对象
-    db_user = get_user_by_loginid(db, login_id=user_credentials.loginid)
-
-    if not db_user:
+    # 1. 调用数据库 CRUD 函数获取用户数据（读取后即释放连接）
+    db_user = await get_login_user(db, login_id=user_credentials.loginid)
+
+    # 2. 在专用线程池中验证密码；用户不存在时也验证一次，响应时间不暴露 loginid 是否存在
+    try:
+        verified = await password_hasher.verify(user_credentials.password, db_user.password if db_user else None)
+        # 旧的明文密码 / 旧成本参数的哈希：验证成功后按当前参数重新哈希
+        new_hash = await password_hasher.hash(user_credentials.password) \
+            if verified and needs_rehash(db_user.password) else None
+    except PasswordHasherBusy:
         raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="用户名或密码错误",
-            headers={"WWW-Authenticate": "Bearer"},
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="登录请求过多，请稍后重试",
+            headers={"Retry-After": "1"},
         )
 
-    if not verify_password(user_credentials.password, db_user.password):
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="用户名或密码错误",
@@ -33,6 +38,8 @@ async def login_for_token(user_credentials: UserLogin, db: Session = Depends(get
 
     new_token = generate_token(length=64)
 
-    updated_user = update_user_token(db, db_user, new_token)
+    updated_user = await update_user_token(db, db_user, new_token, password_hash=new_hash)
+    # 预热 token 缓存，登录后的第一个管理请求无需再查库
+    token_cache.put(new_token, UserPublic.model_validate(updated_user), updated_user.token_expires_at)
 
     return {"token": updated_user.token}
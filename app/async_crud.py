@@ -0,0 +1,266 @@
+"""
+crud.py 的异步版本。
+
+每个函数与 crud.py 中的同名函数一一对应，SQL 逻辑只维护在 crud.py 一处：
+- AsyncSession：通过 run_sync 在异步驱动 (aiomysql) 上执行，不阻塞事件循环
+- 同步 Session（USE_ASYNC_DB=False 的回退模式）：放到线程池中执行
+"""
+import datetime
+from typing import Any, AsyncIterator, Callable, List, Optional, Sequence, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.engine import Row
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.sql import Select
+from starlette.concurrency import run_in_threadpool, iterate_in_threadpool
+
+from . import crud
+from .database.dependency import DBSession
+from .database.routing import RoutingSession
+from .database.models import DBUser, DBNews, DBCategory, DBRepairType, DBRepairPrice, DBFaq, DBSiteConfig
+from .database.models import DBCrawlPage
+from .models.categories import CategoryCreate
+from .models.config import SiteConfigBase
+from .models.faq import FAQCreate
+from .models.news import NewsCreate
+from .models.repair_prices import RepairPriceCreate
+from .models.repair_types import RepairTypeCreate
+
+
+async def run_db(db: DBSession, fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    在给定会话上执行一个同步 crud 函数 fn(session, *args, **kwargs)。
+    会话所用的只读副本在执行中断连时，回滚后在主库上重试一次。
+    """
+    try:
+        return await _run_db(db, fn, *args, **kwargs)
+    except DBAPIError:
+        session = db.sync_session if isinstance(db, AsyncSession) else db
+        if not isinstance(session, RoutingSession) or not session.fallback_to_primary():
+            raise
+    if isinstance(db, AsyncSession):
+        await db.rollback()
+    else:
+        await run_in_threadpool(db.rollback)
+    return await _run_db(db, fn, *args, **kwargs)
+
+
+async def _run_db(db: DBSession, fn: Callable[..., Any], *args, **kwargs) -> Any:
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
+
+
+async def stream_rows(db: DBSession, stmt: Select, batch_size: int) -> AsyncIterator[Sequence[Row]]:
+    """
+    使用服务端游标 (stream_results + yield_per) 分批读取结果，每次只在内存中保留 batch_size 行。
+    """
+    stmt = stmt.execution_options(yield_per=batch_size)
+    if isinstance(db, AsyncSession):
+        result = await db.stream(stmt)
+        async for partition in result.partitions():
+            yield partition
+        return
+
+    result = await run_in_threadpool(db.execute, stmt)
+    async for partition in iterate_in_threadpool(result.partitions()):
+        yield partition
+
+
+# -----------------------------------------------------
+# 用户操作
+# -----------------------------------------------------
+async def get_user_by_loginid(db: DBSession, login_id: str) -> Optional[DBUser]:
+    return await run_db(db, crud.get_user_by_loginid, login_id)
+
+
+async def get_login_user(db: DBSession, login_id: str) -> Optional[DBUser]:
+    return await run_db(db, crud.get_login_user, login_id)
+
+
+async def update_user_token(db: DBSession, user: DBUser, new_token: str,
+                            password_hash: Optional[str] = None) -> DBUser:
+    return await run_db(db, crud.update_user_token, user, new_token, password_hash)
+
+
+async def get_user_by_token(db: DBSession, token: str) -> Optional[DBUser]:
+    return await run_db(db, crud.get_user_by_token, token)
+
+
+# -----------------------------------------------------
+# 通知 (News)
+# -----------------------------------------------------
+async def get_all_news(db: DBSession) -> List[DBNews]:
+    return await run_db(db, crud.get_all_news)
+
+
+async def get_news_page(db: DBSession, limit: int,
+                        after: Optional[Tuple[datetime.date, int]] = None) -> Tuple[List[DBNews], Optional[Tuple]]:
+    return await run_db(db, crud.get_news_page, limit, after)
+
+
+async def create_news(db: DBSession, news_in: NewsCreate) -> DBNews:
+    return await run_db(db, crud.create_news, news_in)
+
+
+async def update_news(db: DBSession, news_id: int, news_in: NewsCreate) -> Optional[DBNews]:
+    return await run_db(db, crud.update_news, news_id, news_in)
+
+
+async def delete_news(db: DBSession, news_id: int) -> bool:
+    return await run_db(db, crud.delete_news, news_id)
+
+
+# -----------------------------------------------------
+# 机种分类 (Category)
+# -----------------------------------------------------
+async def get_categories(db: DBSession) -> List[DBCategory]:
+    return await run_db(db, crud.get_categories)
+
+
+async def create_category(db: DBSession, cat_in: CategoryCreate) -> DBCategory:
+    return await run_db(db, crud.create_category, cat_in)
+
+
+async def update_category(db: DBSession, cat_id: int, cat_in: CategoryCreate) -> Optional[DBCategory]:
+    return await run_db(db, crud.update_category, cat_id, cat_in)
+
+
+async def delete_category(db: DBSession, cat_id: int) -> bool:
+    return await run_db(db, crud.delete_category, cat_id)
+
+
+# -----------------------------------------------------
+# 维修种类 (RepairType)
+# -----------------------------------------------------
+async def get_repair_types(db: DBSession) -> List[DBRepairType]:
+    return await run_db(db, crud.get_repair_types)
+
+
+async def create_repair_type(db: DBSession, rt_in: RepairTypeCreate) -> DBRepairType:
+    return await run_db(db, crud.create_repair_type, rt_in)
+
+
+async def update_repair_type(db: DBSession, rt_id: int, rt_in: RepairTypeCreate) -> Optional[DBRepairType]:
+    return await run_db(db, crud.update_repair_type, rt_id, rt_in)
+
+
+async def delete_repair_type(db: DBSession, rt_id: int) -> bool:
+    return await run_db(db, crud.delete_repair_type, rt_id)
+
+
+# -----------------------------------------------------
+# 维修价格 (RepairPrice)
+# -----------------------------------------------------
+async def get_prices_by_filter(db: DBSession, category_id: int, repair_type_id: int) -> List[DBRepairPrice]:
+    return await run_db(db, crud.get_prices_by_filter, category_id, repair_type_id)
+
+
+async def get_all_prices(db: DBSession) -> List[DBRepairPrice]:
+    return await run_db(db, crud.get_all_prices)
+
+
+async def get_price_matrix(db: DBSession, category_id: Optional[int] = None) -> dict:
+    return await run_db(db, crud.get_price_matrix, category_id)
+
+
+async def upsert_repair_price(db: DBSession, price_in: RepairPriceCreate,
+                              price_id: Optional[int] = None) -> Optional[DBRepairPrice]:
+    return await run_db(db, crud.upsert_repair_price, price_in, price_id)
+
+
+async def update_repair_price(db: DBSession, price_id: int, price_in: RepairPriceCreate) -> Optional[DBRepairPrice]:
+    return await run_db(db, crud.update_repair_price, price_id, price_in)
+
+
+async def delete_repair_price(db: DBSession, price_id: int) -> bool:
+    return await run_db(db, crud.delete_repair_price, price_id)
+
+
+def stream_price_export(db: DBSession, updated_since: Optional[datetime.datetime] = None,
+                        batch_size: int = 1000) -> AsyncIterator[Sequence[Row]]:
+    return stream_rows(db, crud.select_price_export(updated_since), batch_size)
+
+
+async def bulk_upsert_repair_prices(db: DBSession, prices: List[RepairPriceCreate]) -> int:
+    return await run_db(db, crud.bulk_upsert_repair_prices, prices)
+
+
+# -----------------------------------------------------
+# FAQ
+# -----------------------------------------------------
+async def get_all_faqs(db: DBSession) -> List[DBFaq]:
+    return await run_db(db, crud.get_all_faqs)
+
+
+async def get_faq_page(db: DBSession, limit: int,
+                       after: Optional[Tuple[int, int]] = None) -> Tuple[List[DBFaq], Optional[Tuple]]:
+    return await run_db(db, crud.get_faq_page, limit, after)
+
+
+async def create_faq(db: DBSession, faq_in: FAQCreate) -> DBFaq:
+    return await run_db(db, crud.create_faq, faq_in)
+
+
+async def update_faq(db: DBSession, faq_id: int, faq_in: FAQCreate) -> Optional[DBFaq]:
+    return await run_db(db, crud.update_faq, faq_id, faq_in)
+
+
+async def delete_faq(db: DBSession, faq_id: int) -> bool:
+    return await run_db(db, crud.delete_faq, faq_id)
+
+
+# -----------------------------------------------------
+# 拖拽排序
+# -----------------------------------------------------
+async def reorder_repair_prices(db: DBSession, ids: List[int]) -> int:
+    return await run_db(db, crud.reorder_repair_prices, ids)
+
+
+async def reorder_faqs(db: DBSession, ids: List[int]) -> int:
+    return await run_db(db, crud.reorder_faqs, ids)
+
+
+async def reorder_categories(db: DBSession, ids: List[int]) -> int:
+    return await run_db(db, crud.reorder_categories, ids)
+
+
+async def reorder_repair_types(db: DBSession, ids: List[int]) -> int:
+    return await run_db(db, crud.reorder_repair_types, ids)
+
+
+# -----------------------------------------------------
+# 增量同步 (/sync)
+# -----------------------------------------------------
+async def get_sync_delta(db: DBSession, since: Optional[datetime.datetime] = None) -> dict:
+    return await run_db(db, crud.get_sync_delta, since)
+
+
+# -----------------------------------------------------
+# 站点配置 (SiteConfig)
+# -----------------------------------------------------
+async def get_site_config(db: DBSession) -> DBSiteConfig:
+    return await run_db(db, crud.get_site_config)
+
+
+async def update_site_config(db: DBSession, config_in: SiteConfigBase) -> DBSiteConfig:
+    return await run_db(db, crud.update_site_config, config_in)
+
+
+# -----------------------------------------------------
+# 竞品价格抓取 (app/crawler)
+# -----------------------------------------------------
+async def get_model_names(db: DBSession) -> List[str]:
+    return await run_db(db, crud.get_model_names)
+
+
+async def get_crawl_pages(db: DBSession, urls: Sequence[str]) -> List[DBCrawlPage]:
+    return await run_db(db, crud.get_crawl_pages, urls)
+
+
+async def save_competitor_prices(db: DBSession, rows: List[dict]) -> int:
+    return await run_db(db, crud.save_competitor_prices, rows)
+
+
+async def save_crawl_pages(db: DBSession, pages: List[dict]) -> int:
+    return await run_db(db, crud.save_crawl_pages, pages)
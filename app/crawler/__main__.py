@@ -0,0 +1,52 @@
+"""
+抓取竞品价格并写入 competitor_prices：
+
+    python -m app.crawler --sources sources.json
+
+离线验证（用 app/crawler/fixtures 中保存的 HTML 启动本地桩服务器）：
+
+    python -m app.crawler --stub
+    python -m app.crawler --stub --stub-fail-first 1   # 每个页面先返回一次 503，验证重试
+"""
+import argparse
+import asyncio
+import dataclasses
+import json
+import logging
+import os
+import sys
+from typing import List, Optional
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Crawl competitor repair prices into competitor_prices")
+    parser.add_argument("--sources", help="来源配置 JSON，--stub 时默认使用 fixtures/sources.json")
+    parser.add_argument("--base-url", help="替换来源 url 中的 {base}")
+    parser.add_argument("--stub", action="store_true", help="启动本地桩服务器提供 fixtures 目录中的页面")
+    parser.add_argument("--stub-dir", default=FIXTURES)
+    parser.add_argument("--stub-fail-first", type=int, default=0)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+
+    from .pipeline import crawl
+    from .sources import load_sources
+    from .stub import StubServer
+
+    sources_path = args.sources or (os.path.join(args.stub_dir, "sources.json") if args.stub else None)
+    if sources_path is None:
+        parser.error("--sources is required unless --stub is given")
+
+    if args.stub:
+        with StubServer(args.stub_dir, fail_first=args.stub_fail_first) as stub:
+            report = asyncio.run(crawl(load_sources(sources_path, args.base_url or stub.base_url)))
+    else:
+        report = asyncio.run(crawl(load_sources(sources_path, args.base_url)))
+
+    print(json.dumps(dataclasses.asdict(report), ensure_ascii=False, indent=2))
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
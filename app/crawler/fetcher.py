@@ -0,0 +1,114 @@
+# crawler/fetcher.py
+import asyncio
+import email.utils
+import random
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import httpx
+
+# 可重试的状态码：限流和服务端错误
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Retry-After 的上限（秒），避免一个站点拖住整个抓取
+MAX_RETRY_AFTER = 60.0
+
+
+@dataclass
+class FetchResult:
+    url: str
+    status: int
+    text: Optional[str] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    attempts: int = 1
+
+    @property
+    def not_modified(self) -> bool:
+        return self.status == 304
+
+
+class FetchError(Exception):
+    def __init__(self, url: str, reason: str, attempts: int):
+        super().__init__(f"{url}: {reason} (after {attempts} attempts)")
+        self.url = url
+        self.reason = reason
+        self.attempts = attempts
+
+
+class Fetcher:
+    """
+    共享一个 httpx.AsyncClient（连接池复用），按主机限制并发。
+    - 条件请求：带上次记录的 ETag / Last-Modified，未变化的页面返回 304，不再下载和解析
+    - 连接错误、429、5xx 按指数退避（带抖动）重试；响应带 Retry-After 时以它为准。
+      等待期间不占用主机的并发名额
+    """
+
+    def __init__(self, client: httpx.AsyncClient, per_host: int, max_retries: int, backoff_base: float):
+        self.client = client
+        self.per_host = per_host
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self._hosts: Dict[str, asyncio.Semaphore] = {}
+        self.retries = 0
+
+    def _semaphore(self, url: str) -> asyncio.Semaphore:
+        host = httpx.URL(url).host
+        semaphore = self._hosts.get(host)
+        if semaphore is None:
+            semaphore = self._hosts[host] = asyncio.Semaphore(self.per_host)
+        return semaphore
+
+    async def fetch(self, url: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> FetchResult:
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+        semaphore = self._semaphore(url)
+        for attempt in range(1, self.max_retries + 2):
+            retry_after = None
+            try:
+                async with semaphore:
+                    response = await self.client.get(url, headers=headers)
+            except httpx.TransportError as e:
+                reason = f"{type(e).__name__}: {e}"
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    if response.status_code != 304 and response.status_code >= 400:
+                        raise FetchError(url, f"HTTP {response.status_code}", attempt)
+                    return FetchResult(
+                        url=url,
+                        status=response.status_code,
+                        text=response.text if response.status_code != 304 else None,
+                        # 304 可能不带校验信息，沿用请求时的值
+                        etag=response.headers.get("ETag", etag),
+                        last_modified=response.headers.get("Last-Modified", last_modified),
+                        attempts=attempt,
+                    )
+                reason = f"HTTP {response.status_code}"
+                retry_after = _retry_after(response.headers.get("Retry-After"))
+
+            if attempt > self.max_retries:
+                raise FetchError(url, reason, attempt)
+            self.retries += 1
+            delay = retry_after if retry_after is not None else (
+                self.backoff_base * 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
+            )
+            await asyncio.sleep(delay)
+        raise AssertionError("unreachable")
+
+
+def _retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After 可以是秒数或 HTTP 日期"""
+    if not value:
+        return None
+    if value.strip().isdigit():
+        seconds = float(value)
+    else:
+        try:
+            seconds = email.utils.parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER)
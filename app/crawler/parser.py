@@ -0,0 +1,42 @@
+# crawler/parser.py
+"""
+在解析进程池中执行，只依赖 BeautifulSoup，不导入 app 的配置和数据库模块。
+"""
+import re
+import unicodedata
+from decimal import Decimal, InvalidOperation
+from typing import List, Optional, Tuple
+
+from bs4 import BeautifulSoup
+
+_NUMBER = re.compile(r"\d[\d,]*(?:\.\d+)?")
+
+
+def parse_price(text: str) -> Optional[Decimal]:
+    """"¥24,800（税込）"、"２４，８００円" 等写法取第一个数字；没有数字时返回 None"""
+    match = _NUMBER.search(unicodedata.normalize("NFKC", text))
+    if match is None:
+        return None
+    try:
+        return Decimal(match.group().replace(",", ""))
+    except InvalidOperation:
+        return None
+
+
+def parse_page(html: str, item: str, model: str, price: str) -> List[Tuple[str, Decimal]]:
+    """
+    返回页面中的 (机型名, 价格)。缺少机型名或价格的行跳过。
+    使用标准库的 html.parser，不依赖 lxml。
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    results = []
+    for row in soup.select(item):
+        model_tag = row.select_one(model)
+        price_tag = row.select_one(price)
+        if model_tag is None or price_tag is None:
+            continue
+        name = " ".join(model_tag.get_text(" ", strip=True).split())
+        value = parse_price(price_tag.get_text(" ", strip=True))
+        if name and value is not None:
+            results.append((name, value))
+    return results
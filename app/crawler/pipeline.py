@@ -0,0 +1,173 @@
+# crawler/pipeline.py
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import httpx
+from sqlalchemy.exc import SQLAlchemyError
+
+from .. import async_crud as crud
+from ..config import (
+    CRAWLER_MAX_CONNECTIONS, CRAWLER_PER_HOST_CONCURRENCY, CRAWLER_TIMEOUT, CRAWLER_MAX_RETRIES,
+    CRAWLER_BACKOFF_BASE, CRAWLER_PARSE_WORKERS, CRAWLER_BATCH_SIZE, CRAWLER_USER_AGENT,
+)
+from ..database.dependency import session_scope
+from ..utils.search import normalize
+from .fetcher import Fetcher, FetchError
+from .parser import parse_page
+from .sources import Source
+
+logger = logging.getLogger("app.crawler")
+
+# 写入队列的结束标记
+_DONE = object()
+
+
+@dataclass
+class CrawlReport:
+    pages: int = 0
+    fetched: int = 0
+    not_modified: int = 0
+    failed: int = 0
+    retries: int = 0
+    items: int = 0
+    matched: int = 0
+    written: int = 0
+    unmatched: Dict[str, List[str]] = field(default_factory=dict)
+    errors: List[str] = field(default_factory=list)
+
+
+async def crawl(sources: List[Source], *, executor: Optional[Executor] = None,
+                transport: Optional[httpx.AsyncBaseTransport] = None,
+                batch_size: int = CRAWLER_BATCH_SIZE, max_unmatched: int = 20) -> CrawlReport:
+    """
+    抓取全部来源的页面并写入 competitor_prices。
+
+    下载（异步、按主机限流）→ 解析（进程池）→ 按规范化机型名匹配我方机型 → 写入队列；
+    一个写入任务按 batch_size 攒批后 upsert。页面的 ETag / Last-Modified 在全部价格写入之后才保存，
+    写入失败时下次抓取不会因为 304 而跳过该页面。
+    机型名无法匹配的条目不写入，在报告中按来源列出（每个来源最多 max_unmatched 条）。
+    """
+    report = CrawlReport(pages=sum(len(source.urls) for source in sources))
+    urls = [url for source in sources for url in source.urls]
+    async with session_scope(primary=True) as db:
+        ours = {normalize(name): name for name in await crud.get_model_names(db)}
+        validators = {page.url: page for page in await crud.get_crawl_pages(db, urls)}
+
+    own_executor = executor is None
+    if own_executor:
+        # spawn：子进程只导入解析模块，不继承父进程的事件循环、数据库连接和线程
+        executor = ProcessPoolExecutor(max_workers=max(CRAWLER_PARSE_WORKERS, 1),
+                                       mp_context=multiprocessing.get_context("spawn"))
+
+    queue: asyncio.Queue = asyncio.Queue(maxsize=batch_size * 4)
+    # url -> 页面校验信息（同一 url 出现在多个来源时只保存一次）
+    pages: Dict[str, dict] = {}
+    # 价格写入失败的页面：不保存校验信息，下次重新下载
+    failed_urls = set()
+    loop = asyncio.get_running_loop()
+
+    async def writer():
+        batch: Dict[tuple, dict] = {}
+
+        async def flush():
+            if not batch:
+                return
+            try:
+                async with session_scope(primary=True) as db:
+                    report.written += await crud.save_competitor_prices(db, list(batch.values()))
+            except SQLAlchemyError as e:
+                report.errors.append(f"write failed: {type(e).__name__}: {e}")
+                logger.warning("competitor price batch write failed: %s", e)
+                failed_urls.update(row["url"] for row in batch.values())
+            batch.clear()
+
+        while True:
+            row = await queue.get()
+            if row is _DONE:
+                await flush()
+                return
+            # 同一批内自然键重复时以最后一行为准（与 bulk_upsert_repair_prices 一致）
+            batch[(row["source"], row["url"], row["competitor_model_name"])] = row
+            if len(batch) >= batch_size:
+                await flush()
+
+    async def crawl_page(fetcher: Fetcher, source: Source, url: str):
+        page = validators.get(url)
+        try:
+            result = await fetcher.fetch(url, page.etag if page else None, page.last_modified if page else None)
+        except FetchError as e:
+            report.failed += 1
+            report.errors.append(str(e))
+            logger.warning("crawl failed: %s", e)
+            return
+        page_row = {"url": url, "etag": result.etag, "last_modified": result.last_modified,
+                    "status": result.status}
+        if result.not_modified:
+            report.not_modified += 1
+            pages[url] = page_row
+            return
+
+        report.fetched += 1
+        selectors = source.selectors
+        try:
+            items = await loop.run_in_executor(executor, parse_page, result.text,
+                                               selectors.item, selectors.model, selectors.price)
+        except Exception as e:
+            report.failed += 1
+            report.errors.append(f"{url}: parse failed: {type(e).__name__}: {e}")
+            logger.warning("parse failed for %s: %s", url, e)
+            return
+        pages[url] = page_row
+        report.items += len(items)
+        for competitor_name, price in items:
+            model_name = ours.get(normalize(competitor_name))
+            if model_name is None:
+                unmatched = report.unmatched.setdefault(source.name, [])
+                if len(unmatched) < max_unmatched:
+                    unmatched.append(competitor_name)
+                continue
+            report.matched += 1
+            await queue.put({
+                "source": source.name,
+                "url": url,
+                "model_name": model_name,
+                "competitor_model_name": competitor_name[:200],
+                "repair_type_id": source.repair_type_id,
+                "price": price,
+            })
+
+    limits = httpx.Limits(max_connections=CRAWLER_MAX_CONNECTIONS,
+                          max_keepalive_connections=CRAWLER_MAX_CONNECTIONS)
+    try:
+        async with httpx.AsyncClient(limits=limits, timeout=CRAWLER_TIMEOUT, transport=transport,
+                                     headers={"User-Agent": CRAWLER_USER_AGENT},
+                                     follow_redirects=True) as client:
+            fetcher = Fetcher(client, CRAWLER_PER_HOST_CONCURRENCY, CRAWLER_MAX_RETRIES, CRAWLER_BACKOFF_BASE)
+            writer_task = asyncio.create_task(writer())
+            producers = asyncio.gather(*(crawl_page(fetcher, source, url)
+                                         for source in sources for url in source.urls))
+            try:
+                # 写入任务在收到结束标记前只会因异常结束：此时停止抓取，否则生产者会永远阻塞在已满的队列上
+                await asyncio.wait({producers, writer_task}, return_when=asyncio.FIRST_COMPLETED)
+                if writer_task.done():
+                    writer_task.result()
+                # 抓取结束（正常或出错）后写完队列中剩余的行
+                await queue.put(_DONE)
+                await writer_task
+                producers.result()
+            finally:
+                producers.cancel()
+                writer_task.cancel()
+                await asyncio.gather(producers, writer_task, return_exceptions=True)
+            report.retries = fetcher.retries
+    finally:
+        if own_executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    async with session_scope(primary=True) as db:
+        await crud.save_crawl_pages(db, [page for url, page in pages.items() if url not in failed_urls])
+    return report
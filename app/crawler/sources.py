@@ -0,0 +1,46 @@
+# crawler/sources.py
+import json
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+
+@dataclass(frozen=True)
+class Selectors:
+    """CSS 选择器：item 选出每一行（每个机型），model / price 在行内选出机型名和价格"""
+    item: str
+    model: str
+    price: str
+
+
+@dataclass(frozen=True)
+class Source:
+    name: str
+    selectors: Selectors
+    urls: List[str] = field(default_factory=list)
+    # 该来源的页面对应的维修种类（例如某个页面只列出液晶更换的价格），不区分时为 None
+    repair_type_id: Optional[int] = None
+
+
+def load_sources(path: str, base_url: Optional[str] = None) -> List[Source]:
+    """
+    读取抓取来源的 JSON 配置：
+        {"sources": [{"name": "...", "repair_type_id": 1,
+                      "selectors": {"item": "...", "model": "...", "price": "..."},
+                      "urls": ["https://..."]}]}
+    url 中的 {base} 替换为 base_url（用于指向本地桩服务器）。
+    """
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+
+    sources = []
+    for item in config["sources"]:
+        urls = item["urls"]
+        if base_url is not None:
+            urls = [url.replace("{base}", base_url.rstrip("/")) for url in urls]
+        sources.append(Source(
+            name=item["name"],
+            selectors=Selectors(**item["selectors"]),
+            urls=urls,
+            repair_type_id=item.get("repair_type_id"),
+        ))
+    return sources
@@ -0,0 +1,95 @@
+# crawler/stub.py
+import hashlib
+import os
+import threading
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+
+
+class StubServer:
+    """
+    本地桩服务器：把保存下来的 HTML 样本目录当作竞品网站提供，用于离线验证抓取流程。
+    - 响应带 ETag（内容的 SHA-1）和 Last-Modified（文件修改时间），支持条件请求返回 304
+    - fail_first > 0 时，每个路径的前 fail_first 次请求返回 503 + Retry-After: 0，用于验证重试
+    """
+
+    def __init__(self, directory: str, fail_first: int = 0, host: str = "127.0.0.1", port: int = 0):
+        self.directory = directory
+        self.fail_first = fail_first
+        self.requests: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "StubServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _count(self, path: str) -> int:
+        with self._lock:
+            self.requests[path] = self.requests.get(path, 0) + 1
+            return self.requests[path]
+
+    def _handler(self):
+        stub = self
+
+        class Handler(SimpleHTTPRequestHandler):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, directory=stub.directory, **kwargs)
+
+            def do_GET(self):
+                if stub._count(self.path) <= stub.fail_first:
+                    self.send_response(503)
+                    self.send_header("Retry-After", "0")
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                path = self.translate_path(self.path)
+                if not os.path.isfile(path):
+                    self.send_error(404)
+                    return
+                with open(path, "rb") as f:
+                    body = f.read()
+                etag = '"%s"' % hashlib.sha1(body).hexdigest()
+                mtime = int(os.path.getmtime(path))
+                if self._not_modified(etag, mtime):
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", etag)
+                self.send_header("Last-Modified", formatdate(mtime, usegmt=True))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _not_modified(self, etag: str, mtime: int) -> bool:
+                if_none_match = self.headers.get("If-None-Match")
+                if if_none_match is not None:
+                    return etag in (tag.strip() for tag in if_none_match.split(","))
+                if_modified_since = self.headers.get("If-Modified-Since")
+                if if_modified_since:
+                    try:
+                        return mtime <= parsedate_to_datetime(if_modified_since).timestamp()
+                    except (TypeError, ValueError):
+                        return False
+                return False
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -1,16 +1,127 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import select, delete, update
+from sqlalchemy import select, delete, update, insert, tuple_, func, case, literal, text, and_, or_
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 
 from app.models.categories import CategoryCreate
 from app.models.news import NewsCreate
 from app.models.repair_prices import RepairPriceCreate
 from app.models.repair_types import RepairTypeCreate
 from app.models.faq import FAQCreate
-from .database.models import DBUser, DBNews, DBCategory, DBRepairType, DBRepairPrice, DBFaq, DBSiteConfig
-from typing import Optional, List
+from .database.models import DBUser, DBNews, DBCategory, DBRepairType, DBRepairPrice, DBFaq, DBSiteConfig, DBSyncTombstone
+from .database.models import DBCompetitorPrice, DBCrawlPage
+from typing import Optional, List, Tuple, Sequence
+from contextlib import contextmanager
 import datetime
 
+from .config import TOKEN_TTL_SECONDS, SYNC_TOMBSTONE_RETENTION_DAYS
 from .models.config import SiteConfigBase
+from .utils.cache import catalog_cache, price_pair_namespace, PRICES_ALL
+from .utils.events import change_events
+from .utils.search import price_index
+from .utils.snapshot import catalog_snapshot, SNAPSHOT_TABLES
+from .utils.token_cache import token_cache
+
+
+def _touch(*tables: str, entity_id: Optional[int] = None):
+    """
+    写操作提交后调用：bump 对应表的版本号，使相关读缓存失效；
+    并向 /events 推送 (表名, entity_id, 新版本号)，批量变更时 entity_id 为 None。
+    """
+    catalog_cache.invalidate(*tables)
+    if SNAPSHOT_TABLES.intersection(tables):
+        catalog_snapshot.mark_dirty()
+    for table in tables:
+        # 价格组合等细分命名空间只用于缓存，不推送
+        if ":" not in table:
+            change_events.publish(table, entity_id)
+
+
+def _touch_prices(*pairs, price_id: Optional[int] = None):
+    """
+    价格变更后调用。pairs 为受影响的 (category_id, repair_type_id)；
+    不传表示影响范围未知，使所有组合失效。
+    单条写操作传入 price_id，并自行增量更新检索索引；否则索引整体过期。
+    """
+    if price_id is None:
+        price_index.invalidate()
+    if pairs:
+        _touch("repair_prices", *(price_pair_namespace(c, r) for c, r in set(pairs)), entity_id=price_id)
+    else:
+        _touch("repair_prices", PRICES_ALL, entity_id=price_id)
+
+
+def _tombstone(db: Session, entity: str, model, *criteria):
+    """
+    在删除语句之前调用：把即将删除的行 id 记入 sync_tombstones（INSERT ... SELECT，与删除同一事务），
+    并顺带清理超过保留期的旧记录。
+    """
+    db.execute(
+        insert(DBSyncTombstone).from_select(
+            ["entity", "entity_id", "deleted_at"],
+            select(literal(entity), model.id, func.now()).where(*criteria)
+        )
+    )
+    cutoff = _days_ago(db, SYNC_TOMBSTONE_RETENTION_DAYS)
+    db.execute(delete(DBSyncTombstone).where(DBSyncTombstone.deleted_at < cutoff))
+
+
+def _days_ago(db: Session, days: int):
+    """
+    数据库时钟上 days 天之前的时间（SQL 表达式）。
+    deleted_at 由数据库的 now() 写入，保留期也必须按数据库时钟计算；
+    应用服务器的本地时间与数据库时区不同时，两者会相差若干小时。
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        return func.datetime("now", f"-{int(days)} days")
+    if dialect == "mysql":
+        return func.date_sub(func.now(), text(f"INTERVAL {int(days)} DAY"))
+    return func.now() - datetime.timedelta(days=days)
+
+
+def _insert_row(db: Session, model, values: dict):
+    """
+    插入一行并取回整行（含自增主键和服务器端默认值），不提交。
+    支持 RETURNING 的方言 (SQLite / PostgreSQL / MariaDB) 一条语句完成；
+    MySQL 回退为 INSERT 后按主键查询一次。
+    返回的对象不属于任何会话，提交后不会过期，读取属性不会再触发查询。
+    """
+    table = model.__table__
+    stmt = insert(table).values(**values)
+    if db.get_bind(clause=stmt).dialect.insert_returning:
+        row = db.execute(stmt.returning(*table.c)).mappings().one()
+    else:
+        key = db.execute(stmt).inserted_primary_key
+        row = db.execute(select(*table.c).where(*(c == v for c, v in zip(table.primary_key, key)))).mappings().one()
+    return model(**row)
+
+
+def _update_row(db: Session, model, criteria: Sequence, values: dict):
+    """
+    按 criteria 更新一行并取回更新后的整行，不提交；没有匹配的行时返回 None。
+    支持 UPDATE ... RETURNING 的方言一条语句完成；否则 UPDATE 后仅在有匹配行时查询一次。
+    """
+    table = model.__table__
+    if not values:
+        return _row(db, model, criteria)
+    stmt = update(table).where(*criteria).values(**values)
+    if db.get_bind(clause=stmt).dialect.update_returning:
+        row = db.execute(stmt.returning(*table.c)).mappings().first()
+        return model(**row) if row is not None else None
+    # MySQL 方言默认开启 CLIENT_FOUND_ROWS，rowcount 为匹配行数而不是实际变化的行数
+    if db.execute(stmt).rowcount == 0:
+        return None
+    return _row(db, model, criteria)
+
+
+def _row(db: Session, model, criteria: Sequence):
+    row = db.execute(select(*model.__table__.c).where(*criteria)).mappings().first()
+    return model(**row) if row is not None else None
+
+
+def _delete_rows(db: Session, model, *criteria) -> int:
+    """删除匹配的行并返回删除的行数（单条语句的 rowcount），不提交"""
+    return db.execute(delete(model).where(*criteria)).rowcount
 
 
 # -----------------------------------------------------
@@ -20,16 +131,43 @@ def get_user_by_loginid(db: Session, login_id: str) -> Optional[DBUser]:
     return db.get(DBUser, login_id)
 
 
-def update_user_token(db: Session, user: DBUser, new_token: str) -> DBUser:
-    user.token = new_token
-    db.commit()
-    db.refresh(user)
+def get_login_user(db: Session, login_id: str) -> Optional[DBUser]:
+    """
+    登录用：读取后把对象从会话中分离并结束事务，
+    随后的密码验证（几十毫秒，可能还要排队）期间不占用连接池中的连接。
+    """
+    user = db.get(DBUser, login_id)
+    if user is not None:
+        db.expunge(user)
+    db.rollback()
     return user
 
 
+def update_user_token(db: Session, user: DBUser, new_token: str, password_hash: Optional[str] = None) -> DBUser:
+    """password_hash 不为空时同时替换密码哈希（登录时的重新哈希），与 token 一起提交"""
+    values = {
+        "token": new_token,
+        "token_expires_at": datetime.datetime.now() + datetime.timedelta(seconds=TOKEN_TTL_SECONDS),
+    }
+    if password_hash is not None:
+        values["password"] = password_hash
+    updated = _update_row(db, DBUser, [DBUser.loginid == user.loginid], values)
+    db.commit()
+    # 重新登录后旧 token 立即失效
+    if user.token:
+        token_cache.invalidate(user.token)
+    return updated
+
+
+def select_user_by_token(token: str):
+    return select(DBUser).where(
+        DBUser.token == token,
+        DBUser.token_expires_at > datetime.datetime.now()
+    )
+
+
 def get_user_by_token(db: Session, token: str) -> Optional[DBUser]:
-    stmt = select(DBUser).where(DBUser.token == token)
-    return db.scalars(stmt).first()
+    return db.scalars(select_user_by_token(token)).first()
 
 
 # -----------------------------------------------------
@@ -37,22 +175,43 @@ def get_user_by_token(db: Session, token: str) -> Optional[DBUser]:
 # -----------------------------------------------------
 def get_all_news(db: Session) -> List[DBNews]:
     # 按发布日期倒序排列，最新的在前面
-    stmt = select(DBNews).order_by(DBNews.publish_date.desc())
+    stmt = select(DBNews).order_by(DBNews.publish_date.desc(), DBNews.id.desc())
     return db.scalars(stmt).all()
 
 
+def select_news_page(limit: int, after: Optional[Tuple[datetime.date, int]] = None):
+    """keyset 分页：取排在 after=(publish_date, id) 之后的 limit 条，走 ix_news_publish_date_id"""
+    stmt = select(DBNews).order_by(DBNews.publish_date.desc(), DBNews.id.desc()).limit(limit)
+    if after is not None:
+        stmt = stmt.where(tuple_(DBNews.publish_date, DBNews.id) < tuple_(*after))
+    return stmt
+
+
+def get_news_page(db: Session, limit: int,
+                  after: Optional[Tuple[datetime.date, int]] = None) -> Tuple[List[DBNews], Optional[Tuple]]:
+    """返回 (本页数据, 下一页的起点键)；多取一条用来判断是否还有下一页"""
+    rows = db.scalars(select_news_page(limit + 1, after)).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, (rows[-1].publish_date, rows[-1].id)
+
+
 def create_news(db: Session, news_in: NewsCreate) -> DBNews:
-    db_news = DBNews(**news_in.model_dump())
-    db.add(db_news)
+    db_news = _insert_row(db, DBNews, news_in.model_dump())
     db.commit()
-    db.refresh(db_news)
+    _touch("news", entity_id=db_news.id)
     return db_news
 
 
-def delete_news(db: Session, news_id: int):
-    stmt = delete(DBNews).where(DBNews.id == news_id)
-    db.execute(stmt)
+def delete_news(db: Session, news_id: int) -> bool:
+    """返回记录是否存在（已删除）"""
+    _tombstone(db, "news", DBNews, DBNews.id == news_id)
+    deleted = _delete_rows(db, DBNews, DBNews.id == news_id)
     db.commit()
+    if deleted:
+        _touch("news", entity_id=news_id)
+    return deleted > 0
 
 
 # -----------------------------------------------------
@@ -64,16 +223,22 @@ def get_categories(db: Session) -> List[DBCategory]:
 
 
 def create_category(db: Session, cat_in: CategoryCreate) -> DBCategory:
-    db_cat = DBCategory(**cat_in.model_dump())
-    db.add(db_cat)
+    db_cat = _insert_row(db, DBCategory, cat_in.model_dump())
     db.commit()
-    db.refresh(db_cat)
+    _touch("categories", entity_id=db_cat.id)
     return db_cat
 
 
-def delete_category(db: Session, cat_id: int):
-    db.execute(delete(DBCategory).where(DBCategory.id == cat_id))
+def delete_category(db: Session, cat_id: int) -> bool:
+    """返回分类是否存在（已删除）"""
+    _tombstone(db, "price", DBRepairPrice, DBRepairPrice.category_id == cat_id)
+    deleted = _delete_rows(db, DBCategory, DBCategory.id == cat_id)
     db.commit()
+    if deleted:
+        # 价格表通过外键 ON DELETE CASCADE 级联删除
+        _touch("categories", entity_id=cat_id)
+        _touch_prices()
+    return deleted > 0
 
 
 # -----------------------------------------------------
@@ -85,22 +250,32 @@ def get_repair_types(db: Session) -> List[DBRepairType]:
 
 
 def create_repair_type(db: Session, rt_in: RepairTypeCreate) -> DBRepairType:
-    db_rt = DBRepairType(**rt_in.model_dump())
-    db.add(db_rt)
+    db_rt = _insert_row(db, DBRepairType, rt_in.model_dump())
     db.commit()
-    db.refresh(db_rt)
+    _touch("repair_types", entity_id=db_rt.id)
     return db_rt
 
 
+def delete_repair_type(db: Session, rt_id: int) -> bool:
+    """返回维修种类是否存在（已删除）"""
+    _tombstone(db, "price", DBRepairPrice, DBRepairPrice.repair_type_id == rt_id)
+    deleted = _delete_rows(db, DBRepairType, DBRepairType.id == rt_id)
+    db.commit()
+    if deleted:
+        _touch("repair_types", entity_id=rt_id)
+        _touch_prices()
+    return deleted > 0
+
+
 # -----------------------------------------------------
 # 4. 维修价格操作 (PriceManager 画面使用)
 # -----------------------------------------------------
-def get_prices_by_filter(db: Session, category_id: int, repair_type_id: int) -> List[DBRepairPrice]:
+def select_prices_by_filter(category_id: int, repair_type_id: int):
     """
     对应 PriceManager 顶部的联动筛选功能
     修改点：将原有的按价格降序改为先按 sort_order 降序，再按 id 降序
     """
-    stmt = (
+    return (
         select(DBRepairPrice)
         .where(
             DBRepairPrice.category_id == category_id,
@@ -109,103 +284,311 @@ def get_prices_by_filter(db: Session, category_id: int, repair_type_id: int) ->
         # 排序逻辑：权重大的在前，同权重下最新的在前
         .order_by(DBRepairPrice.sort_order.desc(), DBRepairPrice.id.desc())
     )
-    return db.scalars(stmt).all()
 
 
-def upsert_repair_price(db: Session, price_in: RepairPriceCreate, price_id: Optional[int] = None) -> DBRepairPrice:
+def get_prices_by_filter(db: Session, category_id: int, repair_type_id: int) -> List[DBRepairPrice]:
+    return db.scalars(select_prices_by_filter(category_id, repair_type_id)).all()
+
+
+def get_all_prices(db: Session) -> List[DBRepairPrice]:
+    """检索索引和目录快照的全量加载"""
+    return db.scalars(select(DBRepairPrice)).all()
+
+
+def get_price_matrix(db: Session, category_id: Optional[int] = None) -> dict:
     """
-    新增或更新价格记录（支持 sort_order）
+    一次性取出价格表页面需要的全部数据：分类、维修种类、可见价格。
+    固定 3 条集合查询，代替前端 N×M 次 get_prices_by_filter 调用。
+    """
+    cat_stmt = select(DBCategory).order_by(DBCategory.sort_order.asc())
+    price_stmt = (
+        select(DBRepairPrice)
+        .where(DBRepairPrice.is_visible.is_(True))
+        # 与 get_prices_by_filter 保持一致：组合内权重大的在前，同权重下最新的在前
+        .order_by(
+            DBRepairPrice.category_id,
+            DBRepairPrice.repair_type_id,
+            DBRepairPrice.sort_order.desc(),
+            DBRepairPrice.id.desc()
+        )
+    )
+    if category_id is not None:
+        cat_stmt = cat_stmt.where(DBCategory.id == category_id)
+        price_stmt = price_stmt.where(DBRepairPrice.category_id == category_id)
+
+    return {
+        "categories": db.scalars(cat_stmt).all(),
+        "repair_types": get_repair_types(db),
+        "prices": db.scalars(price_stmt).all(),
+    }
+
+
+def upsert_repair_price(db: Session, price_in: RepairPriceCreate,
+                        price_id: Optional[int] = None) -> Optional[DBRepairPrice]:
+    """
+    新增或更新价格记录（支持 sort_order）；按 id 更新时记录不存在返回 None
     """
     # 将模型转为字典
     price_data = price_in.model_dump()
 
     if price_id:
         # 更新逻辑
-        stmt = update(DBRepairPrice).where(DBRepairPrice.id == price_id).values(**price_data)
-        db.execute(stmt)
+        return _update_price(db, price_id, price_data)
+
+    # 新增逻辑
+    with _price_write(db, price_data):
+        db_price = _insert_row(db, DBRepairPrice, price_data)
         db.commit()
-        return db.get(DBRepairPrice, price_id)
-    else:
-        # 新增逻辑
-        db_price = DBRepairPrice(**price_data)
-        db.add(db_price)
+    _touch_prices((db_price.category_id, db_price.repair_type_id), price_id=db_price.id)
+    price_index.upsert(db_price)
+    return db_price
+
+
+def _update_price(db: Session, price_id: int, values: dict) -> Optional[DBRepairPrice]:
+    """
+    按 id 更新价格并使新旧组合的缓存失效。
+    分类或维修种类在 values 中时，先按"组合不变"做条件更新（常见情况，一条语句）；
+    未命中说明组合被修改或记录不存在，此时才查询旧组合再更新。
+    """
+    pair = (values.get("category_id"), values.get("repair_type_id"))
+    old_pair = None
+    db_price = None
+    with _price_write(db, values, price_id):
+        if None not in pair:
+            db_price = _update_row(db, DBRepairPrice, [
+                DBRepairPrice.id == price_id,
+                DBRepairPrice.category_id == pair[0],
+                DBRepairPrice.repair_type_id == pair[1],
+            ], values)
+            old_pair = pair
+        if db_price is None:
+            old_pair = db.execute(
+                select(DBRepairPrice.category_id, DBRepairPrice.repair_type_id).where(DBRepairPrice.id == price_id)
+            ).first()
+            if old_pair is None:
+                db.rollback()
+                return None
+            db_price = _update_row(db, DBRepairPrice, [DBRepairPrice.id == price_id], values)
         db.commit()
-        db.refresh(db_price)
-        return db_price
+    _touch_prices(tuple(old_pair), (db_price.category_id, db_price.repair_type_id), price_id=price_id)
+    price_index.upsert(db_price)
+    return db_price
+
+
+class PriceConflict(Exception):
+    """单条价格写入与已有记录的自然键 (category_id, repair_type_id, model_name) 重复"""
+
+    def __init__(self, existing_id: int):
+        super().__init__(existing_id)
+        self.existing_id = existing_id
 
 
-def delete_repair_price(db: Session, price_id: int):
-    db.execute(delete(DBRepairPrice).where(DBRepairPrice.id == price_id))
+@contextmanager
+def _price_write(db: Session, values: dict, price_id: Optional[int] = None):
+    """
+    单条价格写入：违反自然键唯一约束时回滚并抛出 PriceConflict。
+    只在出错后才查询冲突的记录，正常写入不增加往返；其他约束错误（如外键）原样抛出。
+    """
+    try:
+        yield
+    except IntegrityError:
+        db.rollback()
+        existing_id = _conflicting_price_id(db, values, price_id)
+        if existing_id is None:
+            raise
+        raise PriceConflict(existing_id) from None
+
+
+def _conflicting_price_id(db: Session, values: dict, price_id: Optional[int] = None) -> Optional[int]:
+    """写入后的自然键已被其他记录占用时返回该记录的 id；按 id 更新时未传入的键列取当前值"""
+    key = {col: values[col] for col in PRICE_NATURAL_KEY if col in values}
+    if price_id is not None and len(key) < len(PRICE_NATURAL_KEY):
+        current = _row(db, DBRepairPrice, [DBRepairPrice.id == price_id])
+        if current is None:
+            return None
+        key = {col: key.get(col, getattr(current, col)) for col in PRICE_NATURAL_KEY}
+    if len(key) < len(PRICE_NATURAL_KEY):
+        return None
+    stmt = select(DBRepairPrice.id).where(*(getattr(DBRepairPrice, col) == value for col, value in key.items()))
+    if price_id is not None:
+        stmt = stmt.where(DBRepairPrice.id != price_id)
+    return db.scalar(stmt)
+
+
+def delete_repair_price(db: Session, price_id: int) -> bool:
+    """返回记录是否存在（已删除）"""
+    _tombstone(db, "price", DBRepairPrice, DBRepairPrice.id == price_id)
+    deleted = _delete_rows(db, DBRepairPrice, DBRepairPrice.id == price_id)
     db.commit()
+    if deleted:
+        _touch_prices(price_id=price_id)
+        price_index.remove(price_id)
+    return deleted > 0
+
+
+def _upsert(db: Session, model, rows: List[dict], key_columns: Sequence[str], values: dict) -> None:
+    """
+    按自然键 key_columns 批量 upsert，不提交。
+    values 为 {列名: fn(new) -> 更新表达式}，new 代表冲突时"本次要插入的值"。
+    MySQL / SQLite / PostgreSQL 用原生 upsert 一条语句完成；其他方言回退为
+    SELECT ... FOR UPDATE 锁定已有的行后分别 INSERT 新行、UPDATE 已有的行。
+    """
+    stmt = _upsert_statement(db, model, rows, key_columns, values)
+    if stmt is not None:
+        db.execute(stmt)
+        return
+
+    table = model.__table__
+    keys = [table.c[k] for k in key_columns]
+    # 同一批内自然键重复时以最后一行为准（与原生 upsert 的批内去重一致）
+    wanted = {tuple(row[k] for k in key_columns): row for row in rows}
+
+    def match(key):
+        return and_(*(column == value for column, value in zip(keys, key)))
+
+    existing = {tuple(row) for row in db.execute(select(*keys).where(or_(*map(match, wanted))).with_for_update())}
+    new_rows = [row for key, row in wanted.items() if key not in existing]
+    if new_rows:
+        db.execute(insert(table), new_rows)
+    for key in existing:
+        row = wanted[key]
+        db.execute(update(table).where(match(key)).values({col: fn(row) for col, fn in values.items()}))
+
+
+def _upsert_statement(db: Session, model, rows: List[dict], key_columns: Sequence[str], values: dict):
+    """
+    按数据库方言生成原生 upsert 语句，方言不支持时返回 None（由 _upsert 回退）：
+    MySQL 用 INSERT ... ON DUPLICATE KEY UPDATE，SQLite / PostgreSQL 用 INSERT ... ON CONFLICT DO UPDATE。
+    new 为 MySQL 的 stmt.inserted / ON CONFLICT 的 stmt.excluded。
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert
+        stmt = insert(model).values(rows)
+        return stmt.on_duplicate_key_update({col: fn(stmt.inserted) for col, fn in values.items()})
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        stmt = insert(model).values(rows)
+        return stmt.on_conflict_do_update(
+            index_elements=list(key_columns),
+            set_={col: fn(stmt.excluded) for col, fn in values.items()}
+        )
+    return None
+
+
+def select_price_export(updated_since: Optional[datetime.datetime] = None):
+    """
+    全量价格导出：只取需要的列（不构造 ORM 对象），并带上分类名和维修种类名。
+    按 ix_repair_prices_cat_rt_sort 的顺序输出，便于服务端游标流式读取。
+    """
+    stmt = (
+        select(
+            DBRepairPrice.id,
+            DBRepairPrice.category_id,
+            DBCategory.name.label("category_name"),
+            DBRepairPrice.repair_type_id,
+            DBRepairType.name.label("repair_type_name"),
+            DBRepairPrice.model_name,
+            DBRepairPrice.price,
+            DBRepairPrice.price_suffix,
+            DBRepairPrice.is_visible,
+            DBRepairPrice.sort_order,
+            DBRepairPrice.updated_at,
+        )
+        .join(DBCategory, DBCategory.id == DBRepairPrice.category_id)
+        .join(DBRepairType, DBRepairType.id == DBRepairPrice.repair_type_id)
+        .order_by(
+            DBRepairPrice.category_id,
+            DBRepairPrice.repair_type_id,
+            DBRepairPrice.sort_order.desc(),
+            DBRepairPrice.id.desc()
+        )
+    )
+    if updated_since is not None:
+        stmt = stmt.where(DBRepairPrice.updated_at >= updated_since)
+    return stmt
+
+
+PRICE_NATURAL_KEY = ("category_id", "repair_type_id", "model_name")
+
+
+def bulk_upsert_repair_prices(db: Session, prices: List[RepairPriceCreate]) -> int:
+    """
+    按自然键 (category_id, repair_type_id, model_name) 批量 upsert 价格，一条语句 + 一次提交。
+    同一批内自然键重复时以最后一行为准。返回写入的行数。
+    """
+    rows = {}
+    for price_in in prices:
+        row = price_in.model_dump()
+        rows[tuple(row[k] for k in PRICE_NATURAL_KEY)] = row
+    if not rows:
+        return 0
+
+    update_columns = [c for c in RepairPriceCreate.model_fields if c not in PRICE_NATURAL_KEY]
+    values = {col: (lambda new, col=col: new[col]) for col in update_columns}
+    # ON DUPLICATE / ON CONFLICT 分支不会触发 ORM 的 onupdate，需要显式更新时间
+    values["updated_at"] = lambda new: func.now()
+    try:
+        _upsert(db, DBRepairPrice, list(rows.values()), PRICE_NATURAL_KEY, values)
+        db.commit()
+    except SQLAlchemyError:
+        db.rollback()
+        raise
+    _touch_prices(*((row["category_id"], row["repair_type_id"]) for row in rows.values()))
+    return len(rows)
 
 
 # -----------------------------------------------------
 # 1. 更新通知 (News)
 # -----------------------------------------------------
-def update_news(db: Session, news_id: int, news_in: NewsCreate) -> DBNews:
-    db_news = db.get(DBNews, news_id)
+def update_news(db: Session, news_id: int, news_in: NewsCreate) -> Optional[DBNews]:
+    # 只更新请求中存在的字段；记录不存在时返回 None
+    update_data = news_in.model_dump(exclude_unset=True)
+    db_news = _update_row(db, DBNews, [DBNews.id == news_id], update_data)
+    db.commit()
     if db_news:
-        # 将 NewsCreate 模型转为字典并更新到数据库对象
-        update_data = news_in.model_dump(exclude_unset=True)
-        for key, value in update_data.items():
-            setattr(db_news, key, value)
-
-        db.commit()
-        db.refresh(db_news)
+        _touch("news", entity_id=news_id)
     return db_news
 
 
 # -----------------------------------------------------
 # 2. 更新机种分类 (Category)
 # -----------------------------------------------------
-def update_category(db: Session, cat_id: int, cat_in: CategoryCreate) -> DBCategory:
-    db_cat = db.get(DBCategory, cat_id)
+def update_category(db: Session, cat_id: int, cat_in: CategoryCreate) -> Optional[DBCategory]:
+    update_data = cat_in.model_dump(exclude_unset=True)
+    db_cat = _update_row(db, DBCategory, [DBCategory.id == cat_id], update_data)
+    db.commit()
     if db_cat:
-        update_data = cat_in.model_dump(exclude_unset=True)
-        for key, value in update_data.items():
-            setattr(db_cat, key, value)
-
-        db.commit()
-        db.refresh(db_cat)
+        _touch("categories", entity_id=cat_id)
     return db_cat
 
 
 # -----------------------------------------------------
 # 3. 更新维修种类 (RepairType)
 # -----------------------------------------------------
-def update_repair_type(db: Session, rt_id: int, rt_in: RepairTypeCreate) -> DBRepairType:
-    db_rt = db.get(DBRepairType, rt_id)
+def update_repair_type(db: Session, rt_id: int, rt_in: RepairTypeCreate) -> Optional[DBRepairType]:
+    update_data = rt_in.model_dump(exclude_unset=True)
+    db_rt = _update_row(db, DBRepairType, [DBRepairType.id == rt_id], update_data)
+    db.commit()
     if db_rt:
-        update_data = rt_in.model_dump(exclude_unset=True)
-        for key, value in update_data.items():
-            setattr(db_rt, key, value)
-
-        db.commit()
-        db.refresh(db_rt)
+        _touch("repair_types", entity_id=rt_id)
     return db_rt
 
 
 # -----------------------------------------------------
 # 4. 更新维修价格 (RepairPrice)
 # -----------------------------------------------------
-def update_repair_price(db: Session, price_id: int, price_in: RepairPriceCreate) -> DBRepairPrice:
+def update_repair_price(db: Session, price_id: int, price_in: RepairPriceCreate) -> Optional[DBRepairPrice]:
     """
-    显式更新维修价格（支持 sort_order）
+    显式更新维修价格（支持 sort_order）；记录不存在时返回 None
     """
-    db_price = db.get(DBRepairPrice, price_id)
-    if db_price:
-        # exclude_unset=True 确保只更新请求中存在的字段（如只更新排序权重）
-        update_data = price_in.model_dump(exclude_unset=True)
-        for key, value in update_data.items():
-            setattr(db_price, key, value)
-
-        # SQLAlchemy 的 onupdate=func.now() 会自动处理时间，
-        # 但如果想手动强制刷新 updated_at，保留此行：
-        db_price.updated_at = datetime.datetime.now()
-
-        db.commit()
-        db.refresh(db_price)
-    return db_price
+    # exclude_unset=True 确保只更新请求中存在的字段（如只更新排序权重）；
+    # updated_at 由列的 onupdate=func.now() 在 UPDATE 语句中设置
+    update_data = price_in.model_dump(exclude_unset=True)
+    return _update_price(db, price_id, update_data)
 
 
 def get_all_faqs(db: Session) -> List[DBFaq]:
@@ -216,61 +599,206 @@ def get_all_faqs(db: Session) -> List[DBFaq]:
     return db.scalars(stmt).all()
 
 
+def select_faq_page(limit: int, after: Optional[Tuple[int, int]] = None):
+    """keyset 分页：取排在 after=(sort_order, id) 之后的 limit 条，走 ix_faqs_sort_order_id"""
+    stmt = select(DBFaq).order_by(DBFaq.sort_order.desc(), DBFaq.id.desc()).limit(limit)
+    if after is not None:
+        stmt = stmt.where(tuple_(DBFaq.sort_order, DBFaq.id) < tuple_(*after))
+    return stmt
+
+
+def get_faq_page(db: Session, limit: int,
+                 after: Optional[Tuple[int, int]] = None) -> Tuple[List[DBFaq], Optional[Tuple]]:
+    """返回 (本页数据, 下一页的起点键)；多取一条用来判断是否还有下一页"""
+    rows = db.scalars(select_faq_page(limit + 1, after)).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, (rows[-1].sort_order, rows[-1].id)
+
+
 def create_faq(db: Session, faq_in: FAQCreate) -> DBFaq:
     """
     新增 FAQ 记录
     """
-    db_faq = DBFaq(**faq_in.model_dump())
-    db.add(db_faq)
+    db_faq = _insert_row(db, DBFaq, faq_in.model_dump())
     db.commit()
-    db.refresh(db_faq)
+    _touch("faqs", entity_id=db_faq.id)
     return db_faq
 
 
-def update_faq(db: Session, faq_id: int, faq_in: FAQCreate) -> DBFaq:
+def update_faq(db: Session, faq_id: int, faq_in: FAQCreate) -> Optional[DBFaq]:
     """
-    更新 FAQ 记录（支持全量更新及排序权重更新）
+    更新 FAQ 记录（支持全量更新及排序权重更新）；记录不存在时返回 None
     """
-    db_faq = db.get(DBFaq, faq_id)
+    # 使用 exclude_unset=True 可以灵活处理只更新 sort_order 的场景
+    update_data = faq_in.model_dump(exclude_unset=True)
+    db_faq = _update_row(db, DBFaq, [DBFaq.id == faq_id], update_data)
+    db.commit()
     if db_faq:
-        # 使用 exclude_unset=True 可以灵活处理只更新 sort_order 的场景
-        update_data = faq_in.model_dump(exclude_unset=True)
-        for key, value in update_data.items():
-            setattr(db_faq, key, value)
-
-        db.commit()
-        db.refresh(db_faq)
+        _touch("faqs", entity_id=faq_id)
     return db_faq
 
 
-def delete_faq(db: Session, faq_id: int):
+def delete_faq(db: Session, faq_id: int) -> bool:
     """
-    删除 FAQ 记录
+    删除 FAQ 记录，返回记录是否存在（已删除）
     """
-    db_faq = db.get(DBFaq, faq_id)
-    if db_faq:
-        db.delete(db_faq)
-        db.commit()
-    return db_faq
+    _tombstone(db, "faq", DBFaq, DBFaq.id == faq_id)
+    deleted = _delete_rows(db, DBFaq, DBFaq.id == faq_id)
+    db.commit()
+    if deleted:
+        _touch("faqs", entity_id=faq_id)
+    return deleted > 0
+
+
+# -----------------------------------------------------
+# 拖拽排序 (批量更新 sort_order)
+# -----------------------------------------------------
+def _reorder(db: Session, model, ids: List[int], descending: bool) -> int:
+    """
+    按 ids 的顺序重写 sort_order：一条 UPDATE ... SET sort_order = CASE id WHEN ... END，一次提交。
+    descending=True 的表按 sort_order 降序显示（价格、FAQ），第一个 id 得到最大的权重；
+    否则按升序显示（分类、维修种类），第一个 id 得到 1。
+    只更新值真正变化的行，返回变化的行数。
+    """
+    total = len(ids)
+    weights = {item_id: (total - index if descending else index + 1) for index, item_id in enumerate(ids)}
+    new_order = case(weights, value=model.id)
+    stmt = (
+        update(model)
+        .where(model.id.in_(ids), model.sort_order.is_distinct_from(new_order))
+        .values(sort_order=new_order)
+        .execution_options(synchronize_session=False)
+    )
+    result = db.execute(stmt)
+    db.commit()
+    return result.rowcount
+
+
+def reorder_repair_prices(db: Session, ids: List[int]) -> int:
+    updated = _reorder(db, DBRepairPrice, ids, descending=True)
+    _touch_prices()
+    return updated
+
+
+def reorder_faqs(db: Session, ids: List[int]) -> int:
+    updated = _reorder(db, DBFaq, ids, descending=True)
+    _touch("faqs")
+    return updated
+
+
+def reorder_categories(db: Session, ids: List[int]) -> int:
+    updated = _reorder(db, DBCategory, ids, descending=False)
+    _touch("categories")
+    return updated
+
+
+def reorder_repair_types(db: Session, ids: List[int]) -> int:
+    updated = _reorder(db, DBRepairType, ids, descending=False)
+    _touch("repair_types")
+    return updated
 
 
 def get_site_config(db: Session) -> DBSiteConfig:
     # 默认获取第一条记录
-    config = db.query(DBSiteConfig).filter(DBSiteConfig.id == 1).first()
-    if not config:
-        # 如果不存在则初始化一条空数据
-        config = DBSiteConfig(id=1, hero_title="", hero_content="")
-        db.add(config)
+    config = _row(db, DBSiteConfig, [DBSiteConfig.id == 1])
+    if config is None:
+        # 如果不存在则初始化一条空数据（一条 INSERT ... RETURNING，不再 refresh）
+        config = _insert_row(db, DBSiteConfig, {"id": 1, "hero_title": "", "hero_content": ""})
         db.commit()
-        db.refresh(config)
+        _touch("site_configs", entity_id=config.id)
     return config
 
 
 def update_site_config(db: Session, config_in: SiteConfigBase) -> DBSiteConfig:
-    db_config = get_site_config(db)
     update_data = config_in.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_config, key, value)
+    db_config = _update_row(db, DBSiteConfig, [DBSiteConfig.id == 1], update_data)
+    if db_config is None:
+        # 配置行尚不存在（首次保存）：与 get_site_config 相同的初始值上应用本次修改
+        db_config = _insert_row(db, DBSiteConfig, {"id": 1, "hero_title": "", "hero_content": "", **update_data})
     db.commit()
-    db.refresh(db_config)
+    _touch("site_configs", entity_id=db_config.id)
     return db_config
+
+
+# -----------------------------------------------------
+# 增量同步 (/sync)
+# -----------------------------------------------------
+SYNC_MODELS = {"price": DBRepairPrice, "faq": DBFaq, "news": DBNews}
+
+
+def select_changed(model, since: datetime.datetime):
+    """since 之后新增或修改的行，走各表的 updated_at 索引"""
+    return select(model).where(model.updated_at >= since).order_by(model.updated_at, model.id)
+
+
+def select_tombstones(since: datetime.datetime):
+    return (
+        select(DBSyncTombstone)
+        .where(DBSyncTombstone.deleted_at >= since)
+        .order_by(DBSyncTombstone.deleted_at, DBSyncTombstone.id)
+    )
+
+
+def get_sync_delta(db: Session, since: Optional[datetime.datetime] = None) -> dict:
+    """
+    返回 since 之后的变更：{"now", "full", "price", "faq", "news", "deleted"}。
+    now 取数据库时间，与 updated_at / deleted_at 使用同一时钟。
+    since 为空或早于删除记录的保留期时返回全量数据 (full=True)，客户端应整体替换本地数据。
+    """
+    now = db.scalar(select(func.now()))
+    full = since is None or since < now - datetime.timedelta(days=SYNC_TOMBSTONE_RETENTION_DAYS)
+    delta = {"now": now, "full": full}
+    for entity, model in SYNC_MODELS.items():
+        stmt = select(model).order_by(model.id) if full else select_changed(model, since)
+        delta[entity] = db.scalars(stmt).all()
+    delta["deleted"] = [] if full else db.scalars(select_tombstones(since)).all()
+    return delta
+
+
+# -----------------------------------------------------
+# 竞品价格抓取 (app/crawler)
+# -----------------------------------------------------
+def get_model_names(db: Session) -> List[str]:
+    """我方全部机型名（去重），抓取结果按它们匹配"""
+    return db.scalars(select(DBRepairPrice.model_name).distinct()).all()
+
+
+def get_crawl_pages(db: Session, urls: Sequence[str]) -> List[DBCrawlPage]:
+    if not urls:
+        return []
+    return db.scalars(select(DBCrawlPage).where(DBCrawlPage.url.in_(urls))).all()
+
+
+COMPETITOR_PRICE_KEY = ("source", "url", "competitor_model_name")
+
+
+def save_competitor_prices(db: Session, rows: List[dict]) -> int:
+    """按 (source, url, competitor_model_name) 批量 upsert 竞品价格，一条语句 + 一次提交"""
+    if not rows:
+        return 0
+    values = {col: (lambda new, col=col: new[col]) for col in ("model_name", "repair_type_id", "price")}
+    values["fetched_at"] = lambda new: func.now()
+    try:
+        _upsert(db, DBCompetitorPrice, rows, COMPETITOR_PRICE_KEY, values)
+        db.commit()
+    except SQLAlchemyError:
+        db.rollback()
+        raise
+    return len(rows)
+
+
+def save_crawl_pages(db: Session, pages: List[dict]) -> int:
+    """记录页面的 ETag / Last-Modified 和状态码；pages 为 {url, etag, last_modified, status}"""
+    if not pages:
+        return 0
+    values = {col: (lambda new, col=col: new[col]) for col in ("etag", "last_modified", "status")}
+    values["checked_at"] = lambda new: func.now()
+    try:
+        _upsert(db, DBCrawlPage, pages, ("url",), values)
+        db.commit()
+    except SQLAlchemyError:
+        db.rollback()
+        raise
+    return len(pages)
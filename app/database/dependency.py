@@ -1,15 +1,46 @@
-from .database import SessionLocal
+from .database import SessionLocal, AsyncSessionLocal
+from ..config import USE_ASYNC_DB
+from contextlib import asynccontextmanager
+from fastapi import Request
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import Generator
+from typing import AsyncGenerator, AsyncIterator, Union
 
+# 路由中统一使用的会话类型：异步模式下为 AsyncSession，回退模式下为同步 Session
+DBSession = Union[AsyncSession, Session]
 
-def get_db() -> Generator[Session, None, None]:
+# 只读请求的 HTTP 方法，其余方法的整个请求都在主库上执行
+_READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+@asynccontextmanager
+async def session_scope(primary: bool = False) -> AsyncIterator[DBSession]:
     """
-    FastAPI 依赖函数。
-    在每个请求开始时创建会话 (Session)，在请求结束时关闭会话。
+    在依赖注入之外按需打开一个会话（例如缓存未命中时才需要查库的场景）。
+    USE_ASYNC_DB=True 时返回 AsyncSession，否则返回同步 Session。
+    primary=True 时所有语句都走主库（配置了只读副本时才有区别）。
     """
+    if USE_ASYNC_DB:
+        async with AsyncSessionLocal() as db:
+            if primary:
+                db.info["primary"] = True
+            yield db
+        return
+
     db = SessionLocal()
+    if primary:
+        db.info["primary"] = True
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_db(request: Request) -> AsyncGenerator[DBSession, None]:
+    """
+    FastAPI 依赖函数。
+    在每个请求开始时创建会话 (Session)，在请求结束时关闭会话。
+    写请求（非 GET）的读取也走主库，避免基于副本上的旧数据做更新。
+    """
+    async with session_scope(primary=request.method not in _READ_METHODS) as db:
+        yield db
@@ -0,0 +1,72 @@
+"""
+对热点 SQL 执行 EXPLAIN，报告全表扫描。
+
+用法（在仓库根目录）::
+
+    python -m app.database.explain
+
+任一语句出现全表扫描时以退出码 1 结束，可放进部署前检查。
+支持 MySQL（EXPLAIN，type=ALL 视为全表扫描）和 SQLite（EXPLAIN QUERY PLAN，"SCAN <table>" 视为全表扫描）。
+"""
+import datetime
+import sys
+from typing import Callable, List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.sql import Select
+
+from .. import crud
+from .database import engine
+
+# (名称, 语句构造函数)。参数取值不影响执行计划，只需类型正确
+HOT_STATEMENTS: List[Tuple[str, Callable[[], Select]]] = [
+    ("get_prices_by_filter", lambda: crud.select_prices_by_filter(1, 1)),
+    ("get_user_by_token", lambda: crud.select_user_by_token("token")),
+    ("get_news_page", lambda: crud.select_news_page(20, (datetime.date(2026, 1, 1), 1))),
+    ("get_faq_page", lambda: crud.select_faq_page(20, (0, 1))),
+    ("sync delta: prices", lambda: crud.select_changed(crud.DBRepairPrice, datetime.datetime(2026, 1, 1))),
+    ("sync delta: faqs", lambda: crud.select_changed(crud.DBFaq, datetime.datetime(2026, 1, 1))),
+    ("sync delta: news", lambda: crud.select_changed(crud.DBNews, datetime.datetime(2026, 1, 1))),
+    ("sync delta: tombstones", lambda: crud.select_tombstones(datetime.datetime(2026, 1, 1))),
+]
+
+
+def _compile(conn: Connection, stmt: Select) -> str:
+    return str(stmt.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+
+
+def explain(conn: Connection, stmt: Select) -> Tuple[List[str], List[str]]:
+    """返回 (执行计划的每一行, 其中的全表扫描)"""
+    sql = _compile(conn, stmt)
+    if conn.dialect.name == "sqlite":
+        rows = conn.execute(text("EXPLAIN QUERY PLAN " + sql)).mappings().all()
+        plan = [row["detail"] for row in rows]
+        # "SCAN t USING INDEX ..." 是按索引顺序扫描，不算全表扫描
+        full_scans = [line for line in plan if line.startswith("SCAN ") and "USING" not in line]
+        return plan, full_scans
+
+    rows = conn.execute(text("EXPLAIN " + sql)).mappings().all()
+    plan = [
+        f"table={row['table']} type={row['type']} key={row['key']} rows={row['rows']} extra={row['Extra']}"
+        for row in rows
+    ]
+    full_scans = [line for line, row in zip(plan, rows) if row["type"] == "ALL"]
+    return plan, full_scans
+
+
+def main() -> int:
+    failed = 0
+    with engine.connect() as conn:
+        for name, build in HOT_STATEMENTS:
+            plan, full_scans = explain(conn, build())
+            status = "FULL SCAN" if full_scans else "ok"
+            print(f"[{status}] {name}")
+            for line in plan:
+                print(f"    {line}")
+            failed += bool(full_scans)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+# database/instrumentation.py
+import heapq
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class QueryStats:
+    """一个请求内执行的 SQL 统计：次数、总耗时、最慢的几条语句、每条语句的执行次数"""
+
+    __slots__ = ("count", "total", "slowest", "statements", "keep_slowest")
+
+    def __init__(self, keep_slowest: int):
+        self.count = 0
+        self.total = 0.0
+        self.keep_slowest = keep_slowest
+        # 小顶堆 (耗时, 语句)，只保留最慢的 keep_slowest 条
+        self.slowest: List[Tuple[float, str]] = []
+        # 参数化后的 SQL 文本 -> 执行次数，用于发现 N+1
+        self.statements: Dict[str, int] = {}
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.statements[statement] = self.statements.get(statement, 0) + 1
+        if len(self.slowest) < self.keep_slowest:
+            heapq.heappush(self.slowest, (seconds, statement))
+        elif self.slowest and seconds > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, (seconds, statement))
+
+    def slowest_statements(self) -> List[Tuple[float, str]]:
+        return sorted(self.slowest, reverse=True)
+
+    def repeated_statements(self, threshold: int) -> List[Tuple[str, int]]:
+        """同一请求内执行次数 >= threshold 的相同语句（典型的 N+1：循环里触发懒加载）"""
+        return sorted(
+            ((stmt, n) for stmt, n in self.statements.items() if n >= threshold),
+            key=lambda item: item[1],
+            reverse=True,
+        )
+
+
+# 当前请求的统计对象；请求之外（启动、迁移、后台任务）为 None，事件回调直接跳过
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("current_query_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_query_stats.get() is not None:
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current_query_stats.get()
+    if stats is None:
+        return
+    starts = conn.info.get("query_start_time")
+    if starts:
+        stats.record(statement, time.perf_counter() - starts.pop())
+
+
+def _handle_error(exception_context):
+    # 执行失败时 after_cursor_execute 不会触发，丢弃对应的开始时间
+    conn = exception_context.connection
+    if conn is not None and current_query_stats.get() is not None:
+        starts = conn.info.get("query_start_time")
+        if starts:
+            starts.pop()
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    在同步 Engine 上注册执行前后的事件钩子。
+    异步引擎传入 async_engine.sync_engine：run_sync 在同一线程、同一上下文中执行，ContextVar 可见；
+    同步回退模式下 run_in_threadpool 会复制上下文，线程中同样能拿到当前请求的统计对象。
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Text, Date, DateTime, ForeignKey, Numeric, Boolean, func
+from sqlalchemy import Column, String, Integer, Text, Date, DateTime, ForeignKey, Numeric, Boolean, Index, UniqueConstraint, func
 from sqlalchemy.orm import relationship
 from .database import Base
 
@@ -7,7 +7,9 @@ class DBUser(Base):
     __tablename__ = "user"
     loginid = Column(String(20), primary_key=True, index=True)
     password = Column(String(300), nullable=False)
-    token = Column(String(300), nullable=True)
+    # 每个需要认证的请求都会按 token 查询
+    token = Column(String(300), nullable=True, index=True)
+    token_expires_at = Column(DateTime, nullable=True)  # 为 NULL 时视为已过期
 
     def __repr__(self):
         return f"DBUser(loginid='{self.loginid}')"
@@ -15,11 +17,18 @@ class DBUser(Base):
 
 class DBNews(Base):
     __tablename__ = "news"
+    __table_args__ = (
+        # 通知列表的 keyset 分页：ORDER BY publish_date DESC, id DESC
+        Index("ix_news_publish_date_id", "publish_date", "id"),
+        # /sync 按修改时间取增量
+        Index("ix_news_updated_at", "updated_at"),
+    )
     id = Column(Integer, primary_key=True, autoincrement=True)
     title = Column(String(255), nullable=False)
     content = Column(Text, nullable=False)
     publish_date = Column(Date, nullable=False)
     created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
 
     def __repr__(self):
         return f"DBNews(id={self.id}, title='{self.title}')"
@@ -61,6 +70,14 @@ class DBRepairType(Base):
 # -----------------------------------------------------
 class DBRepairPrice(Base):
     __tablename__ = "repair_prices"
+    __table_args__ = (
+        # 对应 get_prices_by_filter：等值过滤 (category_id, repair_type_id) + ORDER BY sort_order DESC, id DESC，
+        # 索引可直接按序反向扫描，无需 filesort
+        Index("ix_repair_prices_cat_rt_sort", "category_id", "repair_type_id", "sort_order", "id"),
+        # 自然键：批量导入按它做 upsert
+        UniqueConstraint("category_id", "repair_type_id", "model_name", name="uq_repair_prices_natural_key"),
+        Index("ix_repair_prices_updated_at", "updated_at"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     category_id = Column(Integer, ForeignKey("categories.id", ondelete="CASCADE"), nullable=False)
@@ -86,18 +103,44 @@ class DBRepairPrice(Base):
 
 class DBFaq(Base):
     __tablename__ = "faqs"
+    __table_args__ = (
+        # FAQ 列表的 keyset 分页：ORDER BY sort_order DESC, id DESC
+        Index("ix_faqs_sort_order_id", "sort_order", "id"),
+        Index("ix_faqs_updated_at", "updated_at"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     title = Column(Text, nullable=False)  # 对应 SQL 中的 text
     content = Column(Text, nullable=False)  # 对应 SQL 中的 text
-    sort_order = Column(Integer, default=0)
+    # keyset 分页的游标包含 sort_order，不允许为 NULL（迁移 0008）
+    sort_order = Column(Integer, default=0, server_default="0", nullable=False)
     is_visible = Column(Boolean, default=True)  # SQL 中 tinyint(1) 对应 Boolean
     created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
 
     def __repr__(self):
         return f"<DBFaq(id={self.id}, title='{self.title[:20]}...', sort={self.sort_order})>"
 
 
+class DBSyncTombstone(Base):
+    """
+    被删除的价格 / FAQ / 通知，供 /sync 下发删除记录。
+    超过 SYNC_TOMBSTONE_RETENTION_DAYS 的记录会被清理，更早的 token 需要全量同步。
+    """
+    __tablename__ = "sync_tombstones"
+    __table_args__ = (
+        Index("ix_sync_tombstones_deleted_at", "deleted_at"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    entity = Column(String(20), nullable=False)  # price / faq / news
+    entity_id = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime, nullable=False, server_default=func.now())
+
+    def __repr__(self):
+        return f"<DBSyncTombstone({self.entity}:{self.entity_id})>"
+
+
 class DBSiteConfig(Base):
     __tablename__ = "site_configs"
 
@@ -120,3 +163,39 @@ class DBSiteConfig(Base):
 
     def __repr__(self):
         return f"<DBSiteConfig(id={self.id}, hero_title='{self.hero_title[:15]}...')>"
+
+
+class DBCompetitorPrice(Base):
+    """
+    竞品网站的价格（app/crawler 抓取），按规范化后的机型名对应到我方的 DBRepairPrice.model_name。
+    自然键为 (source, url, competitor_model_name)，重复抓取时 upsert。
+    """
+    __tablename__ = "competitor_prices"
+    __table_args__ = (
+        UniqueConstraint("source", "url", "competitor_model_name", name="uq_competitor_prices_source_item"),
+        # 按我方机型名查看竞品价格
+        Index("ix_competitor_prices_model_name", "model_name"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    source = Column(String(50), nullable=False)
+    url = Column(String(255), nullable=False)
+    model_name = Column(String(100), nullable=False)  # 我方机型名
+    competitor_model_name = Column(String(200), nullable=False)  # 竞品页面上的原始写法
+    repair_type_id = Column(Integer, ForeignKey("repair_types.id", ondelete="CASCADE"), nullable=True)
+    price = Column(Numeric(10, 2), nullable=False)
+    fetched_at = Column(DateTime, nullable=False, server_default=func.now())
+
+    def __repr__(self):
+        return f"<DBCompetitorPrice(source='{self.source}', model='{self.model_name}', price={self.price})>"
+
+
+class DBCrawlPage(Base):
+    """抓取过的页面及其缓存校验信息，下次抓取时用于条件请求 (If-None-Match / If-Modified-Since)"""
+    __tablename__ = "crawl_pages"
+
+    url = Column(String(255), primary_key=True)
+    etag = Column(String(255), nullable=True)
+    last_modified = Column(String(64), nullable=True)
+    status = Column(Integer, nullable=True)  # 最近一次的 HTTP 状态码
+    checked_at = Column(DateTime, nullable=False, server_default=func.now())
@@ -0,0 +1,190 @@
+# database/pool.py
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import exc, text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from starlette.concurrency import run_in_threadpool
+
+from ..config import (
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_RECYCLE, DB_POOL_TIMEOUT, DB_POOL_PRE_PING,
+)
+
+logger = logging.getLogger("app.db.pool")
+
+
+class CheckoutStats:
+    """从连接池取连接的等待时间统计（包括池满时的排队时间和新建连接的时间）"""
+
+    def __init__(self, window: int = 1024):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.timeouts = 0
+        # 最近 window 次的等待时间，用于计算分位数
+        self._recent: deque = deque(maxlen=window)
+        # 同步回退模式下在线程池中取连接
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.total += seconds
+            if seconds > self.max:
+                self.max = seconds
+            self._recent.append(seconds)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            recent = sorted(self._recent)
+        return {
+            "count": self.count,
+            "timeouts": self.timeouts,
+            "avg_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "max_ms": round(self.max * 1000, 3),
+            "p95_ms": round(recent[min(len(recent) - 1, int(len(recent) * 0.95))] * 1000, 3) if recent else 0.0,
+        }
+
+
+class _CheckoutTimingMixin:
+    """在 _do_get（池内取连接的唯一入口）外计时。Pool.recreate() 用 self.__class__ 重建，统计随之重置"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkout_stats = CheckoutStats()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            self.checkout_stats.record_timeout()
+            raise
+        self.checkout_stats.record(time.perf_counter() - start)
+        return conn
+
+
+class TimedQueuePool(_CheckoutTimingMixin, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(_CheckoutTimingMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def engine_options(url: str) -> dict:
+    """
+    根据 DSN 生成 create_engine / create_async_engine 的连接池参数。
+    SQLite 内存库等不使用 QueuePool 的方言只设置 pool_pre_ping，沿用方言默认的连接池。
+    """
+    parsed = make_url(url)
+    pool_class = parsed.get_dialect().get_pool_class(parsed)
+    options = {"pool_pre_ping": DB_POOL_PRE_PING}
+    if issubclass(pool_class, QueuePool):
+        options.update(
+            poolclass=TimedAsyncAdaptedQueuePool if issubclass(pool_class, AsyncAdaptedQueuePool) else TimedQueuePool,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_recycle=DB_POOL_RECYCLE,
+            pool_timeout=DB_POOL_TIMEOUT,
+        )
+    return options
+
+
+def pool_stats(engine: Engine) -> dict:
+    pool = engine.pool
+    stats = {"pool": type(pool).__name__, "status": pool.status()}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            idle=pool.checkedin(),
+            # QueuePool.overflow() 在未达到 pool_size 时为负数，这里只报告已使用的溢出连接数
+            overflow=max(pool.overflow(), 0),
+            max_overflow=pool._max_overflow,
+            timeout=pool.timeout(),
+        )
+    checkout = getattr(pool, "checkout_stats", None)
+    if checkout is not None:
+        stats["checkout_wait"] = checkout.snapshot()
+    return stats
+
+
+class LivenessChecker:
+    """
+    后台定期对各个引擎执行 SELECT 1，用来替代每次取连接都执行的 pool_pre_ping。
+    检查失败且被识别为断连时，SQLAlchemy 会使该引擎的整个连接池失效，
+    请求随后取到的都是新连接；这里只负责触发和记录结果。
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._engines: Dict[str, object] = {}
+        self._callbacks: Dict[str, Callable[[Optional[str]], None]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.results: Dict[str, dict] = {}
+
+    def add(self, name: str, engine, on_result: Optional[Callable[[Optional[str]], None]] = None) -> None:
+        """on_result(error)：每次检查后回调，成功时 error 为 None"""
+        self._engines[name] = engine
+        if on_result is not None:
+            self._callbacks[name] = on_result
+
+    def start(self) -> None:
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def check_all(self) -> None:
+        for name, engine in self._engines.items():
+            start = time.perf_counter()
+            try:
+                if isinstance(engine, AsyncEngine):
+                    async with engine.connect() as conn:
+                        await conn.execute(text("SELECT 1"))
+                else:
+                    await run_in_threadpool(_ping, engine)
+                error = None
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                logger.warning("liveness check failed for %s engine: %s", name, error)
+            self.results[name] = {
+                "ok": error is None,
+                "error": error,
+                "latency_ms": round((time.perf_counter() - start) * 1000, 3),
+                "checked_at": time.time(),
+            }
+            callback = self._callbacks.get(name)
+            if callback is not None:
+                callback(error)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.check_all()
+
+    def snapshot(self) -> dict:
+        return {"interval": self.interval, "running": self._task is not None, "engines": self.results}
+
+
+def _ping(engine: Engine) -> None:
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
@@ -0,0 +1,157 @@
+# database/routing.py
+import itertools
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+
+@dataclass
+class Replica:
+    name: str
+    # Session 绑定用的同步 Engine（异步模式下为 AsyncEngine.sync_engine）
+    engine: Engine
+    down_until: float = 0.0
+    last_error: Optional[str] = None
+
+    @property
+    def healthy(self) -> bool:
+        return self.down_until <= time.monotonic()
+
+
+class ReplicaSet:
+    """
+    只读副本的选择与健康状态。
+
+    - 负载均衡：round_robin（轮询）或 least_connections（当前借出连接最少）
+    - 副本连接失败或存活检查失败后，在 retry_seconds 内不再选择它；期间的读请求回退到主库
+    - 任意写事务提交后的 sticky_seconds 内，所有读都走主库（读己之写）。
+      进程内缓存在写后会被失效并重新加载，这也保证重新加载的数据不是来自尚未同步的副本
+    """
+
+    def __init__(self, replicas: List[Replica], balance: str, sticky_seconds: float, retry_seconds: float):
+        if balance not in ("round_robin", "least_connections"):
+            raise ValueError(f"unknown replica balance strategy: {balance}")
+        self.replicas = replicas
+        self.balance = balance
+        self.sticky_seconds = sticky_seconds
+        self.retry_seconds = retry_seconds
+        self._by_engine: Dict[Engine, Replica] = {r.engine: r for r in replicas}
+        self._counter = itertools.count()
+        self._last_write = 0.0
+        self._lock = threading.Lock()
+        self.fallbacks = 0
+
+    def __bool__(self) -> bool:
+        return bool(self.replicas)
+
+    def note_write(self) -> None:
+        self._last_write = time.monotonic()
+
+    def in_sticky_window(self) -> bool:
+        return time.monotonic() - self._last_write < self.sticky_seconds
+
+    def choose(self) -> Optional[Replica]:
+        """选出一个健康的副本；全部不可用时返回 None（调用方回退到主库）"""
+        healthy = [r for r in self.replicas if r.healthy]
+        if not healthy:
+            self.fallbacks += 1
+            return None
+        if self.balance == "least_connections":
+            return min(healthy, key=_checked_out)
+        return healthy[next(self._counter) % len(healthy)]
+
+    def replica_for(self, engine: Engine) -> Optional[Replica]:
+        return self._by_engine.get(engine)
+
+    def mark_down(self, replica: Replica, error: str) -> None:
+        with self._lock:
+            replica.down_until = time.monotonic() + self.retry_seconds
+            replica.last_error = error
+
+    def mark_up(self, replica: Replica) -> None:
+        with self._lock:
+            replica.down_until = 0.0
+
+    def stats(self) -> dict:
+        return {
+            "balance": self.balance,
+            "sticky_seconds": self.sticky_seconds,
+            "in_sticky_window": self.in_sticky_window(),
+            "fallbacks": self.fallbacks,
+            "replicas": {
+                r.name: {"healthy": r.healthy, "checked_out": _checked_out(r), "last_error": r.last_error}
+                for r in self.replicas
+            },
+        }
+
+
+def _checked_out(replica: Replica) -> int:
+    checkedout = getattr(replica.engine.pool, "checkedout", None)
+    return checkedout() if checkedout is not None else 0
+
+
+def watch_replica_errors(replicas: ReplicaSet) -> None:
+    """副本上出现断连 / 连接失败时标记为不可用"""
+    for replica in replicas.replicas:
+        def handle_error(context, replica=replica):
+            if context.is_disconnect or context.connection is None:
+                replicas.mark_down(replica, f"{type(context.original_exception).__name__}: {context.original_exception}")
+        event.listen(replica.engine, "handle_error", handle_error)
+
+
+class RoutingSession(Session):
+    """
+    按语句类型选择连接的 Session：
+    - flush 和 INSERT / UPDATE / DELETE 走主库，并且此后本会话的所有语句都走主库
+    - session.info["primary"] 为 True（写请求、读己之写窗口内）时全部走主库
+    - 其余 SELECT 走副本；同一会话固定使用第一次选中的副本，保证一次请求内读到一致的数据
+    """
+
+    def __init__(self, *args, replicas: Optional[ReplicaSet] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+
+    def get_bind(self, mapper=None, *, clause=None, **kw: Any):
+        primary = super().get_bind(mapper, clause=clause, **kw)
+        if not self.replicas:
+            return primary
+        if self._flushing or (clause is not None and getattr(clause, "is_dml", False)):
+            self.info["primary"] = True
+            self.info["wrote"] = True
+            return primary
+        if self.info.get("primary"):
+            return primary
+        if self.replicas.in_sticky_window():
+            self.info["primary"] = True
+            return primary
+
+        replica = self.info.get("replica")
+        if replica is None or not replica.healthy:
+            replica = self.replicas.choose()
+            if replica is None:
+                self.info["primary"] = True
+                return primary
+            self.info["replica"] = replica
+        return replica.engine
+
+    def fallback_to_primary(self) -> bool:
+        """
+        当前会话使用的副本已被标记为不可用时，切换到主库并返回 True，调用方回滚后重试一次。
+        """
+        replica = self.info.get("replica")
+        if replica is None or replica.healthy:
+            return False
+        self.info.pop("replica", None)
+        self.info["primary"] = True
+        return True
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _note_write(session: RoutingSession) -> None:
+    if session.info.pop("wrote", False) and session.replicas:
+        session.replicas.note_write()
@@ -1,25 +1,25 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
 from typing import Optional
 
-from .database.dependency import get_db
-from .crud import get_user_by_token
-from .database.models import DBUser  # 导入 DBUser 用于类型提示
+from .database.dependency import session_scope
+from .async_crud import get_user_by_token
+from .models.user import UserPublic
+from .utils.token_cache import token_cache
 
 # 定义 OAuth2 方案，用于从请求头中提取 Token
 # auto_error=False 允许我们手动处理错误响应
 oauth2_scheme = HTTPBearer(auto_error=False)
 
 
-def get_current_user(
-        db: Session = Depends(get_db),
+async def get_current_user(
         # 依赖 HTTPBearer 提取 Authorization: Bearer <token>
         credentials: Optional[HTTPAuthorizationCredentials] = Depends(oauth2_scheme)
-) -> DBUser:
+) -> UserPublic:
     """
-    FastAPI 依赖函数：验证请求头中的 Token 并返回 DBUser 对象。
+    FastAPI 依赖函数：验证请求头中的 Token 并返回当前用户。
     如果验证失败，抛出 401 Unauthorized 异常。
+    Token 先查进程内缓存，命中时不打开数据库会话。
     """
     # 1. 检查凭证是否存在
     if not credentials:
@@ -31,15 +31,28 @@ def get_current_user(
 
     token = credentials.credentials  # 提取 Bearer 后面的实际 Token 字符串
 
-    # 2. 检查 Token 是否存在于数据库
-    user = get_user_by_token(db, token=token)
-
+    # 2. 先查缓存，未命中时查库（Token 需存在且未过期）
+    user = await resolve_token(token)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired token",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    return user
+
+
+async def resolve_token(token: str) -> Optional[UserPublic]:
+    """Token -> 用户：先查进程内缓存，未命中时查库并写入缓存；无效或过期时返回 None"""
+    user = token_cache.get(token)
+    if user is not None:
+        return user
+
+    async with session_scope() as db:
+        db_user = await get_user_by_token(db, token=token)
+    if db_user is None:
+        return None
 
-    # 3. 验证成功，返回用户对象
+    user = UserPublic.model_validate(db_user)
+    token_cache.put(token, user, db_user.token_expires_at)
     return user
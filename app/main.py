@@ -1,9 +1,67 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware  # 👈 导入 CORS 中间件
-from app.api import user, news, price, category, faq, site_config
+from app.api import user, news, price, category, faq, site_config, system, metrics, sync, events
+from app.config import (
+    MICROCACHE_ENABLED, MICROCACHE_TTL, MICROCACHE_STALE_TTL, MICROCACHE_MAX_ENTRIES, MICROCACHE_PREFIXES,
+    MICROCACHE_DEPENDENTS,
+    METRICS_ENABLED,
+    RATE_LIMIT_ENABLED, RATE_LIMIT_RULES, RATE_LIMIT_GLOBAL_RATE, RATE_LIMIT_GLOBAL_BURST, RATE_LIMIT_MAX_CLIENTS,
+    RATE_LIMIT_MAX_INFLIGHT, RATE_LIMIT_SHED_RETRY_AFTER,
+    SQL_INSTRUMENTATION_ENABLED, SQL_WARN_QUERY_COUNT, SQL_WARN_TOTAL_MS, SQL_N_PLUS_ONE_THRESHOLD,
+    SQL_SLOWEST_STATEMENTS,
+)
+from app.middleware.metrics import MetricsMiddleware
+from app.middleware.microcache import MicroCacheMiddleware
+from app.middleware.rate_limit import RateLimitMiddleware
+from app.middleware.sql_timing import SQLTimingMiddleware
+from app.database.database import liveness_checker
+from app.utils.auth import password_hasher
+from app.utils.events import change_events
+from app.utils.snapshot import catalog_snapshot
+from app.utils.metrics import metrics as metrics_registry
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 后台连接存活检查（DB_LIVENESS_INTERVAL=0 时不启动）
+    liveness_checker.start()
+    # 多 worker 共享的目录快照（未配置 CATALOG_SNAPSHOT_PATH 时不启动）
+    await catalog_snapshot.start()
+    yield
+    await catalog_snapshot.stop()
+    await liveness_checker.stop()
+    # 结束仍在连接的 /events 流，否则服务器会等待它们超时才能退出
+    await change_events.close()
+    password_hasher.shutdown()
 
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
+
+# 限流位于微缓存内层：缓存命中的请求不查库，不消耗令牌也不计入过载保护的并发数
+if RATE_LIMIT_ENABLED:
+    app.add_middleware(
+        RateLimitMiddleware,
+        rules=RATE_LIMIT_RULES,
+        global_rate=RATE_LIMIT_GLOBAL_RATE,
+        global_burst=RATE_LIMIT_GLOBAL_BURST,
+        max_clients=RATE_LIMIT_MAX_CLIENTS,
+        max_inflight=RATE_LIMIT_MAX_INFLIGHT,
+        shed_retry_after=RATE_LIMIT_SHED_RETRY_AFTER,
+    )
+
+# 微缓存必须在 CORS 之前注册（即位于 CORS 内层），
+# 否则按请求 Origin 生成的 CORS 响应头会被缓存并返回给其他来源
+if MICROCACHE_ENABLED:
+    app.add_middleware(
+        MicroCacheMiddleware,
+        prefixes=MICROCACHE_PREFIXES,
+        dependents=MICROCACHE_DEPENDENTS,
+        ttl=MICROCACHE_TTL,
+        stale_ttl=MICROCACHE_STALE_TTL,
+        max_entries=MICROCACHE_MAX_ENTRIES,
+    )
 
 # --- 🎯 解决 CORS 问题的关键代码块 ---
 
@@ -18,6 +76,20 @@ app.add_middleware(
     allow_headers=["*"],            # 允许所有 HTTP 头
 )
 
+# SQL 统计位于微缓存外层：缓存命中的请求不查库，Server-Timing 也不会被缓存
+if SQL_INSTRUMENTATION_ENABLED:
+    app.add_middleware(
+        SQLTimingMiddleware,
+        warn_query_count=SQL_WARN_QUERY_COUNT,
+        warn_total_ms=SQL_WARN_TOTAL_MS,
+        n_plus_one_threshold=SQL_N_PLUS_ONE_THRESHOLD,
+        slowest_statements=SQL_SLOWEST_STATEMENTS,
+    )
+
+# 指标中间件最后注册、位于最外层，统计的耗时包含 CORS 和微缓存
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, registry=metrics_registry, router=app.router)
+
 # ----------------------------------------
 # 现有路由保持不变
 
@@ -30,5 +102,10 @@ app.include_router(category.router, prefix="/categories", tags=["categories"])
 app.include_router(price.router, prefix="/prices", tags=["prices"])
 app.include_router(faq.router, prefix="/faq", tags=["faq"])
 app.include_router(site_config.router, prefix="/config", tags=["config"])
+app.include_router(system.router, prefix="/system", tags=["system"])
+app.include_router(sync.router, prefix="/sync", tags=["sync"])
+app.include_router(events.router, prefix="/events", tags=["events"])
+if METRICS_ENABLED:
+    app.include_router(metrics.router)
 
 
@@ -0,0 +1,72 @@
+# middleware/metrics.py
+import time
+from typing import Dict, Optional, Tuple
+
+from starlette.routing import Match, Router
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..utils.metrics import MetricsRegistry
+
+# 未匹配任何路由的请求统一归到这个标签，避免按原始路径产生无限多的时间序列
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class MetricsMiddleware:
+    """
+    记录每个请求的路由模板（如 /prices/{price_id}）、状态码和耗时（纯 ASGI 中间件）。
+
+    路由模板取自路由匹配后写入 scope 的 "route"；被微缓存直接返回的请求没有经过路由，
+    此时按 method + 路径重新匹配一次并缓存结果。
+    """
+
+    def __init__(self, app: ASGIApp, registry: MetricsRegistry, router: Router, max_resolved_paths: int = 1024):
+        self.app = app
+        self.registry = registry
+        self.router = router
+        self.max_resolved_paths = max_resolved_paths
+        self._resolved: Dict[Tuple[str, str], str] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        registry = self.registry
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        registry.in_flight += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            registry.in_flight -= 1
+            registry.observe(scope["method"], self._route_template(scope), status, elapsed)
+
+    def _route_template(self, scope: Scope) -> str:
+        route = scope.get("route")
+        if route is not None:
+            return route.path_format
+        key = (scope["method"], scope["path"])
+        template = self._resolved.get(key)
+        if template is None:
+            template = self._match(scope)
+            if len(self._resolved) < self.max_resolved_paths:
+                self._resolved[key] = template
+        return template
+
+    def _match(self, scope: Scope) -> str:
+        partial: Optional[str] = None
+        for route in self.router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return route.path_format
+            if match == Match.PARTIAL and partial is None:
+                partial = route.path_format
+        return partial or UNMATCHED_ROUTE
@@ -0,0 +1,266 @@
+# middleware/microcache.py
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# 回源请求时去掉的条件请求头：回源总是取完整的 200 响应，304 由中间件按各自的请求头判断
+_CONDITIONAL_HEADERS = {b"if-none-match", b"if-modified-since"}
+_WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+CacheKey = Tuple[str, bytes]
+
+logger = logging.getLogger("app.microcache")
+
+
+class FetchAborted(Exception):
+    """回源请求被取消（例如客户端断开），等待同一结果的请求改为自己回源"""
+
+
+@dataclass
+class CachedResponse:
+    status: int
+    headers: List[Tuple[bytes, bytes]]
+    body: bytes
+    stored_at: float = field(default_factory=time.monotonic)
+
+    def header(self, name: bytes) -> Optional[bytes]:
+        for key, value in self.headers:
+            if key == name:
+                return value
+        return None
+
+
+class MicroCacheMiddleware:
+    """
+    匿名 GET 请求的短 TTL 响应缓存（纯 ASGI 中间件）。
+
+    - 按 path + query string 缓存 200 响应，新鲜期内直接返回
+    - 单飞 (single-flight)：同一 key 同时只有一个请求回源，其余请求等待其结果
+    - stale-while-revalidate：过期但仍在 stale 窗口内时先返回旧响应，后台刷新
+    - 同一前缀下的写请求成功后，清除该前缀以及依赖它的前缀（dependents）的全部缓存
+    带 Authorization / Cookie 的请求不读写缓存。
+    """
+
+    def __init__(self, app: ASGIApp, prefixes: Tuple[str, ...], ttl: float, stale_ttl: float,
+                 max_entries: int, dependents: Tuple[str, ...] = ()):
+        self.app = app
+        self.prefixes = prefixes
+        # 前缀 -> 该前缀下的写操作需要清除的全部前缀（含自身）
+        self.purge_targets = parse_dependents(dependents, prefixes)
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[CacheKey, CachedResponse]" = OrderedDict()
+        self._inflight: Dict[CacheKey, asyncio.Future] = {}
+        # 每个前缀的清除代数：回源期间发生过清除的结果不写入缓存
+        self._generations: Dict[str, int] = {}
+        self._background: Set[asyncio.Task] = set()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        prefix = self._match_prefix(scope["path"])
+        if prefix is None:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        if method in _WRITE_METHODS:
+            await self._handle_write(prefix, scope, receive, send)
+        elif method == "GET" and self._is_anonymous(scope):
+            await self._handle_read(prefix, scope, send)
+        else:
+            await self.app(scope, receive, send)
+
+    # -------------------------------------------------
+    # 读
+    # -------------------------------------------------
+    async def _handle_read(self, prefix: str, scope: Scope, send: Send) -> None:
+        key = (scope["path"], scope.get("query_string", b""))
+        entry = self._entries.get(key)
+        now = time.monotonic()
+
+        if entry is not None:
+            age = now - entry.stored_at
+            if age < self.ttl:
+                self._entries.move_to_end(key)
+                await self._replay(entry, scope, send, b"HIT")
+                return
+            if age < self.ttl + self.stale_ttl:
+                if key not in self._inflight:
+                    task = asyncio.create_task(self._fetch(key, prefix, scope))
+                    self._background.add(task)
+                    task.add_done_callback(self._background_done)
+                await self._replay(entry, scope, send, b"STALE")
+                return
+
+        inflight = self._inflight.get(key)
+        try:
+            if inflight is not None:
+                # 已有请求在回源，等待同一个结果
+                result = await asyncio.shield(inflight)
+            else:
+                result = await self._fetch(key, prefix, scope)
+        except Exception:
+            if inflight is None:
+                raise
+            # 回源的那个请求失败了，本请求自己再请求一次
+            await self.app(scope, _empty_receive(), send)
+            return
+        await self._replay(result, scope, send, b"MISS")
+
+    async def _fetch(self, key: CacheKey, prefix: str, scope: Scope) -> CachedResponse:
+        """回源并按条件写入缓存；同一 key 的并发请求共享这一个 Future"""
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        generation = self._generations.get(prefix, 0)
+        try:
+            result = await self._capture(scope)
+        except BaseException as exc:
+            # CancelledError 不是 Exception，同样要结束 Future，否则等待者永远挂起
+            future.set_exception(exc if isinstance(exc, Exception) else FetchAborted())
+            # 没有其他等待者时避免 "exception was never retrieved" 警告
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+        if self._cacheable(result) and self._generations.get(prefix, 0) == generation:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        future.set_result(result)
+        return result
+
+    def _background_done(self, task: asyncio.Task) -> None:
+        """后台刷新结束：取回异常并记录，避免 "Task exception was never retrieved" """
+        self._background.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("microcache background refresh failed", exc_info=task.exception())
+
+    async def _capture(self, scope: Scope) -> CachedResponse:
+        fetch_scope = dict(scope)
+        fetch_scope["headers"] = [(k, v) for k, v in scope["headers"] if k not in _CONDITIONAL_HEADERS]
+        status = 500
+        headers: List[Tuple[bytes, bytes]] = []
+        body = bytearray()
+
+        async def capture_send(message: Message) -> None:
+            nonlocal status, headers
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                body.extend(message.get("body", b""))
+
+        await self.app(fetch_scope, _empty_receive(), capture_send)
+        return CachedResponse(status=status, headers=headers, body=bytes(body))
+
+    @staticmethod
+    def _cacheable(result: CachedResponse) -> bool:
+        if result.status != 200:
+            return False
+        cache_control = (result.header(b"cache-control") or b"").lower()
+        return b"no-store" not in cache_control and b"private" not in cache_control
+
+    async def _replay(self, entry: CachedResponse, scope: Scope, send: Send, state: bytes) -> None:
+        etag = entry.header(b"etag")
+        if etag is not None and entry.status == 200 and _etag_matches(scope, etag):
+            headers = [(b"etag", etag), (b"x-microcache", state)]
+            cache_control = entry.header(b"cache-control")
+            if cache_control is not None:
+                headers.append((b"cache-control", cache_control))
+            await send({"type": "http.response.start", "status": 304, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        await send({
+            "type": "http.response.start",
+            "status": entry.status,
+            "headers": entry.headers + [(b"x-microcache", state)],
+        })
+        await send({"type": "http.response.body", "body": entry.body})
+
+    # -------------------------------------------------
+    # 写
+    # -------------------------------------------------
+    async def _handle_write(self, prefix: str, scope: Scope, receive: Receive, send: Send) -> None:
+        status = 500
+
+        async def watch_send(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, watch_send)
+        finally:
+            # 未认证的写请求会返回 401，不会触发清除
+            if status < 400:
+                self.purge(prefix)
+
+    def purge(self, prefix: str) -> None:
+        """清除 prefix 及依赖它的前缀；回源中的请求结果也不再写入缓存"""
+        targets = self.purge_targets.get(prefix, (prefix,))
+        for target in targets:
+            self._generations[target] = self._generations.get(target, 0) + 1
+        for key in [k for k in self._entries if self._match_prefix(k[0]) in targets]:
+            del self._entries[key]
+
+    # -------------------------------------------------
+    # 辅助
+    # -------------------------------------------------
+    def _match_prefix(self, path: str) -> Optional[str]:
+        for prefix in self.prefixes:
+            if path == prefix or path.startswith(prefix + "/"):
+                return prefix
+        return None
+
+    @staticmethod
+    def _is_anonymous(scope: Scope) -> bool:
+        return not any(k in (b"authorization", b"cookie") for k, _ in scope["headers"])
+
+
+def parse_dependents(rules: Tuple[str, ...], prefixes: Tuple[str, ...]) -> Dict[str, Tuple[str, ...]]:
+    """"前缀=依赖前缀|依赖前缀" -> {前缀: (前缀, 依赖前缀, ...)}，只保留参与缓存的前缀"""
+    targets = {prefix: (prefix,) for prefix in prefixes}
+    for rule in rules:
+        prefix, sep, dependents = rule.partition("=")
+        if not sep or not prefix.startswith("/"):
+            raise ValueError(f"invalid microcache dependency: {rule!r} (expected /prefix=/dependent|/dependent)")
+        extra = tuple(d.strip() for d in dependents.split("|") if d.strip() in prefixes)
+        if prefix in targets:
+            targets[prefix] += tuple(d for d in extra if d not in targets[prefix])
+    return targets
+
+
+def _etag_matches(scope: Scope, etag: bytes) -> bool:
+    for key, value in scope["headers"]:
+        if key == b"if-none-match":
+            if value.strip() == b"*":
+                return True
+            return any(tag.strip().removeprefix(b"W/") == etag for tag in value.split(b","))
+    return False
+
+
+def _empty_receive() -> Receive:
+    """GET 请求没有请求体；回源请求不依赖客户端连接，供后台刷新使用"""
+    sent = False
+
+    async def receive() -> Message:
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        return {"type": "http.disconnect"}
+
+    return receive
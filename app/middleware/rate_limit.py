@@ -0,0 +1,152 @@
+# middleware/rate_limit.py
+import json
+import math
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from ..utils.token_cache import token_cache
+
+
+class TokenBucket:
+    """令牌桶：每秒补充 rate 个令牌，最多存 burst 个"""
+
+    __slots__ = ("rate", "burst", "tokens", "stamp")
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.stamp = now
+
+    def take(self, now: float) -> float:
+        """取一个令牌；成功返回 0，否则返回还需等待的秒数"""
+        tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+        if tokens >= 1:
+            self.tokens = tokens - 1
+            return 0.0
+        self.tokens = tokens
+        return (1 - tokens) / self.rate
+
+
+def parse_rules(rules: Tuple[str, ...]) -> List[Tuple[str, float, float]]:
+    """"前缀=速率:容量" -> [(前缀, 速率, 容量)]，按前缀长度降序（最长匹配优先）"""
+    parsed = []
+    for rule in rules:
+        prefix, sep, limits = rule.partition("=")
+        rate, _, burst = limits.partition(":")
+        try:
+            rate_value, burst_value = float(rate), float(burst or rate)
+        except ValueError:
+            rate_value = burst_value = 0.0
+        if not sep or not prefix.startswith("/") or rate_value <= 0 or burst_value < 1:
+            raise ValueError(f"invalid rate limit rule: {rule!r} (expected /prefix=rate:burst)")
+        parsed.append((prefix.rstrip("/") or "/", rate_value, burst_value))
+    return sorted(parsed, key=lambda item: len(item[0]), reverse=True)
+
+
+class RateLimitMiddleware:
+    """
+    进程内限流与过载保护（纯 ASGI 中间件，不依赖外部服务）。
+
+    - 匹配规则前缀的请求按 客户端 IP × 前缀 各取一个令牌，再从全局令牌桶取一个，取不到时返回 429
+    - 同时在处理中的匹配请求达到 max_inflight 时，新请求直接返回 503，不再排队等数据库连接（管理员请求同样适用）
+    - 带有效管理员 token 的请求不消耗令牌。只查进程内 token 缓存，不查库：否则随机 token 可以让每个被拒绝的请求
+      都打到数据库。其他 worker 签发、本 worker 尚未缓存的 token 先按普通请求限流，
+      第一次通过限流的请求经 get_current_user 查库后写入缓存，之后的请求不再受限
+    只在事件循环线程中执行，桶的读写之间没有 await，不需要加锁。
+    被拒绝的请求按状态码计入 /metrics。
+    位于微缓存内层：缓存命中的请求不查库，也不消耗令牌。
+    """
+
+    def __init__(self, app: ASGIApp, rules: Tuple[str, ...], global_rate: float, global_burst: float,
+                 max_clients: int, max_inflight: int, shed_retry_after: int):
+        self.app = app
+        self.rules = parse_rules(rules)
+        self.max_clients = max_clients
+        self.max_inflight = max_inflight
+        self.shed_retry_after = shed_retry_after
+        now = time.monotonic()
+        self._global = TokenBucket(global_rate, max(global_burst, 1), now) if global_rate > 0 else None
+        # (前缀, 客户端 IP) -> 令牌桶，按最近出现的顺序排列
+        self._buckets: "OrderedDict[Tuple[str, str], TokenBucket]" = OrderedDict()
+        self.inflight = 0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        rule = self._match_rule(scope["path"])
+        if rule is None:
+            await self.app(scope, receive, send)
+            return
+
+        if self.max_inflight and self.inflight >= self.max_inflight:
+            await _reject(send, 503, "Service Unavailable", self.shed_retry_after)
+            return
+
+        wait = 0.0 if self._is_admin(scope) else self._take(rule, scope)
+        if wait:
+            await _reject(send, 429, "Too Many Requests", math.ceil(wait))
+            return
+
+        self.inflight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.inflight -= 1
+
+    def _take(self, rule: Tuple[str, float, float], scope: Scope) -> float:
+        prefix, rate, burst = rule
+        client = scope.get("client")
+        key = (prefix, client[0] if client else "")
+        now = time.monotonic()
+
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(rate, burst, now)
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        wait = bucket.take(now)
+        if wait or self._global is None:
+            return wait
+
+        wait = self._global.take(now)
+        if wait:
+            # 全局桶拒绝时退还客户端桶的令牌
+            bucket.tokens = min(bucket.burst, bucket.tokens + 1)
+        return wait
+
+    def _match_rule(self, path: str) -> Optional[Tuple[str, float, float]]:
+        for rule in self.rules:
+            prefix = rule[0]
+            if path == prefix or path.startswith(prefix + "/") or prefix == "/":
+                return rule
+        return None
+
+    @staticmethod
+    def _is_admin(scope: Scope) -> bool:
+        for key, value in scope["headers"]:
+            if key == b"authorization":
+                scheme, _, token = value.decode("latin-1").partition(" ")
+                return scheme.lower() == "bearer" and token_cache.peek(token.strip()) is not None
+        return False
+
+
+async def _reject(send: Send, status: int, detail: str, retry_after: int) -> None:
+    body = json.dumps({"detail": detail}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(max(retry_after, 1)).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
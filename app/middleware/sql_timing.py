@@ -0,0 +1,79 @@
+# middleware/sql_timing.py
+import json
+import logging
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..database.instrumentation import QueryStats, current_query_stats
+
+logger = logging.getLogger("app.sql")
+
+
+class SQLTimingMiddleware:
+    """
+    为每个请求创建 QueryStats，由 engine 事件钩子累计 SQL 次数和耗时（纯 ASGI 中间件）。
+
+    - 响应头追加 Server-Timing: db;dur=<毫秒>;desc="<次数> queries"
+    - 请求结束后，超过次数 / 耗时阈值或出现 N+1 时输出一条 JSON 格式的警告日志
+    流式响应在发送响应头之后仍可能查库，响应头只包含此前的统计，日志包含全部。
+    """
+
+    def __init__(self, app: ASGIApp, warn_query_count: int, warn_total_ms: float,
+                 n_plus_one_threshold: int, slowest_statements: int):
+        self.app = app
+        self.warn_query_count = warn_query_count
+        self.warn_total_ms = warn_total_ms
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.slowest_statements = slowest_statements
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(self.slowest_statements)
+        token = current_query_stats.set(stats)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and stats.count:
+                timing = f'db;dur={stats.total * 1000:.2f};desc="{stats.count} queries"'.encode()
+                message = dict(message)
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", timing)]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_query_stats.reset(token)
+            if stats.count:
+                self._report(scope, stats)
+
+    def _report(self, scope: Scope, stats: QueryStats) -> None:
+        total_ms = stats.total * 1000
+        repeated = stats.repeated_statements(self.n_plus_one_threshold)
+        reasons = []
+        if stats.count >= self.warn_query_count:
+            reasons.append("query_count")
+        if total_ms >= self.warn_total_ms:
+            reasons.append("db_time")
+        if repeated:
+            reasons.append("n_plus_one")
+        if not reasons:
+            return
+
+        route = scope.get("route")
+        payload = {
+            "event": "sql_budget_exceeded",
+            "reasons": reasons,
+            "method": scope["method"],
+            "path": scope["path"],
+            "route": route.path_format if route is not None else None,
+            "query_count": stats.count,
+            "db_time_ms": round(total_ms, 2),
+            "slowest": [
+                {"ms": round(seconds * 1000, 2), "statement": statement}
+                for seconds, statement in stats.slowest_statements()
+            ],
+            "n_plus_one": [{"count": n, "statement": statement} for statement, n in repeated],
+        }
+        logger.warning(json.dumps(payload, ensure_ascii=False), extra={"sql_stats": payload})
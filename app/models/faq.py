@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 
@@ -46,6 +46,16 @@ class FAQResponse(FAQBase):
     """
     id: int
     created_at: datetime
+    # 编辑后更新，用于 Last-Modified；迁移前的旧行可能为空
+    updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True  # 允许与 SQLAlchemy 对象兼容
+
+
+# -----------------------------------------------------
+# FAQ 分页响应模型 (keyset 分页)
+# -----------------------------------------------------
+class FAQPage(BaseModel):
+    items: List[FAQResponse]
+    next_cursor: Optional[str] = Field(None, description="下一页游标，为 null 表示已经是最后一页")
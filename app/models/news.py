@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field
 from datetime import date, datetime
+from typing import List, Optional
 
 
 # -----------------------------------------------------
@@ -21,6 +22,14 @@ class News(NewsBase):
     """用于API响应，包含数据库自动生成的ID和时间"""
     id: int
     created_at: datetime
+    # 编辑后更新，用于 Last-Modified；迁移前的旧行可能为空
+    updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
+
+
+class NewsPage(BaseModel):
+    """通知列表的一页（keyset 分页）"""
+    items: List[News]
+    next_cursor: Optional[str] = Field(None, description="下一页游标，为 null 表示已经是最后一页")
@@ -0,0 +1,18 @@
+from pydantic import BaseModel, Field, field_validator
+from typing import List
+
+
+class ReorderRequest(BaseModel):
+    """拖拽排序后提交的完整顺序"""
+    ids: List[int] = Field(..., min_length=1, description="按显示顺序排列的 id 列表，第一个显示在最前面", example=[3, 1, 2])
+
+    @field_validator("ids")
+    @classmethod
+    def ids_must_be_unique(cls, ids: List[int]) -> List[int]:
+        if len(set(ids)) != len(ids):
+            raise ValueError("ids must not contain duplicates")
+        return ids
+
+
+class ReorderResult(BaseModel):
+    updated: int = Field(..., description="sort_order 实际发生变化的行数")
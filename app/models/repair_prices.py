@@ -29,7 +29,28 @@ class RepairPrice(RepairPriceBase):
         from_attributes = True
 
 
+class PriceSearchResult(RepairPrice):
+    """机型名检索结果"""
+    score: float = Field(..., description="相关度，越大越相关")
+
+
 class PriceListResponse(BaseModel):
     categories: List[Category]
     repair_types: List[RepairType]
     prices: List[RepairPrice]
+
+
+class PriceImportError(BaseModel):
+    row: int = Field(..., description="出错的行号（CSV 含表头行，从 1 开始）")
+    error: str
+
+
+class PriceImportReport(BaseModel):
+    """批量导入结果"""
+    total_rows: int
+    imported: int
+    failed: int
+    errors: List[PriceImportError] = Field(default_factory=list, description="最多返回前 1000 条错误")
+    elapsed_seconds: float
+    rows_per_second: float
+
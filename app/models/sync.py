@@ -0,0 +1,30 @@
+from pydantic import BaseModel, Field
+from typing import List, Literal
+from datetime import datetime
+
+from app.models.faq import FAQResponse
+from app.models.news import News
+from app.models.repair_prices import RepairPrice
+
+
+class SyncTombstone(BaseModel):
+    """已删除的记录"""
+    entity: Literal["price", "faq", "news"]
+    id: int = Field(..., validation_alias="entity_id")
+    deleted_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class SyncDelta(BaseModel):
+    """
+    since 之后的增量。客户端先按 deleted 删除本地记录，再按 id 覆盖 prices / faqs / news
+    （同时出现在两边的 id 以当前存在的行为准），然后保存 token 供下次请求使用。
+    """
+    token: str = Field(..., description="下次请求作为 since 传入")
+    full: bool = Field(..., description="为 true 时是全量数据，客户端应整体替换本地数据")
+    prices: List[RepairPrice]
+    faqs: List[FAQResponse]
+    news: List[News]
+    deleted: List[SyncTombstone]
@@ -1,9 +1,23 @@
 # utils/auth.py
+import asyncio
+import base64
+import hashlib
+import hmac
 import secrets
 import string
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
 
+from ..config import (
+    PASSWORD_SCRYPT_N, PASSWORD_SCRYPT_R, PASSWORD_SCRYPT_P, PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING,
+)
+
+# 存储格式：scrypt$<N>$<r>$<p>$<salt>$<hash>（salt / hash 为无填充的 base64）。
+# 不是这个格式的值视为旧的明文密码
+_SCHEME = "scrypt"
+_SALT_BYTES = 16
+_KEY_BYTES = 32
 
-# ⚠️ 实际项目中，请使用安全的密码哈希库，例如 passlib
 
 def generate_token(length: int = 32) -> str:
     """
@@ -14,10 +28,126 @@ def generate_token(length: int = 32) -> str:
     return token
 
 
+def _b64encode(data: bytes) -> str:
+    return base64.b64encode(data).decode().rstrip("=")
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.b64decode(text + "=" * (-len(text) % 4))
+
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    # OpenSSL 默认的内存上限是 32 MiB，按参数放宽（N=2**15 以上时需要）
+    maxmem = 128 * r * (n + p + 2) + 1024 * 1024
+    return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p, maxmem=maxmem, dklen=_KEY_BYTES)
+
+
+def _parse(stored: str) -> Optional[Tuple[int, int, int, bytes, bytes]]:
+    """解析哈希值；旧的明文密码（或无法解析的值）返回 None"""
+    parts = stored.split("$")
+    if len(parts) != 6 or parts[0] != _SCHEME:
+        return None
+    try:
+        return int(parts[1]), int(parts[2]), int(parts[3]), _b64decode(parts[4]), _b64decode(parts[5])
+    except ValueError:
+        return None
+
+
+def hash_password(password: str) -> str:
+    """按当前配置的成本参数计算哈希（CPU 密集，不要在事件循环中直接调用）"""
+    salt = secrets.token_bytes(_SALT_BYTES)
+    key = _scrypt(password, salt, PASSWORD_SCRYPT_N, PASSWORD_SCRYPT_R, PASSWORD_SCRYPT_P)
+    return "$".join((_SCHEME, str(PASSWORD_SCRYPT_N), str(PASSWORD_SCRYPT_R), str(PASSWORD_SCRYPT_P),
+                     _b64encode(salt), _b64encode(key)))
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
-    验证密码 (⚠️ 仅作演示，实际应用中请使用哈希验证)
+    验证密码（CPU 密集，不要在事件循环中直接调用）。
+    旧数据中的明文密码也能验证，登录成功后由 needs_rehash 判断是否需要重新哈希。
     """
-    # 假设你的数据库中存储的是明文密码（极度不推荐）或直接比较
-    # 生产环境中应是: return bcrypt.verify(plain_password, hashed_password)
-    return plain_password == hashed_password
+    params = _parse(hashed_password)
+    if params is None:
+        return hmac.compare_digest(plain_password.encode(), hashed_password.encode())
+    n, r, p, salt, key = params
+    return hmac.compare_digest(_scrypt(plain_password, salt, n, r, p), key)
+
+
+def needs_rehash(hashed_password: str) -> bool:
+    """明文密码，或成本参数与当前配置不同的哈希"""
+    params = _parse(hashed_password)
+    return params is None or params[:3] != (PASSWORD_SCRYPT_N, PASSWORD_SCRYPT_R, PASSWORD_SCRYPT_P)
+
+
+class PasswordHasherBusy(Exception):
+    """排队等待哈希的请求已达上限"""
+
+
+class PasswordHasher:
+    """
+    在专用的有界线程池中执行密码哈希 / 验证。
+
+    scrypt 在 OpenSSL 中计算，期间释放 GIL，不阻塞事件循环；
+    线程数固定为 workers，登录集中到来时最多占用 workers 个核，
+    其余请求（公开 GET）不受影响。排队超过 max_pending 时抛出 PasswordHasherBusy。
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = max(workers, 1)
+        self.max_pending = max_pending
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # 用户不存在时也做一次验证，响应时间不暴露 loginid 是否存在。
+        # 占位哈希在这里预先计算：懒计算会让第一次未知用户的登录多做一次 scrypt
+        self._dummy_hash = hash_password(secrets.token_urlsafe(16))
+        self.pending = 0
+        self.verified = 0
+        self.rehashed = 0
+        self.rejected = 0
+
+    async def _run(self, fn, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise PasswordHasherBusy()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self.pending -= 1
+
+    async def verify(self, plain_password: str, hashed_password: Optional[str]) -> bool:
+        """hashed_password 为 None（用户不存在）时验证一个占位哈希并返回 False"""
+        self.verified += 1
+        if hashed_password is None:
+            await self._run(self._verify_dummy, plain_password)
+            return False
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    def _verify_dummy(self, plain_password: str) -> None:
+        verify_password(plain_password, self._dummy_hash)
+
+    async def hash(self, plain_password: str) -> str:
+        self.rehashed += 1
+        return await self._run(hash_password, plain_password)
+
+    def shutdown(self) -> None:
+        """应用关闭时调用；之后再次使用会重新创建线程池"""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "verified": self.verified,
+            "rehashed": self.rehashed,
+            "rejected": self.rejected,
+            "scrypt": {"n": PASSWORD_SCRYPT_N, "r": PASSWORD_SCRYPT_R, "p": PASSWORD_SCRYPT_P},
+        }
+
+
+# 全局单例：login_for_token 使用
+password_hasher = PasswordHasher(PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING)
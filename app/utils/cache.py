@@ -0,0 +1,130 @@
+# utils/cache.py
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple, Union
+
+from ..config import CATALOG_CACHE_TTL, CATALOG_CACHE_MAX_ENTRIES
+
+
+class VersionRegistry:
+    """
+    按命名空间（通常是表名）维护的单调递增版本号。
+    写操作提交后 bump 对应命名空间，读缓存通过比较版本号判断是否过期。
+    """
+
+    def __init__(self):
+        # 进程启动标识：进程重启后版本号从 0 开始，需要它区分不同进程的版本
+        self.boot_id = secrets.token_hex(4)
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, namespace: str) -> int:
+        return self._versions.get(namespace, 0)
+
+    def bump(self, *namespaces: str) -> None:
+        # 同步回退模式下写操作运行在线程池中，这里加锁保证自增不丢失
+        with self._lock:
+            for namespace in namespaces:
+                self._versions[namespace] = self._versions.get(namespace, 0) + 1
+
+
+# 一个命名空间，或多个命名空间的组合（任一 bump 都会使条目失效）
+Namespace = Union[str, Tuple[str, ...]]
+
+
+class CatalogCache:
+    """
+    带版本号的进程内 LRU + TTL 缓存。
+
+    每个条目记录写入时所属命名空间的版本号，命名空间被 bump 后旧条目自然失效，
+    无需遍历删除；TTL 和 max_entries 作为兜底上限。
+    版本号只在本进程内 bump：其他 worker 的写操作要等条目超过 TTL 后才可见。
+    """
+
+    def __init__(self, versions: VersionRegistry, ttl: float, max_entries: int):
+        self.versions = versions
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # (namespace, key) -> (version, expires_at, value)
+        self._entries: "OrderedDict[Tuple[Namespace, Hashable], Tuple[Any, float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def version_of(self, namespace: Namespace):
+        if isinstance(namespace, tuple):
+            return tuple(self.versions.get(ns) for ns in namespace)
+        return self.versions.get(namespace)
+
+    def get(self, namespace: Namespace, key: Hashable = None) -> Tuple[bool, Any]:
+        """返回 (是否命中, 值)"""
+        cache_key = (namespace, key)
+        entry = self._entries.get(cache_key)
+        if entry is not None:
+            version, expires_at, value = entry
+            if version == self.version_of(namespace) and expires_at > time.monotonic():
+                self._entries.move_to_end(cache_key)
+                self.hits += 1
+                return True, value
+            self._entries.pop(cache_key, None)
+        self.misses += 1
+        return False, None
+
+    def set(self, namespace: Namespace, value: Any, key: Hashable = None, version: Any = None) -> None:
+        if version is None:
+            version = self.version_of(namespace)
+        cache_key = (namespace, key)
+        self._entries[cache_key] = (version, time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(cache_key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_or_load(self, namespace: Namespace, loader: Callable[[], Awaitable[Any]], key: Hashable = None) -> Any:
+        """
+        命中则直接返回；否则调用 loader 加载并写入缓存。
+        加载前先记下版本号：若加载期间发生写操作，写入的条目版本已过期，下次读取会重新加载。
+        """
+        hit, value = self.get(namespace, key)
+        if hit:
+            return value
+        version = self.version_of(namespace)
+        value = await loader()
+        self.set(namespace, value, key=key, version=version)
+        return value
+
+    def invalidate(self, *namespaces: str) -> None:
+        self.versions.bump(*namespaces)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+        }
+
+
+# 价格表的版本号分三层：
+#   "repair_prices"            任意价格变更都会 bump（整表读取方使用）
+#   "repair_prices:{c}:{r}"    某个 分类 × 维修种类 组合内的变更
+#   "repair_prices:*"          影响范围未知的变更（级联删除、按 id 更新等），使所有组合失效
+PRICES_ALL = "repair_prices:*"
+
+
+def price_pair_namespace(category_id: int, repair_type_id: int) -> str:
+    return f"repair_prices:{category_id}:{repair_type_id}"
+
+
+# 全局单例：crud 写操作负责失效，路由负责读取
+table_versions = VersionRegistry()
+catalog_cache = CatalogCache(table_versions, ttl=CATALOG_CACHE_TTL, max_entries=CATALOG_CACHE_MAX_ENTRIES)
@@ -0,0 +1,173 @@
+# utils/events.py
+import asyncio
+import json
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import AsyncIterator, Deque, List, Optional
+
+from ..config import EVENTS_REPLAY_BUFFER, EVENTS_HEARTBEAT_SECONDS
+from .cache import table_versions
+
+# 唤醒订阅者的原因
+_EVENT, _HEARTBEAT, _CLOSE = "event", "heartbeat", "close"
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    seq: int
+    entity: str
+    entity_id: Optional[int]
+    version: int
+
+    def encode(self, boot_id: str) -> bytes:
+        data = json.dumps({"entity": self.entity, "id": self.entity_id, "version": self.version},
+                          separators=(",", ":"))
+        return f"id: {boot_id}-{self.seq}\nevent: change\ndata: {data}\n\n".encode()
+
+
+class EventBroadcaster:
+    """
+    进程内的变更通知广播（Server-Sent Events）。
+
+    所有连接共享一个环形回放缓冲区和一个唤醒 Future：发布事件或心跳时唤醒全部连接，
+    每个连接只记住自己读到的序号，不持有独立队列，空闲连接的内存开销很小。
+    心跳由一个共享的定时任务发出，而不是每个连接各自计时。
+    Last-Event-ID 落在缓冲区之外（或来自重启前的进程）时发送 reset 事件，客户端应全量刷新。
+    """
+
+    def __init__(self, buffer_size: int, heartbeat_seconds: float):
+        self.heartbeat_seconds = heartbeat_seconds
+        self._buffer: Deque[ChangeEvent] = deque(maxlen=buffer_size)
+        self._seq = 0
+        # 同步回退模式下 crud 在线程池中调用 publish
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._waiter: Optional[asyncio.Future] = None
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._closed = False
+        self.subscribers = 0
+
+    # -------------------------------------------------
+    # 发布
+    # -------------------------------------------------
+    def publish(self, entity: str, entity_id: Optional[int] = None) -> None:
+        """写操作提交后调用；版本号取该表 bump 之后的值"""
+        with self._lock:
+            self._seq += 1
+            self._buffer.append(ChangeEvent(self._seq, entity, entity_id, table_versions.get(entity)))
+        self._wake_threadsafe(_EVENT)
+
+    def _wake_threadsafe(self, reason: str) -> None:
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._wake(reason)
+        else:
+            loop.call_soon_threadsafe(self._wake, reason)
+
+    def _wake(self, reason: str) -> None:
+        waiter, self._waiter = self._waiter, None
+        if waiter is not None and not waiter.done():
+            waiter.set_result(reason)
+
+    def _next_wakeup(self) -> asyncio.Future:
+        if self._waiter is None:
+            self._waiter = self._loop.create_future()
+        return self._waiter
+
+    # -------------------------------------------------
+    # 订阅
+    # -------------------------------------------------
+    def _events_after(self, seq: int) -> Optional[List[ChangeEvent]]:
+        """seq 之后的事件；seq 已被挤出缓冲区时返回 None"""
+        with self._lock:
+            if seq >= self._seq:
+                return []
+            if not self._buffer or self._buffer[0].seq > seq + 1:
+                return None
+            return [event for event in self._buffer if event.seq > seq]
+
+    def _resume_point(self, last_event_id: Optional[str]) -> Optional[int]:
+        """解析 Last-Event-ID；无法从缓冲区续传时返回 None"""
+        if not last_event_id:
+            return self._seq
+        boot_id, _, seq = last_event_id.rpartition("-")
+        if boot_id != table_versions.boot_id or not seq.isdigit():
+            return None
+        return int(seq)
+
+    async def stream(self, last_event_id: Optional[str] = None) -> AsyncIterator[bytes]:
+        self._ensure_started()
+        boot_id = table_versions.boot_id
+        self.subscribers += 1
+        # 续传位置在订阅时确定：首个数据块发出之后才发布的事件也不会漏掉
+        seq = self._resume_point(last_event_id)
+        try:
+            yield b"retry: 3000\n\n"
+            while not self._closed:
+                # 先取唤醒 Future 再读缓冲区：读完之后发布的事件一定会唤醒这个 Future
+                wakeup = self._next_wakeup()
+                events = self._events_after(seq) if seq is not None else None
+                if events is None:
+                    seq = self._seq
+                    yield f"id: {boot_id}-{seq}\nevent: reset\ndata: {{}}\n\n".encode()
+                    continue
+                if events:
+                    seq = events[-1].seq
+                    yield b"".join(event.encode(boot_id) for event in events)
+                    continue
+                reason = await asyncio.shield(wakeup)
+                if reason == _HEARTBEAT:
+                    yield b": heartbeat\n\n"
+                elif reason == _CLOSE:
+                    return
+        finally:
+            self.subscribers -= 1
+
+    def _ensure_started(self) -> None:
+        if self._loop is None or self._loop.is_closed():
+            self._loop = asyncio.get_running_loop()
+            self._waiter = None
+            self._heartbeat_task = None
+        if self._heartbeat_task is None or self._heartbeat_task.done():
+            self._closed = False
+            self._heartbeat_task = self._loop.create_task(self._heartbeat())
+
+    async def _heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_seconds)
+            if self.subscribers:
+                self._wake(_HEARTBEAT)
+
+    async def close(self) -> None:
+        """应用关闭时调用：结束所有连接并停止心跳"""
+        if self._loop is None:
+            return
+        # 正在发送数据（没有等待唤醒）的连接在下一轮循环时检查 _closed
+        self._closed = True
+        self._wake(_CLOSE)
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+            try:
+                await self._heartbeat_task
+            except asyncio.CancelledError:
+                pass
+            self._heartbeat_task = None
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": self.subscribers,
+            "last_seq": self._seq,
+            "buffered": len(self._buffer),
+            "buffer_size": self._buffer.maxlen,
+        }
+
+
+# 全局单例：crud 写操作负责发布，/events 负责订阅
+change_events = EventBroadcaster(EVENTS_REPLAY_BUFFER, EVENTS_HEARTBEAT_SECONDS)
@@ -0,0 +1,46 @@
+# utils/http_cache.py
+import datetime
+import hashlib
+from email.utils import format_datetime
+from typing import Iterable, Optional, Union
+
+from fastapi import Request, Response
+
+
+def content_etag(body: Union[bytes, memoryview]) -> str:
+    """
+    按响应体的内容摘要生成强 ETag。
+    只取决于内容本身：各 worker、进程重启前后、共享快照与进程内缓存之间，相同的内容得到相同的 ETag，
+    其他 worker 的写操作改变了内容时 ETag 也随之改变。
+    """
+    return f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """判断请求头 If-None-Match 是否与当前 ETag 匹配（If-None-Match 使用弱比较）"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in header.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+
+def http_date(value: datetime.datetime) -> str:
+    """数据库中的 naive datetime 按服务器本地时间处理，转换为 HTTP-date (GMT)"""
+    return format_datetime(value.astimezone(datetime.timezone.utc), usegmt=True)
+
+
+def set_cache_headers(response: Response, etag: str,
+                      timestamps: Iterable[Optional[datetime.datetime]] = ()) -> None:
+    """设置 ETag / Last-Modified；Cache-Control: no-cache 让浏览器每次带 ETag 回源校验"""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    last_modified = max((ts for ts in timestamps if ts is not None), default=None)
+    if last_modified is not None:
+        response.headers["Last-Modified"] = http_date(last_modified)
@@ -0,0 +1,81 @@
+# utils/metrics.py
+from bisect import bisect_left
+from typing import Dict, List, Tuple
+
+from ..config import METRICS_LATENCY_BUCKETS
+
+
+class RouteStats:
+    """单个 (method, 路由模板) 的延迟直方图。桶内计数不累加，输出时再累加成 Prometheus 的 le 语义"""
+
+    __slots__ = ("buckets", "count", "total")
+
+    def __init__(self, size: int):
+        self.buckets = [0] * size
+        self.count = 0
+        self.total = 0.0
+
+
+class MetricsRegistry:
+    """
+    按路由模板统计的请求数 / 状态码 / 延迟直方图，以及正在处理中的请求数。
+
+    所有更新都在事件循环线程中完成，不加锁；路由模板的数量有限，标签基数可控。
+    """
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.bucket_bounds = tuple(sorted(buckets))
+        self.in_flight = 0
+        # (method, route) -> RouteStats
+        self._routes: Dict[Tuple[str, str], RouteStats] = {}
+        # (method, route, status) -> count
+        self._statuses: Dict[Tuple[str, str, int], int] = {}
+
+    def observe(self, method: str, route: str, status: int, seconds: float) -> None:
+        key = (method, route)
+        stats = self._routes.get(key)
+        if stats is None:
+            # 最后一个桶对应 +Inf
+            stats = self._routes[key] = RouteStats(len(self.bucket_bounds) + 1)
+        stats.buckets[bisect_left(self.bucket_bounds, seconds)] += 1
+        stats.count += 1
+        stats.total += seconds
+        status_key = (method, route, status)
+        self._statuses[status_key] = self._statuses.get(status_key, 0) + 1
+
+    def reset(self) -> None:
+        self._routes.clear()
+        self._statuses.clear()
+
+    def render(self) -> str:
+        """输出 Prometheus 文本格式 (text/plain; version=0.0.4)"""
+        lines: List[str] = [
+            "# HELP http_requests_in_flight Requests currently being processed.",
+            "# TYPE http_requests_in_flight gauge",
+            f"http_requests_in_flight {self.in_flight}",
+            "# HELP http_requests_total Requests by route template and status code.",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, route, status), count in sorted(self._statuses.items()):
+            lines.append(f'http_requests_total{{method="{method}",route="{_escape(route)}",status="{status}"}} {count}')
+
+        lines.append("# HELP http_request_duration_seconds Request latency by route template.")
+        lines.append("# TYPE http_request_duration_seconds histogram")
+        bounds = [repr(b) for b in self.bucket_bounds] + ["+Inf"]
+        for (method, route), stats in sorted(self._routes.items()):
+            labels = f'method="{method}",route="{_escape(route)}"'
+            cumulative = 0
+            for bound, count in zip(bounds, stats.buckets):
+                cumulative += count
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f"http_request_duration_seconds_sum{{{labels}}} {stats.total}")
+            lines.append(f"http_request_duration_seconds_count{{{labels}}} {stats.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# 全局单例：中间件负责记录，/metrics 负责输出
+metrics = MetricsRegistry(METRICS_LATENCY_BUCKETS)
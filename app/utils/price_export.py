@@ -0,0 +1,61 @@
+# utils/price_export.py
+import csv
+import datetime
+import decimal
+import io
+import json
+import zlib
+from typing import AsyncIterator, Sequence
+
+from sqlalchemy.engine import Row
+
+EXPORT_COLUMNS = (
+    "id", "category_id", "category_name", "repair_type_id", "repair_type_name",
+    "model_name", "price", "price_suffix", "is_visible", "sort_order", "updated_at",
+)
+
+MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+
+def _json_default(value):
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def encode_csv(rows: Sequence[Row], header: bool = False) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(EXPORT_COLUMNS)
+    writer.writerows(rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+def encode_ndjson(rows: Sequence[Row]) -> bytes:
+    return "".join(
+        json.dumps(dict(row._mapping), ensure_ascii=False, default=_json_default) + "\n" for row in rows
+    ).encode("utf-8")
+
+
+async def encode_export(partitions: AsyncIterator[Sequence[Row]], fmt: str,
+                        gzip: bool = False) -> AsyncIterator[bytes]:
+    """把分批读取的行编码成 CSV / NDJSON 数据块，可选边编码边 gzip 压缩"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS) if gzip else None
+
+    def emit(chunk: bytes) -> bytes:
+        return compressor.compress(chunk) if compressor else chunk
+
+    if fmt == "csv":
+        # 带 BOM，Excel 才能正确识别 UTF-8
+        yield emit("\ufeff".encode("utf-8") + encode_csv([], header=True))
+
+    async for rows in partitions:
+        chunk = emit(encode_csv(rows) if fmt == "csv" else encode_ndjson(rows))
+        if chunk:
+            yield chunk
+
+    if compressor:
+        yield compressor.flush()
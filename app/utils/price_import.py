@@ -0,0 +1,77 @@
+# utils/price_import.py
+import csv
+import io
+import json
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from ..models.repair_prices import RepairPriceCreate
+
+# (行号, 校验通过的数据, 错误信息)：二者必有其一
+ParsedRow = Tuple[int, Optional[RepairPriceCreate], Optional[str]]
+
+SUPPORTED_FORMATS = ("csv", "jsonl")
+
+
+def detect_format(filename: Optional[str], content_type: Optional[str]) -> Optional[str]:
+    name = (filename or "").lower()
+    if name.endswith(".csv") or content_type in ("text/csv", "application/csv"):
+        return "csv"
+    if name.endswith((".jsonl", ".ndjson")) or content_type in ("application/x-ndjson", "application/jsonl"):
+        return "jsonl"
+    return None
+
+
+def _validate(line_no: int, data) -> ParsedRow:
+    if not isinstance(data, dict):
+        return line_no, None, "row must be an object"
+    try:
+        return line_no, RepairPriceCreate.model_validate(data), None
+    except ValidationError as exc:
+        message = "; ".join(
+            f"{'.'.join(str(loc) for loc in err['loc']) or 'row'}: {err['msg']}" for err in exc.errors()
+        )
+        return line_no, None, message
+
+
+def _iter_csv(stream: BinaryIO) -> Iterator[ParsedRow]:
+    # utf-8-sig: 兼容 Excel 导出带 BOM 的文件
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    reader = csv.DictReader(text)
+    for record in reader:
+        # 空单元格视为未填写，使用模型默认值（例如 price_suffix="税込"）
+        data = {k.strip(): v for k, v in record.items() if k and v not in (None, "")}
+        yield _validate(reader.line_num, data)
+
+
+def _iter_jsonl(stream: BinaryIO) -> Iterator[ParsedRow]:
+    for line_no, raw in enumerate(stream, start=1):
+        if not raw.strip():
+            continue
+        try:
+            data = json.loads(raw)
+        except ValueError as exc:
+            yield line_no, None, f"invalid JSON: {exc}"
+            continue
+        yield _validate(line_no, data)
+
+
+def iter_price_rows(stream: BinaryIO, fmt: str) -> Iterator[ParsedRow]:
+    """逐行读取并校验上传文件，不会把整个文件读入内存"""
+    if fmt == "csv":
+        return _iter_csv(stream)
+    if fmt == "jsonl":
+        return _iter_jsonl(stream)
+    raise ValueError(f"unsupported format: {fmt}")
+
+
+def iter_batches(rows: Iterator[ParsedRow], batch_size: int) -> Iterator[List[ParsedRow]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -0,0 +1,249 @@
+# utils/search.py
+import asyncio
+import heapq
+import threading
+import time
+import unicodedata
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from ..config import PRICE_SEARCH_MAX_AGE, PRICE_SEARCH_MIN_MATCH
+from ..models.repair_prices import RepairPrice
+
+# ぁ-ゖ -> ァ-ヶ：平假名和片假名视为同一写法
+_HIRAGANA_TO_KATAKANA = {code: code + 0x60 for code in range(0x3041, 0x3097)}
+
+
+def normalize(text: str) -> str:
+    """
+    检索用的规范化：NFKC（全角英数 -> 半角，半角片假名 -> 全角）、大小写折叠、
+    平假名转片假名，并去掉空白和标点。"ｉＰｈｏｎｅ 15 Pro" 与 "iphone15pro" 结果相同。
+    """
+    text = unicodedata.normalize("NFKC", text).casefold().translate(_HIRAGANA_TO_KATAKANA)
+    return "".join(ch for ch in text if ch.isalnum())
+
+
+def bigrams(normalized: str) -> FrozenSet[str]:
+    """带首尾标记的 2-gram；首尾标记让前缀匹配得分更高，也使单字符查询可用"""
+    padded = f"\x02{normalized}\x03"
+    return frozenset(padded[i:i + 2] for i in range(len(padded) - 1))
+
+
+@dataclass(frozen=True)
+class _Entry:
+    price: RepairPrice
+    normalized: str
+
+    @classmethod
+    def of(cls, obj) -> "_Entry":
+        price = RepairPrice.model_validate(obj)
+        return cls(price, normalize(price.model_name))
+
+
+class PriceSearchIndex:
+    """
+    机型名 (DBRepairPrice.model_name) 的进程内 2-gram 倒排索引。
+
+    同一机型名在各个 分类 × 维修种类 下重复出现，倒排表以规范化后的机型名为单位，
+    打分只对不同的机型名进行一次，再展开到对应的价格记录。
+    - 首次检索时全量加载；此后 crud 的单条写操作提交后增量更新（upsert / remove），
+      批量导入、排序、级联删除等影响范围不明确的写操作使索引过期，下次检索时重新加载
+    - 其他 worker 的写操作无法感知，超过 max_age 秒后也会重新加载
+    - 打分：查询 2-gram 的命中比例低于 min_match 的候选丢弃（容忍少量错字），
+      其余按 Dice 系数排序，包含完整查询串的再加 1 分，前缀匹配再加 0.5 分
+    """
+
+    def __init__(self, max_age: float, min_match: float):
+        self.max_age = max_age
+        self.min_match = min_match
+        self._entries: Dict[int, _Entry] = {}
+        # 规范化机型名 -> 价格 id
+        self._names: Dict[str, Set[int]] = {}
+        # 规范化机型名 -> 2-gram 个数（Dice 系数的分母）
+        self._gram_counts: Dict[str, int] = {}
+        # 2-gram -> 规范化机型名
+        self._postings: Dict[str, Set[str]] = defaultdict(set)
+        # 同步回退模式下写操作在线程池中调用 upsert / remove
+        self._lock = threading.Lock()
+        # 最近一次全量加载的时间，None 表示尚未加载或已过期
+        self._loaded_at: Optional[float] = None
+        # 全量加载期间收到的增量操作，加载完成后重放
+        self._pending: Optional[List[Tuple[str, object]]] = None
+        self._stale_during_build = False
+        self._building: Optional[asyncio.Future] = None
+        self.rebuilds = 0
+        self.queries = 0
+
+    # -------------------------------------------------
+    # 维护
+    # -------------------------------------------------
+    def upsert(self, obj) -> None:
+        """写操作提交后调用，obj 为刷新后的 DBRepairPrice"""
+        entry = _Entry.of(obj)
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append(("upsert", entry))
+            if self._loaded_at is not None:
+                self._put(entry)
+
+    def remove(self, price_id: int) -> None:
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append(("remove", price_id))
+            if self._loaded_at is not None:
+                self._drop(price_id)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._loaded_at = None
+            if self._pending is not None:
+                self._stale_during_build = True
+
+    def _put(self, entry: _Entry) -> None:
+        price_id = entry.price.id
+        self._drop(price_id)
+        self._entries[price_id] = entry
+        ids = self._names.get(entry.normalized)
+        if ids is None:
+            ids = self._names[entry.normalized] = set()
+            grams = bigrams(entry.normalized)
+            self._gram_counts[entry.normalized] = len(grams)
+            for gram in grams:
+                self._postings[gram].add(entry.normalized)
+        ids.add(price_id)
+
+    def _drop(self, price_id: int) -> None:
+        old = self._entries.pop(price_id, None)
+        if old is None:
+            return
+        ids = self._names[old.normalized]
+        ids.discard(price_id)
+        if ids:
+            return
+        del self._names[old.normalized]
+        del self._gram_counts[old.normalized]
+        for gram in bigrams(old.normalized):
+            names = self._postings.get(gram)
+            if names is not None:
+                names.discard(old.normalized)
+                if not names:
+                    del self._postings[gram]
+
+    def _is_fresh(self) -> bool:
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at < self.max_age
+
+    async def ensure_loaded(self, loader: Callable[[], Awaitable[Iterable[object]]]) -> None:
+        """
+        索引过期时调用 loader 全量加载；同时到达的检索请求共用一次加载。
+        加载失败时等待的请求抛出同一个异常（而不是检索空索引），索引保持过期，下次检索重新加载；
+        负责加载的请求被取消时，等待的请求自己重新加载。
+        """
+        if self._is_fresh():
+            return
+        while self._building is not None:
+            await asyncio.shield(self._building)
+            if self._is_fresh():
+                return
+
+        self._building = asyncio.get_running_loop().create_future()
+        failure: Optional[BaseException] = None
+        try:
+            with self._lock:
+                self._pending = []
+                self._stale_during_build = False
+            try:
+                rows = await loader()
+                entries = [_Entry.of(obj) for obj in rows]
+            except BaseException as exc:
+                failure = exc
+                with self._lock:
+                    self._pending = None
+                raise
+
+            with self._lock:
+                self._entries = {}
+                self._names = {}
+                self._gram_counts = {}
+                self._postings = defaultdict(set)
+                for entry in entries:
+                    self._put(entry)
+                for op, arg in self._pending:
+                    if op == "upsert":
+                        self._put(arg)
+                    else:
+                        self._drop(arg)
+                self._pending = None
+                self._loaded_at = None if self._stale_during_build else time.monotonic()
+                self.rebuilds += 1
+        finally:
+            building, self._building = self._building, None
+            if isinstance(failure, Exception):
+                building.set_exception(failure)
+                # 没有等待者时避免 "exception was never retrieved" 警告
+                building.exception()
+            else:
+                building.set_result(None)
+
+    # -------------------------------------------------
+    # 检索
+    # -------------------------------------------------
+    def search(self, query: str, limit: int, category_id: Optional[int] = None,
+               repair_type_id: Optional[int] = None, include_hidden: bool = False) -> List[Tuple[RepairPrice, float]]:
+        """返回 (价格, 得分) 列表，得分相同时按 sort_order、id 降序（与价格列表的排序一致）"""
+        self.queries += 1
+        normalized = normalize(query)
+        if not normalized:
+            return []
+        query_grams = bigrams(normalized)
+        needed = self.min_match * len(query_grams)
+
+        with self._lock:
+            counts: Counter = Counter()
+            for gram in query_grams:
+                matched = self._postings.get(gram)
+                if matched:
+                    counts.update(matched)
+
+            names = []
+            for name, common in counts.items():
+                if common < needed:
+                    continue
+                score = 2 * common / (len(query_grams) + self._gram_counts[name])
+                if normalized in name:
+                    score += 1.5 if name.startswith(normalized) else 1.0
+                names.append((round(score, 4), name))
+            names.sort(reverse=True)
+
+            scored = []
+            for score, name in names:
+                # 已凑够 limit 条且得分更低的机型名不可能进入结果
+                if len(scored) >= limit and score < scored[-1][0]:
+                    break
+                for price_id in self._names[name]:
+                    price = self._entries[price_id].price
+                    if category_id is not None and price.category_id != category_id:
+                        continue
+                    if repair_type_id is not None and price.repair_type_id != repair_type_id:
+                        continue
+                    if not include_hidden and not price.is_visible:
+                        continue
+                    scored.append((score, price.sort_order, price_id, price))
+
+        best = heapq.nlargest(limit, scored, key=lambda item: item[:3])
+        return [(price, score) for score, _, _, price in best]
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "names": len(self._names),
+            "grams": len(self._postings),
+            "fresh": self._is_fresh(),
+            "rebuilds": self.rebuilds,
+            "queries": self.queries,
+            "max_age": self.max_age,
+        }
+
+
+# 全局单例：crud 写操作负责更新，/prices/search 负责检索
+price_index = PriceSearchIndex(PRICE_SEARCH_MAX_AGE, PRICE_SEARCH_MIN_MATCH)
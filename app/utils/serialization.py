@@ -0,0 +1,72 @@
+# utils/serialization.py
+import datetime
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Hashable, Iterable, Optional, Union
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+
+from .cache import catalog_cache, Namespace
+from .http_cache import content_etag, is_not_modified, not_modified, set_cache_headers
+
+
+@dataclass(frozen=True)
+class EncodedJSON:
+    """序列化好的响应体（来自共享快照时为 mmap 的切片），用于 Last-Modified 的时间，以及内容摘要 ETag"""
+    body: Union[bytes, memoryview]
+    last_modified: Optional[datetime.datetime] = None
+    etag: Optional[str] = None
+
+
+@lru_cache(maxsize=None)
+def get_adapter(tp: Any) -> TypeAdapter:
+    """每个响应类型只构建一次 TypeAdapter"""
+    return TypeAdapter(tp)
+
+
+def encode(tp: Any, data: Any,
+           timestamps: Optional[Callable[[Any], Iterable[Optional[datetime.datetime]]]] = None) -> EncodedJSON:
+    """
+    按 tp（与路由的 response_model 相同）校验 ORM 对象并直接序列化为 JSON 字节。
+    pydantic-core 的 dump_json 在 Rust 中完成编码，省去 FastAPI 的 jsonable_encoder + json.dumps。
+    ETag 在这里随响应体一起算好，与响应体一起缓存。
+    """
+    adapter = get_adapter(tp)
+    value = adapter.validate_python(data, from_attributes=True)
+    last_modified = None
+    if timestamps is not None:
+        last_modified = max((ts for ts in timestamps(value) if ts is not None), default=None)
+    body = adapter.dump_json(value)
+    return EncodedJSON(body, last_modified, content_etag(body))
+
+
+async def cached_json(namespace: Namespace, tp: Any, load: Callable[[], Awaitable[Any]], key: Hashable = None,
+                      timestamps: Optional[Callable[[Any], Iterable[Optional[datetime.datetime]]]] = None
+                      ) -> EncodedJSON:
+    """缓存序列化后的字节：数据未变化时既不查库也不重新序列化"""
+    async def build():
+        return encode(tp, await load(), timestamps)
+
+    return await catalog_cache.get_or_load(namespace, build, key=key)
+
+
+def json_response(encoded: EncodedJSON, etag: Optional[str] = None) -> Response:
+    """
+    直接返回原始字节。路由上仍声明 response_model，OpenAPI 文档保持不变，
+    但 FastAPI 遇到 Response 实例时不会再做一次校验和编码。
+    """
+    response = Response(content=encoded.body, media_type="application/json")
+    if etag is not None:
+        set_cache_headers(response, etag, (encoded.last_modified,))
+    return response
+
+
+def conditional_json_response(request: Request, encoded: EncodedJSON) -> Response:
+    """
+    带 ETag / Last-Modified 返回；If-None-Match 与内容摘要一致时返回 304。
+    encoded 来自进程内缓存或共享快照时，304 既不查库也不重新序列化。
+    """
+    if is_not_modified(request, encoded.etag):
+        return not_modified(encoded.etag)
+    return json_response(encoded, encoded.etag)
@@ -0,0 +1,360 @@
+# utils/snapshot.py
+import asyncio
+import datetime
+import json
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from itertools import groupby
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from fastapi import Request, Response
+from starlette.concurrency import run_in_threadpool
+
+from ..config import CATALOG_SNAPSHOT_PATH, CATALOG_SNAPSHOT_DEBOUNCE, CATALOG_SNAPSHOT_POLL_INTERVAL
+from ..models.categories import Category
+from ..models.repair_prices import RepairPrice, PriceListResponse
+from ..models.repair_types import RepairType
+from .http_cache import content_etag
+from .serialization import EncodedJSON, conditional_json_response, get_adapter, json_response
+
+try:
+    import fcntl
+except ImportError:  # Windows：没有跨进程的构建锁，多个 worker 同时构建时以最后写完的为准
+    fcntl = None
+
+logger = logging.getLogger("app.snapshot")
+
+# 文件头：magic、快照版本（开始读取数据库时的 time_ns）、索引长度。之后依次是 JSON 索引和各个响应体
+_MAGIC = b"PFCSNAP1"
+_HEADER = struct.Struct("<8sQI")
+
+# 这些表的写操作会使快照过期
+SNAPSHOT_TABLES = frozenset({"categories", "repair_types", "repair_prices"})
+
+
+def categories_key() -> str:
+    return "categories"
+
+
+def repair_types_key() -> str:
+    return "repair_types"
+
+
+def prices_key(category_id: int, repair_type_id: int) -> str:
+    return f"prices:{category_id}:{repair_type_id}"
+
+
+def matrix_key(category_id: Optional[int] = None) -> str:
+    return "matrix" if category_id is None else f"matrix:{category_id}"
+
+
+@dataclass(frozen=True)
+class SnapshotEntry:
+    # 指向共享映射的切片，返回响应时不复制
+    body: memoryview
+    etag: Optional[str]
+    last_modified: Optional[datetime.datetime]
+
+
+class Snapshot:
+    """一个已映射的快照文件。切换版本后旧映射由垃圾回收关闭（仍在发送的响应体持有它的引用）"""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.version, index_len = _HEADER.unpack_from(self._mmap, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"{path} is not a catalog snapshot")
+        data_start = _HEADER.size + index_len
+        index = json.loads(self._mmap[_HEADER.size:data_start])
+        view = memoryview(self._mmap)
+        self.size = len(self._mmap)
+        self._entries: Dict[str, SnapshotEntry] = {
+            key: SnapshotEntry(
+                body=view[data_start + offset:data_start + offset + length],
+                etag=etag,
+                last_modified=datetime.datetime.fromisoformat(modified) if modified else None,
+            )
+            for key, (offset, length, etag, modified) in index.items()
+        }
+
+    def get(self, key: str) -> Optional[SnapshotEntry]:
+        return self._entries.get(key)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def build_snapshot(db) -> Dict[str, Tuple[bytes, Optional[datetime.datetime], bool]]:
+    """
+    生成快照内容：key -> (响应体, Last-Modified, 是否带 ETag)。
+    响应体与对应路由的输出完全一致（同一个 response_model 和排序），
+    /prices/ 为每个 分类 × 维修种类 组合各存一份（含空列表），矩阵存全量和每个分类各一份。
+    """
+    # crud 的写操作会调用本模块，这里延迟导入
+    from .. import crud
+
+    categories = get_adapter(List[Category]).validate_python(crud.get_categories(db), from_attributes=True)
+    repair_types = get_adapter(List[RepairType]).validate_python(crud.get_repair_types(db), from_attributes=True)
+    # 价格只查询、校验一次：/prices/ 与矩阵的排序相同（get_prices_by_filter / get_price_matrix），
+    # 组合内 sort_order 降序、id 降序，矩阵只是其中的可见部分
+    prices = get_adapter(List[RepairPrice]).validate_python(crud.get_all_prices(db), from_attributes=True)
+    prices.sort(key=lambda p: (p.category_id, p.repair_type_id, -p.sort_order, -p.id))
+    visible = [p for p in prices if p.is_visible]
+    matrix = PriceListResponse(categories=categories, repair_types=repair_types, prices=visible)
+
+    def newest(items) -> Optional[datetime.datetime]:
+        return max((p.updated_at for p in items if p.updated_at is not None), default=None)
+
+    entries = {
+        categories_key(): (get_adapter(List[Category]).dump_json(categories), None, False),
+        repair_types_key(): (get_adapter(List[RepairType]).dump_json(repair_types), None, False),
+        matrix_key(): (matrix.model_dump_json().encode(), newest(visible), True),
+    }
+
+    by_pair = {pair: list(group) for pair, group in
+               groupby(prices, key=lambda p: (p.category_id, p.repair_type_id))}
+    price_list = get_adapter(List[RepairPrice])
+    for category in categories:
+        for repair_type in repair_types:
+            group = by_pair.get((category.id, repair_type.id), [])
+            entries[prices_key(category.id, repair_type.id)] = (price_list.dump_json(group), newest(group), True)
+
+    visible_by_category: Dict[int, List[RepairPrice]] = {}
+    for price in visible:
+        visible_by_category.setdefault(price.category_id, []).append(price)
+    for category in categories:
+        group = visible_by_category.get(category.id, [])
+        per_category = PriceListResponse(categories=[category], repair_types=repair_types, prices=group)
+        entries[matrix_key(category.id)] = (per_category.model_dump_json().encode(), newest(group), True)
+    return entries
+
+
+def read_version(path: str) -> Optional[int]:
+    try:
+        with open(path, "rb") as f:
+            magic, version, _ = _HEADER.unpack(f.read(_HEADER.size))
+    except (OSError, struct.error):
+        return None
+    return version if magic == _MAGIC else None
+
+
+def write_snapshot(path: str, version: int, entries: Dict[str, Tuple[bytes, Optional[datetime.datetime], bool]]) -> None:
+    """写入临时文件后 os.replace，读取方要么看到旧文件要么看到完整的新文件"""
+    index = {}
+    offset = 0
+    for key, (body, modified, with_etag) in entries.items():
+        etag = content_etag(body) if with_etag else None
+        index[key] = (offset, len(body), etag, modified.isoformat() if modified else None)
+        offset += len(body)
+    index_bytes = json.dumps(index, separators=(",", ":")).encode()
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".catalog-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, version, len(index_bytes)))
+            f.write(index_bytes)
+            for body, _, _ in entries.values():
+                f.write(body)
+        # mkstemp 创建的文件为 0600，以不同用户运行的 worker 也需要能读取
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+@contextmanager
+def _build_lock(path: str) -> Iterator[None]:
+    """跨进程串行化构建：后获得锁的 worker 读到的数据一定不旧于先发布的快照"""
+    if fcntl is None:
+        yield
+        return
+    with open(path + ".lock", "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class SharedCatalogSnapshot:
+    """
+    多 worker 共享的目录快照（分类 / 维修种类 / 价格列表 / 价格矩阵的 JSON 响应体）。
+
+    - 任一 worker 的目录写操作提交后标记过期，debounce 秒内的连续写合并为一次重建；
+      重建在线程池中从主库读取，写入临时文件后原子替换。各 worker 的重建由文件锁串行化，
+      拿到锁时若文件已由其他 worker 在本次写操作之后开始构建，则直接跳过
+    - 各 worker 通过 mmap 只读映射同一个文件，页缓存只有一份；每 poll_interval 秒 stat 一次，
+      文件被替换后映射新文件
+    - 本进程有尚未重建的写操作时 current() 返回 None，路由回退到原有的缓存 / 查库路径（读己之写）；
+      其他 worker 最多在 debounce + 重建耗时 + poll_interval 之后看到变更
+    path 为空时不启用。
+    """
+
+    def __init__(self, path: str, debounce: float, poll_interval: float):
+        self.path = path
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self._snapshot: Optional[Snapshot] = None
+        self._file_key: Optional[tuple] = None
+        self._checked_at = 0.0
+        # 写操作序号 / 最近一次重建开始时的序号
+        self._dirty_seq = 0
+        self._built_seq = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.rebuilds = 0
+        self.last_build_seconds: Optional[float] = None
+        self.swaps = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    # -------------------------------------------------
+    # 读
+    # -------------------------------------------------
+    def current(self) -> Optional[Snapshot]:
+        if not self.enabled or self._built_seq < self._dirty_seq:
+            return None
+        now = time.monotonic()
+        if now - self._checked_at >= self.poll_interval:
+            self._checked_at = now
+            self._refresh()
+        return self._snapshot
+
+    def _refresh(self) -> None:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            self._snapshot, self._file_key = None, None
+            return
+        file_key = (st.st_ino, st.st_mtime_ns, st.st_size)
+        if file_key == self._file_key:
+            return
+        try:
+            snapshot = Snapshot(self.path)
+        except (OSError, ValueError) as e:
+            logger.warning("failed to map catalog snapshot %s: %s", self.path, e)
+            return
+        self._snapshot, self._file_key = snapshot, file_key
+        self.swaps += 1
+
+    def get(self, key: str) -> Optional[SnapshotEntry]:
+        snapshot = self.current()
+        return snapshot.get(key) if snapshot is not None else None
+
+    # -------------------------------------------------
+    # 重建
+    # -------------------------------------------------
+    def mark_dirty(self) -> None:
+        """crud 写操作提交后调用（可能在线程池中）"""
+        if not self.enabled:
+            return
+        self._dirty_seq += 1
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._wakeup.set)
+
+    def rebuild(self, requested_at: Optional[int] = None) -> bool:
+        """
+        同步执行一次完整重建（在线程池中调用）。requested_at 为需要反映的写操作提交之后的 time_ns，
+        现有文件的版本比它新时不再重建。返回是否实际重建。
+        """
+        from ..database.database import SessionLocal
+
+        start = time.perf_counter()
+        with _build_lock(self.path):
+            if requested_at is not None and (read_version(self.path) or 0) > requested_at:
+                self._checked_at = 0.0
+                return False
+            version = time.time_ns()
+            db = SessionLocal()
+            # 配置了只读副本时，快照必须读主库上刚提交的数据
+            db.info["primary"] = True
+            try:
+                entries = build_snapshot(db)
+            finally:
+                db.close()
+            write_snapshot(self.path, version, entries)
+        self.rebuilds += 1
+        self.last_build_seconds = round(time.perf_counter() - start, 4)
+        self._checked_at = 0.0
+        return True
+
+    async def start(self) -> None:
+        """
+        应用启动时调用：启动后台重建任务并请求一次重建（停机期间数据库可能被直接修改）。
+        多个 worker 同时启动时只有第一个真正构建，其余的发现文件足够新后跳过。
+        """
+        if not self.enabled:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        self.mark_dirty()
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._loop = None
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            await asyncio.sleep(self.debounce)
+            self._wakeup.clear()
+            seq = self._dirty_seq
+            requested_at = time.time_ns()
+            try:
+                await run_in_threadpool(self.rebuild, requested_at)
+            except Exception:
+                # 保持过期状态，本进程的读请求继续走数据库；下一次写操作再尝试重建
+                logger.exception("catalog snapshot rebuild failed")
+                continue
+            self._built_seq = seq
+
+    def stats(self) -> dict:
+        snapshot = self._snapshot
+        return {
+            "enabled": self.enabled,
+            "path": self.path,
+            "version": snapshot.version if snapshot else None,
+            "entries": len(snapshot) if snapshot else 0,
+            "bytes": snapshot.size if snapshot else 0,
+            "stale": self._built_seq < self._dirty_seq,
+            "rebuilds": self.rebuilds,
+            "last_build_seconds": self.last_build_seconds,
+            "swaps": self.swaps,
+        }
+
+
+def snapshot_response(request: Request, entry: SnapshotEntry) -> Response:
+    """
+    直接返回快照中的响应体。ETag 为内容摘要，各 worker、各次重建之间只要内容不变就保持一致，
+    与未启用快照时（进程内缓存）同一内容的 ETag 也相同
+    """
+    encoded = EncodedJSON(entry.body, entry.last_modified, entry.etag)
+    if entry.etag is None:
+        return json_response(encoded)
+    return conditional_json_response(request, encoded)
+
+
+# 全局单例：crud 写操作负责标记过期，分类 / 价格路由负责读取
+catalog_snapshot = SharedCatalogSnapshot(CATALOG_SNAPSHOT_PATH, CATALOG_SNAPSHOT_DEBOUNCE,
+                                         CATALOG_SNAPSHOT_POLL_INTERVAL)
@@ -0,0 +1,61 @@
+# utils/token_cache.py
+import datetime
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from ..config import TOKEN_CACHE_TTL, TOKEN_CACHE_MAX_ENTRIES
+from ..models.user import UserPublic
+
+
+class TokenCache:
+    """
+    token -> 用户身份 的有界 TTL 缓存。
+    条目的过期时间取 缓存 TTL 与 token 本身有效期 两者中较早的一个，
+    命中时 get_current_user 无需打开数据库会话。
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # token -> (expires_at(monotonic), user)
+        self._entries: "OrderedDict[str, Tuple[float, UserPublic]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[UserPublic]:
+        entry = self._entries.get(token)
+        if entry is not None:
+            expires_at, user = entry
+            if expires_at > time.monotonic():
+                self.hits += 1
+                return user
+            self._entries.pop(token, None)
+        self.misses += 1
+        return None
+
+    def peek(self, token: str) -> Optional[UserPublic]:
+        """与 get 相同但不计入命中率（限流中间件判断是否为管理员请求时使用）"""
+        entry = self._entries.get(token)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+        return None
+
+    def put(self, token: str, user: UserPublic, token_expires_at: Optional[datetime.datetime]) -> None:
+        expires_at = time.monotonic() + self.ttl
+        if token_expires_at is not None:
+            remaining = (token_expires_at - datetime.datetime.now()).total_seconds()
+            expires_at = min(expires_at, time.monotonic() + remaining)
+        self._entries[token] = (expires_at, user)
+        self._entries.move_to_end(token)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, token: str) -> None:
+        self._entries.pop(token, None)
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries), "ttl": self.ttl}
+
+
+token_cache = TokenCache(ttl=TOKEN_CACHE_TTL, max_entries=TOKEN_CACHE_MAX_ENTRIES)
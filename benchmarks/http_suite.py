@@ -0,0 +1,231 @@
+"""
+HTTP 基准：在进程内启动应用（SQLite），按固定并发度压测公开 / 管理接口，输出 JSON。
+
+    python -m benchmarks.http_suite --output results.json
+    python -m benchmarks.http_suite --compare baseline.json --threshold 0.15
+
+请求经 httpx.ASGITransport 直接调用 ASGI 应用，不含网络和 HTTP 解析的开销，
+测的是应用本身（路由、缓存、序列化、数据库）。随机数种子固定，同一参数下请求序列可复现。
+--compare 模式下，任一 接口 × 并发度 的吞吐下降或 p95 上升超过阈值时以状态码 1 退出。
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import logging
+import os
+import platform
+import random
+import sys
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .seed import ADMIN_LOGINID, ADMIN_PASSWORD, Scale, boot
+
+# (method, url, json body)
+RequestSpec = Tuple[str, str, Optional[dict]]
+
+
+@dataclass
+class Scenario:
+    name: str
+    admin: bool
+    build: Callable[[random.Random], RequestSpec]
+
+
+def scenarios(scale: Scale, started_at: str) -> List[Scenario]:
+    def pair(rng: random.Random) -> Tuple[int, int]:
+        return rng.randint(1, scale.categories), rng.randint(1, scale.repair_types)
+
+    def price_id(c: int, r: int, m: int) -> int:
+        # 与 seed 的插入顺序一致：分类 -> 维修种类 -> 机型
+        return ((c - 1) * scale.repair_types + (r - 1)) * scale.models + m
+
+    def update_price(rng: random.Random) -> RequestSpec:
+        c, r = pair(rng)
+        m = rng.randint(1, scale.models)
+        body = {
+            "category_id": c, "repair_type_id": r, "model_name": f"Model {c}-{m}",
+            "price": rng.randrange(3000, 60000, 100), "sort_order": m,
+        }
+        return "PUT", f"/prices/{price_id(c, r, m)}", body
+
+    def reorder_faqs(rng: random.Random) -> RequestSpec:
+        ids = list(range(1, scale.faqs + 1))
+        rng.shuffle(ids)
+        return "PATCH", "/faq/reorder", {"ids": ids}
+
+    return [
+        Scenario("GET /categories/", False, lambda rng: ("GET", "/categories/", None)),
+        Scenario("GET /categories/repair-types", False, lambda rng: ("GET", "/categories/repair-types", None)),
+        Scenario("GET /prices/", False,
+                 lambda rng: ("GET", "/prices/?category_id=%d&repair_type_id=%d" % pair(rng), None)),
+        Scenario("GET /prices/matrix", False,
+                 lambda rng: ("GET", f"/prices/matrix?category_id={rng.randint(1, scale.categories)}", None)),
+        Scenario("GET /prices/search", False,
+                 lambda rng: ("GET", f"/prices/search?q=model+{rng.randint(1, scale.categories)}-{rng.randint(1, scale.models)}", None)),
+        Scenario("GET /faq/", False, lambda rng: ("GET", "/faq/?paginate=true", None)),
+        Scenario("GET /news/", False, lambda rng: ("GET", "/news/?paginate=true", None)),
+        Scenario("GET /config/", False, lambda rng: ("GET", "/config/", None)),
+        Scenario("PUT /prices/{price_id}", True, update_price),
+        Scenario("PATCH /faq/reorder", True, reorder_faqs),
+        Scenario("GET /prices/export (delta)", True,
+                 lambda rng: ("GET", f"/prices/export?format=ndjson&updated_since={started_at}", None)),
+        Scenario("GET /system/cache", True, lambda rng: ("GET", "/system/cache", None)),
+    ]
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """最近秩法的分位数"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(q * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+async def run_scenario(client, scenario: Scenario, concurrency: int, total: int,
+                       headers: Dict[str, str], seed: int) -> dict:
+    rng = random.Random(seed)
+    specs = [scenario.build(rng) for _ in range(total)]
+    latencies: List[float] = []
+    errors = 0
+    cursor = 0
+
+    async def worker():
+        nonlocal cursor, errors
+        while cursor < total:
+            method, url, body = specs[cursor]
+            cursor += 1
+            start = time.perf_counter()
+            response = await client.request(method, url, json=body, headers=headers if scenario.admin else None)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": total,
+        "errors": errors,
+        "throughput_rps": round(total / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+    }
+
+
+async def run_suite(app, scale: Scale, concurrency_levels: List[int], requests: int, warmup: int,
+                    only: Optional[List[str]], seed: int) -> Dict[str, Dict[str, dict]]:
+    import httpx
+
+    started_at = datetime.datetime.now().replace(microsecond=0).isoformat()
+    transport = httpx.ASGITransport(app=app)
+    results: Dict[str, Dict[str, dict]] = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        login = await client.post("/user/login", json={"loginid": ADMIN_LOGINID, "password": ADMIN_PASSWORD})
+        login.raise_for_status()
+        headers = {"Authorization": f"Bearer {login.json()['token']}"}
+
+        for scenario in scenarios(scale, started_at):
+            if only and not any(key in scenario.name for key in only):
+                continue
+            if warmup:
+                await run_scenario(client, scenario, 1, warmup, headers, seed)
+            results[scenario.name] = {}
+            for level in concurrency_levels:
+                stats = await run_scenario(client, scenario, level, requests, headers, seed)
+                results[scenario.name][str(level)] = stats
+                print(f"{scenario.name:<30} c={level:<4} {stats['throughput_rps']:>9.1f} rps  "
+                      f"p50={stats['p50_ms']:.2f}ms p95={stats['p95_ms']:.2f}ms p99={stats['p99_ms']:.2f}ms"
+                      + (f"  errors={stats['errors']}" if stats["errors"] else ""), file=sys.stderr)
+    return results
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> List[str]:
+    """返回超过阈值的回归项说明；只比较两份结果中都有的 接口 × 并发度"""
+    regressions = []
+    for name, levels in current["results"].items():
+        for level, stats in levels.items():
+            base = baseline.get("results", {}).get(name, {}).get(level)
+            if base is None:
+                continue
+            if stats["throughput_rps"] < base["throughput_rps"] * (1 - threshold):
+                regressions.append(f"{name} c={level}: throughput {base['throughput_rps']} -> {stats['throughput_rps']} rps")
+            if stats["p95_ms"] > base["p95_ms"] * (1 + threshold):
+                regressions.append(f"{name} c={level}: p95 {base['p95_ms']} -> {stats['p95_ms']} ms")
+            if stats["errors"] > base["errors"]:
+                regressions.append(f"{name} c={level}: errors {base['errors']} -> {stats['errors']}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="PhoneFix API HTTP benchmark (in-process, SQLite)")
+    parser.add_argument("--db", choices=("file", "memory"), default="file")
+    parser.add_argument("--concurrency", default="1,8,32", help="逗号分隔的并发度")
+    parser.add_argument("--requests", type=int, default=500, help="每个 接口 × 并发度 的请求数")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--only", action="append", help="只运行名称包含该字符串的接口，可重复")
+    parser.add_argument("--categories", type=int, default=Scale.categories)
+    parser.add_argument("--repair-types", type=int, default=Scale.repair_types)
+    parser.add_argument("--models", type=int, default=Scale.models)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-microcache", action="store_true", help="关闭匿名 GET 微缓存")
+    parser.add_argument("--output", help="结果 JSON 写入的文件，默认输出到 stdout")
+    parser.add_argument("--compare", metavar="BASELINE", help="与基线 JSON 比较，回归超过阈值时退出码为 1")
+    parser.add_argument("--threshold", type=float, default=0.15, help="允许的相对退化比例")
+    args = parser.parse_args(argv)
+
+    # 这些开关在 app.config 导入时读取，必须在 boot() 之前设置
+    if args.no_microcache:
+        os.environ["MICROCACHE_ENABLED"] = "0"
+    logging.getLogger("app.sql").setLevel(logging.ERROR)
+
+    scale = Scale(categories=args.categories, repair_types=args.repair_types, models=args.models)
+    seed_start = time.perf_counter()
+    app, url = boot(args.db, scale, args.seed)
+    print(f"seeded {scale.prices} prices into {url} in {time.perf_counter() - seed_start:.1f}s", file=sys.stderr)
+
+    levels = [int(level) for level in args.concurrency.split(",")]
+    results = asyncio.run(run_suite(app, scale, levels, args.requests, args.warmup, args.only, args.seed))
+
+    from app.config import USE_ASYNC_DB, MICROCACHE_ENABLED
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "db": args.db,
+            "use_async_db": USE_ASYNC_DB,
+            "microcache": MICROCACHE_ENABLED,
+            "scale": {"categories": scale.categories, "repair_types": scale.repair_types,
+                      "models": scale.models, "prices": scale.prices},
+            "concurrency": levels,
+            "requests": args.requests,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"no regressions beyond {args.threshold:.0%} against {args.compare}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
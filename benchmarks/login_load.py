@@ -0,0 +1,177 @@
+"""
+登录与公开接口混合负载：登录（scrypt 验证）集中到来时，公开 GET 的延迟是否受影响。
+
+    python -m benchmarks.login_load --workers 1,2,4 --duration 5
+
+在进程内启动应用（与 http_suite 相同，经 httpx.ASGITransport 调用），依次运行：
+公开 GET 按固定速率发出，延迟从计划发出的时刻算起，事件循环被阻塞的时间也会反映在延迟里。
+- baseline：只有公开 GET
+- inline  ：登录 + 公开 GET，密码验证直接在事件循环中执行（改动之前的做法，作对照）
+- workers=N：登录 + 公开 GET，密码验证在 N 个线程的专用线程池中执行
+输出每种情况下的登录吞吐、登录延迟、503 次数，以及公开 GET 的吞吐和延迟分位数。
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import sqlite3
+import sys
+import time
+from typing import List, Optional
+
+from .http_suite import percentile, scenarios
+from .seed import ADMIN_LOGINID, ADMIN_PASSWORD, Scale, boot
+
+
+def _summary(latencies: List[float], elapsed: float) -> dict:
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+    }
+
+
+async def run_mixed(client, public, get_clients: int, get_rate: float, login_clients: int,
+                    duration: float, seed: int) -> dict:
+    """
+    公开 GET 按固定速率发出（get_clients 个客户端均分 get_rate），延迟从计划发出的时刻算起：
+    事件循环被阻塞时，晚发出的请求也计入延迟（避免 coordinated omission）。登录客户端连续发请求。
+    """
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    deadline = start + duration
+    interval = get_clients / get_rate if get_rate > 0 else 0
+    get_latencies: List[float] = []
+    login_latencies: List[float] = []
+    counts = {"get_errors": 0, "login_ok": 0, "login_busy": 0, "login_errors": 0}
+
+    async def get_worker(index: int):
+        scheduled = start + interval * index / get_clients
+        while scheduled < deadline:
+            # 到点前等待；已落后于计划时也让出一次，否则命中微缓存的请求全程不会挂起
+            await asyncio.sleep(max(scheduled - time.perf_counter(), 0))
+            method, url, body = rng.choice(public).build(rng)
+            response = await client.request(method, url, json=body)
+            get_latencies.append(time.perf_counter() - scheduled)
+            if response.status_code >= 400:
+                counts["get_errors"] += 1
+            scheduled += interval
+
+    async def login_worker():
+        credentials = {"loginid": ADMIN_LOGINID, "password": ADMIN_PASSWORD}
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            response = await client.post("/user/login", json=credentials)
+            if response.status_code == 200:
+                login_latencies.append(time.perf_counter() - start)
+                counts["login_ok"] += 1
+            elif response.status_code == 503:
+                counts["login_busy"] += 1
+                await asyncio.sleep(float(response.headers.get("Retry-After", "1")) / 10)
+            else:
+                counts["login_errors"] += 1
+
+    await asyncio.gather(*(get_worker(i) for i in range(get_clients if interval else 0)),
+                         *(login_worker() for _ in range(login_clients)))
+    elapsed = time.perf_counter() - start
+    return {"get": _summary(get_latencies, elapsed), "login": _summary(login_latencies, elapsed), **counts}
+
+
+async def run_suite(app, scale: Scale, workers_list: List[int], get_clients: int, get_rate: float,
+                    login_clients: int, duration: float, seed: int) -> dict:
+    import httpx
+    from app.api import user as user_api
+    from app.utils.auth import PasswordHasher, password_hasher
+
+    class InlineHasher(PasswordHasher):
+        """对照组：直接在事件循环中验证"""
+
+        async def _run(self, fn, *args):
+            return fn(*args)
+
+    public = [scenario for scenario in scenarios(scale, "") if not scenario.admin]
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # 第一次登录把种子数据中的明文密码换成哈希，之后每次登录都要做一次 scrypt 验证
+        (await client.post("/user/login", json={"loginid": ADMIN_LOGINID, "password": ADMIN_PASSWORD})).raise_for_status()
+        # 预热：各接口的缓存、检索索引首次加载不计入 baseline
+        await run_mixed(client, public, get_clients, get_rate, 0, duration, seed)
+
+        runs = [("baseline", None, 0), ("inline", InlineHasher(1, 1 << 30), login_clients)]
+        runs += [(f"workers={n}", PasswordHasher(n, password_hasher.max_pending), login_clients) for n in workers_list]
+        for name, hasher, logins in runs:
+            if hasher is not None:
+                user_api.password_hasher = hasher
+            try:
+                stats = await run_mixed(client, public, get_clients, get_rate, logins, duration, seed)
+            finally:
+                if hasher is not None:
+                    hasher.shutdown()
+                user_api.password_hasher = password_hasher
+            results[name] = stats
+            get, login = stats["get"], stats["login"]
+            print(f"{name:<10} GET {get['throughput_rps']:>8.1f} rps p50={get['p50_ms']:.2f}ms "
+                  f"p99={get['p99_ms']:.2f}ms | login {login['throughput_rps']:>6.1f}/s "
+                  f"p50={login['p50_ms']:.1f}ms p99={login['p99_ms']:.1f}ms"
+                  + (f" busy={stats['login_busy']}" if stats["login_busy"] else ""), file=sys.stderr)
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Login (scrypt) vs public GET latency under mixed load")
+    parser.add_argument("--workers", default="1,2,4", help="逗号分隔的密码哈希线程数")
+    parser.add_argument("--get-clients", type=int, default=16, help="并发的公开 GET 客户端数")
+    parser.add_argument("--get-rate", type=float, default=200.0, help="公开 GET 的总发送速率（次/秒）")
+    parser.add_argument("--login-clients", type=int, default=16, help="并发的登录客户端数")
+    parser.add_argument("--duration", type=float, default=5.0, help="每种情况的运行秒数")
+    parser.add_argument("--categories", type=int, default=Scale.categories)
+    parser.add_argument("--repair-types", type=int, default=Scale.repair_types)
+    parser.add_argument("--models", type=int, default=Scale.models)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="结果 JSON 写入的文件，默认输出到 stdout")
+    args = parser.parse_args(argv)
+
+    logging.getLogger("app.sql").setLevel(logging.ERROR)
+    scale = Scale(categories=args.categories, repair_types=args.repair_types, models=args.models)
+    app, url = boot("file", scale, args.seed)
+    # 默认的回滚日志模式下，持续的读请求会让登录写 token 的事务一直拿不到写锁，
+    # 测到的就成了 SQLite 的锁等待而不是密码验证；WAL 模式下读写互不阻塞（与 MySQL 的行为接近）
+    with sqlite3.connect(url.replace("sqlite:///", "")) as conn:
+        conn.execute("PRAGMA journal_mode=WAL")
+    workers_list = [int(n) for n in args.workers.split(",")]
+    results = asyncio.run(run_suite(app, scale, workers_list, args.get_clients, args.get_rate, args.login_clients,
+                                    args.duration, args.seed))
+
+    from app.config import PASSWORD_SCRYPT_N, PASSWORD_SCRYPT_R, PASSWORD_SCRYPT_P
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "scrypt": {"n": PASSWORD_SCRYPT_N, "r": PASSWORD_SCRYPT_R, "p": PASSWORD_SCRYPT_P},
+            "get_clients": args.get_clients,
+            "get_rate": args.get_rate,
+            "login_clients": args.login_clients,
+            "duration": args.duration,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+"""
+MetricsMiddleware 的单请求开销微基准。
+
+直接调用 ASGI 应用，不经过网络和 HTTP 解析，对比 裸应用 与 套上指标中间件 的耗时差：
+    python -m benchmarks.metrics_overhead [--requests 200000]
+"""
+import argparse
+import asyncio
+import time
+
+from starlette.routing import Route, Router
+
+from app.middleware.metrics import MetricsMiddleware
+from app.utils.metrics import MetricsRegistry
+
+_START = {"type": "http.response.start", "status": 200, "headers": []}
+_BODY = {"type": "http.response.body", "body": b"ok"}
+
+
+async def _endpoint(scope, receive, send):
+    await send(_START)
+    await send(_BODY)
+
+
+def _routed_app(router: Router):
+    """模拟路由匹配后写入 scope["route"] 的普通请求"""
+    route = router.routes[0]
+
+    async def app(scope, receive, send):
+        scope["route"] = route
+        await _endpoint(scope, receive, send)
+    return app
+
+
+async def _receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _send(message):
+    pass
+
+
+async def _run(app, n: int) -> float:
+    scope = {"type": "http", "method": "GET", "path": "/prices/1", "root_path": "", "headers": []}
+    start = time.perf_counter()
+    for _ in range(n):
+        await app(dict(scope), _receive, _send)
+    return time.perf_counter() - start
+
+
+async def main(n: int) -> None:
+    router = Router(routes=[Route("/prices/{price_id}", _endpoint)])
+    cases = {
+        "bare": _routed_app(router),
+        "metrics (scope route)": MetricsMiddleware(_routed_app(router), MetricsRegistry((0.005, 0.05, 0.5)), router),
+        "metrics (path lookup)": MetricsMiddleware(_endpoint, MetricsRegistry((0.005, 0.05, 0.5)), router),
+    }
+    # 预热
+    for app in cases.values():
+        await _run(app, 1000)
+
+    baseline = None
+    for name, app in cases.items():
+        per_request = await _run(app, n) / n * 1e9
+        if baseline is None:
+            baseline = per_request
+            print(f"{name:<24} {per_request:8.0f} ns/req")
+        else:
+            print(f"{name:<24} {per_request:8.0f} ns/req  (+{per_request - baseline:.0f} ns)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200_000)
+    asyncio.run(main(parser.parse_args().requests))
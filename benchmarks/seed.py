@@ -0,0 +1,100 @@
+"""
+基准环境：把应用指向本地 SQLite，执行迁移并写入接近生产规模的目录数据。
+
+必须在导入 app.* 之前调用 boot()，因为 DATABASE_URL 在 app.database.database 导入时读取。
+"""
+import datetime
+import os
+import random
+import sqlite3
+import tempfile
+from dataclasses import dataclass
+
+ADMIN_LOGINID = "bench-admin"
+ADMIN_PASSWORD = "bench-password"
+
+# 内存库使用共享缓存，同一进程内的所有连接（同步 / aiosqlite / alembic）看到同一个库
+MEMORY_URI = "file:phonefix_bench?mode=memory&cache=shared"
+
+
+@dataclass
+class Scale:
+    categories: int = 20
+    repair_types: int = 30
+    models: int = 200
+    faqs: int = 50
+    news: int = 100
+
+    @property
+    def prices(self) -> int:
+        return self.categories * self.repair_types * self.models
+
+
+# 内存库需要一直保持至少一个连接，否则最后一个连接关闭时库就被销毁
+_memory_keeper = None
+
+
+def boot(db: str = "file", scale: Scale = Scale(), seed: int = 42):
+    """
+    db: "file"（临时文件）或 "memory"（共享缓存的内存库）。
+    返回 (FastAPI app, 数据库 URL)。
+    """
+    global _memory_keeper
+    if db == "memory":
+        _memory_keeper = sqlite3.connect(MEMORY_URI, uri=True)
+        url = f"sqlite:///{MEMORY_URI}&uri=true"
+    else:
+        path = os.path.join(tempfile.mkdtemp(prefix="phonefix-bench-"), "bench.db")
+        url = f"sqlite:///{path}"
+    os.environ["DATABASE_URL"] = url
+    # 基准的所有请求都来自同一个客户端地址，默认关闭限流，否则测到的是 429
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "0")
+
+    from app.database.database import init_db
+    init_db()
+    _seed(scale, random.Random(seed))
+
+    from app.main import app
+    return app, url
+
+
+def _seed(scale: Scale, rng: random.Random) -> None:
+    from sqlalchemy import insert
+    from app.database.database import SessionLocal
+    from app.database.models import DBUser, DBCategory, DBRepairType, DBRepairPrice, DBFaq, DBNews, DBSiteConfig
+
+    with SessionLocal() as db:
+        db.execute(insert(DBUser), [{"loginid": ADMIN_LOGINID, "password": ADMIN_PASSWORD}])
+        db.execute(insert(DBCategory), [
+            {"id": c, "name": f"Category {c}", "sort_order": c, "is_active": True}
+            for c in range(1, scale.categories + 1)
+        ])
+        db.execute(insert(DBRepairType), [
+            {"id": r, "name": f"Repair {r}", "sort_order": r}
+            for r in range(1, scale.repair_types + 1)
+        ])
+        for c in range(1, scale.categories + 1):
+            db.execute(insert(DBRepairPrice), [
+                {
+                    "category_id": c,
+                    "repair_type_id": r,
+                    "model_name": f"Model {c}-{m}",
+                    "price": rng.randrange(3000, 60000, 100),
+                    "price_suffix": "税込",
+                    "is_visible": rng.random() > 0.05,
+                    "sort_order": m,
+                }
+                for r in range(1, scale.repair_types + 1)
+                for m in range(1, scale.models + 1)
+            ])
+        db.execute(insert(DBFaq), [
+            {"title": f"Question {i}", "content": "answer " * 40, "sort_order": i, "is_visible": True}
+            for i in range(1, scale.faqs + 1)
+        ])
+        start = datetime.date(2024, 1, 1)
+        db.execute(insert(DBNews), [
+            {"title": f"News {i}", "content": "content " * 80, "publish_date": start + datetime.timedelta(days=i)}
+            for i in range(1, scale.news + 1)
+        ])
+        db.execute(insert(DBSiteConfig), [{"id": 1, "hero_title": "PhoneFix", "hero_content": "修理"}])
+        db.commit()
@@ -0,0 +1,127 @@
+"""
+共享目录快照的内存对比：N 个 worker 各自持有一份序列化好的目录 vs 共同映射同一个快照文件。
+
+    python -m benchmarks.snapshot_memory --workers 1,4,8
+
+在种子数据上构建一次快照，然后为每个 worker 数启动 N 个子进程，分别：
+- private：把快照内容读入进程自己的内存（相当于每个 worker 各自缓存同样的响应体）
+- shared ：mmap 快照文件并读遍所有响应体（与 app/utils/snapshot.py 的读取方式相同）
+所有子进程都加载完毕后同时读取 /proc/self/smaps_rollup，按 PSS（共享页按进程数均摊）汇总。
+数值已减去空闲子进程的基线。仅支持 Linux。
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from typing import Dict, List, Optional
+
+from .seed import Scale, boot
+
+
+def _smaps() -> Dict[str, int]:
+    """smaps_rollup 中的各项（KiB）"""
+    values = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].endswith(":") and parts[1].isdigit():
+                values[parts[0][:-1]] = int(parts[1])
+    return values
+
+
+def _worker(mode: str, path: str, ready, done, results) -> None:
+    # 各模式都导入同样的模块，基线只差在快照数据本身
+    from app.utils.snapshot import Snapshot
+
+    held = None
+    if mode == "private":
+        with open(path, "rb") as f:
+            held = f.read()
+    elif mode == "shared":
+        held = Snapshot(path)
+        # 读遍每个响应体的每一页，使其真正映射进来
+        for key in list(held._entries):
+            body = held.get(key).body
+            sum(body[::4096])
+    ready.wait()
+    smaps = _smaps()
+    results.put({"pss": smaps.get("Pss", 0), "rss": smaps.get("Rss", 0),
+                 "private": smaps.get("Private_Clean", 0) + smaps.get("Private_Dirty", 0)})
+    done.wait()
+    del held
+
+
+def measure(mode: str, path: str, workers: int) -> dict:
+    ctx = multiprocessing.get_context("spawn")
+    ready, done, results = ctx.Barrier(workers + 1), ctx.Event(), ctx.Queue()
+    processes = [ctx.Process(target=_worker, args=(mode, path, ready, done, results)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    ready.wait()
+    samples = [results.get() for _ in range(workers)]
+    done.set()
+    for process in processes:
+        process.join()
+    return {
+        "pss_kib": sum(s["pss"] for s in samples),
+        "rss_kib": sum(s["rss"] for s in samples),
+        "private_kib": sum(s["private"] for s in samples),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Catalog snapshot memory: private copies vs shared mmap")
+    parser.add_argument("--workers", default="1,4,8", help="逗号分隔的 worker 数")
+    parser.add_argument("--categories", type=int, default=Scale.categories)
+    parser.add_argument("--repair-types", type=int, default=Scale.repair_types)
+    parser.add_argument("--models", type=int, default=Scale.models)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="结果 JSON 写入的文件，默认输出到 stdout")
+    args = parser.parse_args(argv)
+    if not os.path.exists("/proc/self/smaps_rollup"):
+        print("/proc/self/smaps_rollup is required (Linux)", file=sys.stderr)
+        return 2
+
+    scale = Scale(categories=args.categories, repair_types=args.repair_types, models=args.models)
+    _, url = boot("file", scale, args.seed)
+    path = os.path.join(os.path.dirname(url.replace("sqlite:///", "")), "catalog.snap")
+
+    from app.utils.snapshot import SharedCatalogSnapshot
+    snapshot = SharedCatalogSnapshot(path, debounce=0, poll_interval=0)
+    start = time.perf_counter()
+    snapshot.rebuild()
+    build_seconds = time.perf_counter() - start
+    size = os.path.getsize(path)
+    print(f"built {size / 1024 / 1024:.1f} MiB snapshot of {scale.prices} prices in {build_seconds:.2f}s",
+          file=sys.stderr)
+
+    results = {}
+    for workers in (int(n) for n in args.workers.split(",")):
+        baseline = measure("none", path, workers)
+        results[str(workers)] = {}
+        for mode in ("private", "shared"):
+            stats = measure(mode, path, workers)
+            stats = {key: stats[key] - baseline[key] for key in stats}
+            results[str(workers)][mode] = stats
+            print(f"workers={workers:<3} {mode:<8} PSS {stats['pss_kib'] / 1024:8.1f} MiB  "
+                  f"private {stats['private_kib'] / 1024:8.1f} MiB", file=sys.stderr)
+
+    report = {
+        "meta": {"scale": {"categories": scale.categories, "repair_types": scale.repair_types,
+                           "models": scale.models, "prices": scale.prices},
+                 "snapshot_bytes": size, "build_seconds": round(build_seconds, 3)},
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
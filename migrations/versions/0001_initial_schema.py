@@ -0,0 +1,85 @@
+"""initial schema (与原 init_db/create_all 建出的表结构一致)
+
+已有的生产库请先执行 `alembic stamp 0001` 标记为基线，再 `alembic upgrade head`。
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user",
+        sa.Column("loginid", sa.String(20), primary_key=True, index=True),
+        sa.Column("password", sa.String(300), nullable=False),
+        sa.Column("token", sa.String(300), nullable=True),
+    )
+    op.create_table(
+        "news",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("title", sa.String(255), nullable=False),
+        sa.Column("content", sa.Text, nullable=False),
+        sa.Column("publish_date", sa.Date, nullable=False),
+        sa.Column("created_at", sa.DateTime, server_default=sa.func.now()),
+    )
+    op.create_table(
+        "categories",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("name", sa.String(50), nullable=False),
+        sa.Column("sort_order", sa.Integer),
+        sa.Column("is_active", sa.Boolean),
+        sa.Column("created_at", sa.DateTime, server_default=sa.func.now()),
+    )
+    op.create_table(
+        "repair_types",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("name", sa.String(50), nullable=False),
+        sa.Column("sort_order", sa.Integer),
+        sa.Column("created_at", sa.DateTime, server_default=sa.func.now()),
+    )
+    op.create_table(
+        "repair_prices",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("category_id", sa.Integer, sa.ForeignKey("categories.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("repair_type_id", sa.Integer, sa.ForeignKey("repair_types.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("model_name", sa.String(100), nullable=False),
+        sa.Column("price", sa.Numeric(10, 2), nullable=False),
+        sa.Column("price_suffix", sa.String(20)),
+        sa.Column("is_visible", sa.Boolean),
+        sa.Column("sort_order", sa.Integer, nullable=False),
+        sa.Column("updated_at", sa.DateTime, server_default=sa.func.now()),
+    )
+    op.create_table(
+        "faqs",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("title", sa.Text, nullable=False),
+        sa.Column("content", sa.Text, nullable=False),
+        sa.Column("sort_order", sa.Integer),
+        sa.Column("is_visible", sa.Boolean),
+        sa.Column("created_at", sa.DateTime, server_default=sa.func.now()),
+    )
+    op.create_table(
+        "site_configs",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("hero_title", sa.Text, nullable=False),
+        sa.Column("hero_content", sa.Text, nullable=False),
+        sa.Column("hero_image_url", sa.String(500)),
+        sa.Column("hero_video_url", sa.String(500)),
+        sa.Column("line_url", sa.String(500)),
+        sa.Column("x_url", sa.String(500)),
+        sa.Column("company_address", sa.Text),
+        sa.Column("business_hours", sa.Text),
+    )
+
+
+def downgrade() -> None:
+    for table in ("site_configs", "faqs", "repair_prices", "repair_types", "categories", "news", "user"):
+        op.drop_table(table)
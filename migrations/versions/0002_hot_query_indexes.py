@@ -0,0 +1,26 @@
+"""hot query indexes: repair_prices 组合筛选 + 排序，user.token 查询
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_repair_prices_cat_rt_sort",
+        "repair_prices",
+        ["category_id", "repair_type_id", "sort_order", "id"],
+    )
+    op.create_index("ix_user_token", "user", ["token"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_user_token", table_name="user")
+    op.drop_index("ix_repair_prices_cat_rt_sort", table_name="repair_prices")
@@ -0,0 +1,22 @@
+"""keyset pagination indexes: news (publish_date, id), faqs (sort_order, id)
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_news_publish_date_id", "news", ["publish_date", "id"])
+    op.create_index("ix_faqs_sort_order_id", "faqs", ["sort_order", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_faqs_sort_order_id", table_name="faqs")
+    op.drop_index("ix_news_publish_date_id", table_name="news")
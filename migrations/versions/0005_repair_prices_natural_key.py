@@ -0,0 +1,27 @@
+"""repair_prices natural key: (category_id, repair_type_id, model_name) 唯一
+
+批量导入按该键做 INSERT ... ON DUPLICATE KEY UPDATE / ON CONFLICT。
+已有重复数据时升级会失败，需要先清理重复行。
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("repair_prices") as batch_op:
+        batch_op.create_unique_constraint(
+            "uq_repair_prices_natural_key", ["category_id", "repair_type_id", "model_name"]
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("repair_prices") as batch_op:
+        batch_op.drop_constraint("uq_repair_prices_natural_key", type_="unique")
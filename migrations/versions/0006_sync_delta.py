@@ -0,0 +1,48 @@
+"""sync delta: news / faqs 增加 updated_at，修改时间索引，删除记录表 sync_tombstones
+
+/sync 按修改时间取增量，删除通过 sync_tombstones 下发。
+已有行的 updated_at 用 created_at 回填。
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    for table in ("news", "faqs"):
+        op.add_column(table, sa.Column("updated_at", sa.DateTime(), nullable=True))
+        op.execute(f"UPDATE {table} SET updated_at = COALESCE(created_at, CURRENT_TIMESTAMP)")
+
+    op.create_index("ix_repair_prices_updated_at", "repair_prices", ["updated_at"])
+    op.create_index("ix_news_updated_at", "news", ["updated_at"])
+    op.create_index("ix_faqs_updated_at", "faqs", ["updated_at"])
+
+    op.create_table(
+        "sync_tombstones",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("entity", sa.String(length=20), nullable=False),
+        sa.Column("entity_id", sa.Integer(), nullable=False),
+        sa.Column("deleted_at", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_sync_tombstones_deleted_at", "sync_tombstones", ["deleted_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_sync_tombstones_deleted_at", table_name="sync_tombstones")
+    op.drop_table("sync_tombstones")
+
+    op.drop_index("ix_faqs_updated_at", table_name="faqs")
+    op.drop_index("ix_news_updated_at", table_name="news")
+    op.drop_index("ix_repair_prices_updated_at", table_name="repair_prices")
+    for table in ("news", "faqs"):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column("updated_at")
@@ -0,0 +1,49 @@
+"""competitor prices: 竞品价格表 competitor_prices，抓取页面的缓存校验信息 crawl_pages
+
+由 app/crawler 写入。
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "competitor_prices",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("source", sa.String(length=50), nullable=False),
+        sa.Column("url", sa.String(length=255), nullable=False),
+        sa.Column("model_name", sa.String(length=100), nullable=False),
+        sa.Column("competitor_model_name", sa.String(length=200), nullable=False),
+        sa.Column("repair_type_id", sa.Integer(), nullable=True),
+        sa.Column("price", sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column("fetched_at", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(["repair_type_id"], ["repair_types.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("source", "url", "competitor_model_name", name="uq_competitor_prices_source_item"),
+    )
+    op.create_index("ix_competitor_prices_model_name", "competitor_prices", ["model_name"])
+
+    op.create_table(
+        "crawl_pages",
+        sa.Column("url", sa.String(length=255), nullable=False),
+        sa.Column("etag", sa.String(length=255), nullable=True),
+        sa.Column("last_modified", sa.String(length=64), nullable=True),
+        sa.Column("status", sa.Integer(), nullable=True),
+        sa.Column("checked_at", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("url"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("crawl_pages")
+    op.drop_index("ix_competitor_prices_model_name", table_name="competitor_prices")
+    op.drop_table("competitor_prices")
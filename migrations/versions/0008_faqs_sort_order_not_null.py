@@ -0,0 +1,27 @@
+"""faqs.sort_order NOT NULL (默认 0)
+
+FAQ 列表按 (sort_order, id) 做 keyset 分页，sort_order 为 NULL 的行会生成无法解析的游标，
+排序位置在 MySQL / SQLite 中也与其他行不一致。已有的 NULL 按 0 回填（与 ORM 的默认值相同）。
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("UPDATE faqs SET sort_order = 0 WHERE sort_order IS NULL")
+    with op.batch_alter_table("faqs") as batch_op:
+        batch_op.alter_column("sort_order", existing_type=sa.Integer(), nullable=False, server_default="0")
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("faqs") as batch_op:
+        batch_op.alter_column("sort_order", existing_type=sa.Integer(), nullable=True, server_default=None)
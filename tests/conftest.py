@@ -0,0 +1,48 @@
+"""
+测试环境：与 benchmarks 相同，把应用指向临时 SQLite 文件并写入小规模的种子数据。
+
+异步模式（默认 USE_ASYNC_DB=1）下所有查询走 sqlite+aiosqlite；
+USE_ASYNC_DB=0 python -m pytest 可以用同一套用例检查同步回退模式。
+必须在导入 app.* 之前调用 boot()，因为 DATABASE_URL 在 app.database.database 导入时读取。
+"""
+import os
+
+import pytest
+
+from benchmarks.seed import ADMIN_LOGINID, ADMIN_PASSWORD, Scale, boot
+
+# 限流与其他中间件一起运行：各前缀的规则足够宽松，/prices/export 单独收紧供 test_rate_limit 使用
+os.environ.setdefault("RATE_LIMIT_ENABLED", "1")
+os.environ.setdefault("RATE_LIMIT_RULES", ",".join(
+    [f"{prefix}=1000:1000" for prefix in ("/prices", "/categories", "/faq", "/news", "/config", "/sync")]
+    + ["/prices/export=0.001:1"]
+))
+
+SCALE = Scale(categories=3, repair_types=3, models=4, faqs=5, news=5)
+
+app, DATABASE_URL = boot("file", SCALE, seed=1)
+
+
+@pytest.fixture(scope="session")
+def client():
+    """
+    整个测试会话共用一个 TestClient：应用（含 lifespan）运行在同一个事件循环中，
+    aiosqlite 的连接属于这个循环，不能跨循环复用
+    """
+    from fastapi.testclient import TestClient
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(scope="session")
+def run(client):
+    """在应用的事件循环中执行协程函数：run(fn, *args)"""
+    return client.portal.call
+
+
+@pytest.fixture(scope="session")
+def admin_headers(client):
+    response = client.post("/user/login", json={"loginid": ADMIN_LOGINID, "password": ADMIN_PASSWORD})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['token']}"}
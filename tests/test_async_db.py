@@ -0,0 +1,65 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app import async_crud as crud
+from app.config import USE_ASYNC_DB
+from app.database.database import async_engine, to_async_url
+from app.database.dependency import session_scope
+from app.models.categories import CategoryCreate
+
+
+def test_async_driver_is_derived_from_database_url():
+    assert to_async_url("sqlite:///./test.db") == "sqlite+aiosqlite:///./test.db"
+    assert to_async_url("mysql+pymysql://u:p@db:3306/phonefix") == "mysql+aiomysql://u:p@db:3306/phonefix"
+    assert to_async_url("mysql+aiomysql://u:p@db/phonefix") == "mysql+aiomysql://u:p@db/phonefix"
+
+
+def test_session_scope_follows_use_async_db(run):
+    async def session_type():
+        async with session_scope() as db:
+            return type(db)
+
+    if USE_ASYNC_DB:
+        assert issubclass(run(session_type), AsyncSession)
+        assert async_engine.url.drivername == "sqlite+aiosqlite"
+    else:
+        assert issubclass(run(session_type), Session)
+        assert async_engine is None
+
+
+def test_async_crud_round_trip(run):
+    async def round_trip():
+        async with session_scope(primary=True) as db:
+            created = await crud.create_category(db, CategoryCreate(name="Async", sort_order=90))
+            listed = [c.id for c in await crud.get_categories(db)]
+            updated = await crud.update_category(db, created.id, CategoryCreate(name="Async 2", sort_order=91))
+            deleted = await crud.delete_category(db, created.id)
+            deleted_again = await crud.delete_category(db, created.id)
+        return created, listed, updated, deleted, deleted_again
+
+    created, listed, updated, deleted, deleted_again = run(round_trip)
+    assert created.id in listed
+    assert (updated.name, updated.sort_order) == ("Async 2", 91)
+    assert deleted is True
+    assert deleted_again is False
+
+
+def test_news_endpoints(client, admin_headers):
+    body = {"title": "Async news", "content": "body", "publish_date": "2030-01-01"}
+    created = client.post("/news/", json=body, headers=admin_headers)
+    assert created.status_code == 200
+    news_id = created.json()["id"]
+
+    listed = client.get("/news/", params={"paginate": "false"})
+    assert news_id in [n["id"] for n in listed.json()]
+
+    updated = client.put(f"/news/{news_id}", json={**body, "title": "Edited"}, headers=admin_headers)
+    assert updated.json()["title"] == "Edited"
+
+    assert client.delete(f"/news/{news_id}", headers=admin_headers).status_code == 200
+    assert client.delete(f"/news/{news_id}", headers=admin_headers).status_code == 404
+
+
+def test_writes_require_token(client):
+    response = client.post("/news/", json={"title": "x", "content": "x", "publish_date": "2030-01-01"})
+    assert response.status_code == 401
@@ -0,0 +1,55 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.utils import auth
+from app.utils.auth import PasswordHasher, PasswordHasherBusy, hash_password, needs_rehash, verify_password
+
+
+def test_hash_and_verify():
+    hashed = hash_password("secret")
+    assert hashed.startswith("scrypt$") and hashed != hash_password("secret")  # 每次的 salt 不同
+    assert verify_password("secret", hashed)
+    assert not verify_password("wrong", hashed)
+    assert not needs_rehash(hashed)
+
+
+def test_legacy_plaintext_and_old_parameters():
+    # 旧数据中的明文密码可以验证，并且需要重新哈希
+    assert verify_password("plain", "plain")
+    assert not verify_password("other", "plain")
+    assert needs_rehash("plain")
+    assert needs_rehash(hash_password("secret").replace(f"scrypt${auth.PASSWORD_SCRYPT_N}$", "scrypt$1024$", 1))
+
+
+def test_unknown_user_costs_one_scrypt(run, monkeypatch):
+    hasher = PasswordHasher(workers=1, max_pending=4)
+    calls = []
+    original = auth._scrypt
+    monkeypatch.setattr(auth, "_scrypt", lambda *args: calls.append(1) or original(*args))
+
+    # 第一次未知用户的登录与之后的一样，只验证一次预先计算好的占位哈希
+    assert run(hasher.verify, "secret", None) is False
+    assert run(hasher.verify, "secret", None) is False
+    assert len(calls) == 2
+    hasher.shutdown()
+
+
+def test_bounded_executor_rejects_when_queue_full(run):
+    hasher = PasswordHasher(workers=1, max_pending=1)
+    release = threading.Event()
+
+    async def scenario():
+        blocked = asyncio.create_task(hasher._run(release.wait))
+        await asyncio.sleep(0)
+        with pytest.raises(PasswordHasherBusy):
+            await hasher.verify("secret", "secret")
+        release.set()
+        await blocked
+        return await hasher.verify("secret", "secret")
+
+    assert run(scenario) is True
+    assert hasher.stats()["rejected"] == 1
+    assert hasher.pending == 0
+    hasher.shutdown()
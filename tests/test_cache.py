@@ -0,0 +1,34 @@
+import time
+
+from app.utils.cache import CatalogCache, VersionRegistry
+
+
+def _load(value):
+    async def loader():
+        return value
+    return loader
+
+
+def test_local_write_invalidates_immediately(run):
+    cache = CatalogCache(VersionRegistry(), ttl=60, max_entries=10)
+    assert run(cache.get_or_load, "faqs", _load("v1")) == "v1"
+    assert run(cache.get_or_load, "faqs", _load("v2")) == "v1"
+    cache.invalidate("faqs")
+    assert run(cache.get_or_load, "faqs", _load("v2")) == "v2"
+
+
+def test_other_worker_writes_visible_after_ttl(run):
+    # 另一个 worker 的写操作不会 bump 本进程的版本号，只能等条目过期
+    cache = CatalogCache(VersionRegistry(), ttl=0.05, max_entries=10)
+    assert run(cache.get_or_load, ("repair_prices", "repair_prices:*"), _load("v1")) == "v1"
+    time.sleep(0.06)
+    assert run(cache.get_or_load, ("repair_prices", "repair_prices:*"), _load("v2")) == "v2"
+
+
+def test_lru_eviction():
+    cache = CatalogCache(VersionRegistry(), ttl=60, max_entries=2)
+    for key in ("a", "b", "c"):
+        cache.set("news", key.upper(), key=key)
+    assert cache.get("news", "a") == (False, None)
+    assert cache.get("news", "c") == (True, "C")
+    assert cache.stats()["evictions"] == 1
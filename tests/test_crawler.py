@@ -0,0 +1,68 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import select
+
+from app import async_crud
+from app.crawler.__main__ import FIXTURES
+from app.crawler.pipeline import crawl
+from app.crawler.sources import load_sources
+from app.crawler.stub import StubServer
+from app.database.database import SessionLocal
+from app.database.models import DBCompetitorPrice
+
+# 我方机型名：抓取结果只写入能按规范化名称匹配到的条目
+OUR_MODELS = ("iPhone 15 Pro", "iPhone 15", "iPhone 14", "iPhone 13 mini", "Galaxy S23", "Pixel 8")
+
+
+def _rows():
+    with SessionLocal() as db:
+        rows = db.scalars(select(DBCompetitorPrice)).all()
+    return {(r.source, r.competitor_model_name): (r.model_name, r.repair_type_id, int(r.price)) for r in rows}
+
+
+@pytest.fixture(scope="module")
+def our_models(client):
+    for name in OUR_MODELS:
+        price = {"category_id": 1, "repair_type_id": 3, "model_name": name, "price": 1000}
+        assert client.post("/prices/", json=price).status_code == 200
+
+
+def test_crawl_stub_server_writes_competitor_prices(our_models, run):
+    with StubServer(FIXTURES) as stub, ThreadPoolExecutor(max_workers=2) as executor:
+        sources = load_sources(os.path.join(FIXTURES, "sources.json"), stub.base_url)
+        report = run(lambda: crawl(sources, executor=executor))
+
+        assert report.errors == []
+        assert (report.pages, report.fetched, report.failed) == (3, 3, 0)
+        rows = _rows()
+        assert rows[("shop-a", "iPhone 15 Pro")] == ("iPhone 15 Pro", 1, 32800)
+        assert rows[("shop-a", "iPhone 13 mini")] == ("iPhone 13 mini", 1, 16500)
+        # 全角、大小写、空格不同的写法按规范化名称匹配
+        assert rows[("shop-b", "ｉＰｈｏｎｅ １５ Ｐｒｏ")] == ("iPhone 15 Pro", 2, 12800)
+        assert rows[("shop-b", "IPHONE15")] == ("iPhone 15", 2, 9800)
+        assert rows[("shop-b", "Pixel 8")] == ("Pixel 8", 2, 10450)
+        # 没有价格的条目和我方没有的机型不写入
+        assert ("shop-a", "iPhone SE（第3世代）") not in rows
+        assert ("shop-b", "ｷﾞｬﾗｸｼｰ S22") not in rows
+        assert "ｷﾞｬﾗｸｼｰ S22" in report.unmatched["shop-b"]
+        assert report.written == len(rows) == report.matched
+
+        # 第二次抓取：页面未变化，条件请求全部 304，不重复写入
+        again = run(lambda: crawl(sources, executor=executor))
+        assert (again.not_modified, again.written) == (3, 0)
+        assert _rows() == rows
+
+
+def test_writer_failure_stops_the_crawl(our_models, run, monkeypatch):
+    async def broken_writer(db, rows):
+        raise RuntimeError("writer died")
+
+    # 写入任务因非数据库异常退出：队列很小，生产者会阻塞在 put() 上，抓取必须随之结束而不是挂起
+    monkeypatch.setattr(async_crud, "save_competitor_prices", broken_writer)
+    with StubServer(FIXTURES) as stub, ThreadPoolExecutor(max_workers=2) as executor:
+        sources = load_sources(os.path.join(FIXTURES, "sources.json"), stub.base_url)
+        with pytest.raises(RuntimeError, match="writer died"):
+            run(lambda: asyncio.wait_for(crawl(sources, executor=executor, batch_size=1), 5))
@@ -0,0 +1,110 @@
+import asyncio
+import json
+import threading
+
+import httpx
+
+from app.main import app
+from app.utils.cache import table_versions
+from app.utils.events import EventBroadcaster, change_events
+
+
+def _parse(chunk):
+    """把一个数据块拆成 [(event, id, data)]"""
+    events = []
+    for block in chunk.decode().strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        events.append((fields.get("event"), fields.get("id"), fields.get("data")))
+    return events
+
+
+async def _next(stream):
+    return await asyncio.wait_for(stream.__anext__(), 2)
+
+
+def test_broadcast_replay_and_reset(run):
+    async def scenario():
+        events = EventBroadcaster(buffer_size=3, heartbeat_seconds=60)
+        first, second = events.stream(), events.stream()
+        try:
+            assert await _next(first) == b"retry: 3000\n\n"
+            assert await _next(second) == b"retry: 3000\n\n"
+            pending = [asyncio.ensure_future(_next(s)) for s in (first, second)]
+            await asyncio.sleep(0)
+            assert events.subscribers == 2
+
+            # 一次发布唤醒所有连接；同步回退模式下 publish 在线程池中调用
+            thread = threading.Thread(target=events.publish, args=("faqs", 7))
+            thread.start()
+            thread.join()
+            for chunk in await asyncio.gather(*pending):
+                [(kind, event_id, data)] = _parse(chunk)
+                assert kind == "change" and event_id == f"{table_versions.boot_id}-1"
+                assert json.loads(data)["entity"] == "faqs" and json.loads(data)["id"] == 7
+        finally:
+            await first.aclose()
+            await second.aclose()
+        assert events.subscribers == 0
+
+        for entity_id in range(2, 5):
+            events.publish("news", entity_id)
+        # 断线重连：从 Last-Event-ID 之后补发缓冲区中的事件
+        resumed = events.stream(f"{table_versions.boot_id}-2")
+        await _next(resumed)
+        assert [json.loads(d)["id"] for _, _, d in _parse(await _next(resumed))] == [3, 4]
+        await resumed.aclose()
+
+        # 序号已被挤出缓冲区、或来自重启前的进程：发送 reset
+        for last_event_id in (f"{table_versions.boot_id}-0", "stale-3"):
+            stream = events.stream(last_event_id)
+            await _next(stream)
+            [(kind, event_id, _)] = _parse(await _next(stream))
+            assert (kind, event_id) == ("reset", f"{table_versions.boot_id}-4")
+            await stream.aclose()
+        await events.close()
+
+    run(scenario)
+
+
+def test_heartbeat_and_close(run):
+    async def scenario():
+        events = EventBroadcaster(buffer_size=3, heartbeat_seconds=0.01)
+        stream = events.stream()
+        await _next(stream)
+        assert await _next(stream) == b": heartbeat\n\n"
+
+        # 关闭时结束仍在等待的连接
+        pending = asyncio.ensure_future(_next(stream))
+        await asyncio.sleep(0)
+        await events.close()
+        try:
+            await pending
+        except StopAsyncIteration:
+            pass
+        else:
+            raise AssertionError("stream should end on close")
+        assert events.subscribers == 0
+
+    run(scenario)
+
+
+def test_writes_publish_change_events(run, admin_headers):
+    async def scenario():
+        stream = change_events.stream()
+        await _next(stream)
+        pending = asyncio.ensure_future(_next(stream))
+        try:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+                response = await http.post("/faq/", json={"title": "SSE", "content": "A"}, headers=admin_headers)
+            assert response.status_code == 200
+            [(kind, _, data)] = _parse(await pending)
+            assert kind == "change"
+            assert json.loads(data) == {"entity": "faqs", "id": response.json()["id"],
+                                        "version": table_versions.get("faqs")}
+        finally:
+            pending.cancel()
+            await asyncio.gather(pending, return_exceptions=True)
+            await stream.aclose()
+
+    run(scenario)
@@ -0,0 +1,29 @@
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from sqlalchemy import select
+
+from app.database import explain
+from app.database.database import Base, engine
+from app.database.models import DBNews
+
+
+def test_hot_statements_use_indexes(capsys):
+    with engine.connect() as conn:
+        for name, build in explain.HOT_STATEMENTS:
+            plan, full_scans = explain.explain(conn, build())
+            assert plan, name
+            assert full_scans == [], (name, plan)
+    assert explain.main() == 0
+    assert "FULL SCAN" not in capsys.readouterr().out
+
+
+def test_full_scan_is_reported():
+    with engine.connect() as conn:
+        _, full_scans = explain.explain(conn, select(DBNews).where(DBNews.content == "x"))
+    assert full_scans and full_scans[0].startswith("SCAN news")
+
+
+def test_migrations_match_models():
+    # 测试库由 alembic upgrade head 创建：模型中的索引、约束都应已有对应的迁移
+    with engine.connect() as conn:
+        assert compare_metadata(MigrationContext.configure(conn), Base.metadata) == []
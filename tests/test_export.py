@@ -0,0 +1,51 @@
+import csv
+import datetime
+import gzip
+import io
+import json
+
+from sqlalchemy import func, select
+
+from app.database.database import SessionLocal
+from app.database.models import DBRepairPrice
+from app.utils.price_export import EXPORT_COLUMNS
+
+
+def test_export_requires_login(client):
+    assert client.get("/prices/export").status_code == 401
+
+
+def test_export_csv_and_ndjson(client, admin_headers):
+    with SessionLocal() as db:
+        total = db.scalar(select(func.count()).select_from(DBRepairPrice))
+
+    response = client.get("/prices/export", params={"batch_size": 100}, headers=admin_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    text = response.content.decode("utf-8")
+    assert text.startswith("\ufeff")  # Excel 需要 BOM
+    rows = list(csv.reader(io.StringIO(text[1:])))
+    assert tuple(rows[0]) == EXPORT_COLUMNS
+    assert len(rows) - 1 == total
+    assert len({row[0] for row in rows[1:]}) == total  # 分批读取不重复、不遗漏
+
+    response = client.get("/prices/export", params={"format": "ndjson"}, headers=admin_headers)
+    assert response.headers["content-type"] == "application/x-ndjson"
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert len(records) == total
+    assert set(records[0]) == set(EXPORT_COLUMNS)
+    assert sorted(r["id"] for r in records) == sorted(int(row[0]) for row in rows[1:])
+
+
+def test_export_gzip_and_updated_since(client, admin_headers):
+    plain = client.get("/prices/export", params={"format": "ndjson"}, headers=admin_headers).content
+    with client.stream("GET", "/prices/export", params={"format": "ndjson", "gzip": True},
+                       headers=admin_headers) as response:
+        assert response.headers["content-encoding"] == "gzip"
+        raw = b"".join(response.iter_raw())
+    assert gzip.decompress(raw) == plain
+
+    future = (datetime.datetime.now() + datetime.timedelta(days=1)).isoformat()
+    response = client.get("/prices/export", params={"format": "ndjson", "updated_since": future},
+                          headers=admin_headers)
+    assert response.status_code == 200 and response.content == b""
@@ -0,0 +1,63 @@
+import datetime
+
+from sqlalchemy import update
+
+from app.database.database import SessionLocal
+from app.database.models import DBFaq, DBNews
+from app.utils.cache import catalog_cache, table_versions
+from app.utils.http_cache import content_etag
+
+# 带 Cookie 的请求不经过微缓存，直接测试路由自身的条件请求
+BYPASS_MICROCACHE = {"Cookie": "test=1"}
+
+
+def test_etag_is_content_digest_and_304(client):
+    url = "/prices/?category_id=1&repair_type_id=1"
+    first = client.get(url, headers=BYPASS_MICROCACHE)
+    assert first.status_code == 200
+    assert first.headers["etag"] == content_etag(first.content)
+
+    again = client.get(url, headers={**BYPASS_MICROCACHE, "If-None-Match": first.headers["etag"]})
+    assert again.status_code == 304
+    assert again.headers["etag"] == first.headers["etag"]
+
+
+def test_etag_follows_content_not_process_counters(client):
+    """其他 worker 的写操作不会 bump 本进程的版本号，ETag 必须随内容变化"""
+    url = "/faq/?paginate=false"
+    etag = client.get(url, headers=BYPASS_MICROCACHE).headers["etag"]
+
+    # 本进程的版本号变化但内容不变：ETag 不变
+    table_versions.bump("faqs")
+    assert client.get(url, headers={**BYPASS_MICROCACHE, "If-None-Match": etag}).status_code == 304
+
+    # 模拟另一个 worker 直接写库（不经过本进程的缓存失效），本进程缓存过期后重新加载
+    with SessionLocal() as db:
+        db.execute(update(DBFaq).where(DBFaq.id == 1).values(title="Changed by another worker"))
+        db.commit()
+    catalog_cache.clear()
+
+    changed = client.get(url, headers={**BYPASS_MICROCACHE, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert changed.headers["etag"] == content_etag(changed.content)
+
+
+def test_news_last_modified_follows_edits(client, admin_headers):
+    body = {"title": "Edited later", "content": "x", "publish_date": "2099-01-01"}
+    news_id = client.post("/news/", json=body, headers=admin_headers).json()["id"]
+    with SessionLocal() as db:
+        # Last-Modified 取列表中最新的时间：把所有通知都改成旧时间
+        db.execute(update(DBNews).values(created_at=datetime.datetime(2020, 1, 1),
+                                         updated_at=datetime.datetime(2020, 1, 1)))
+        db.commit()
+    catalog_cache.clear()
+
+    url = "/news/?paginate=false"
+    before = client.get(url, headers=BYPASS_MICROCACHE).headers["last-modified"]
+    assert before == "Wed, 01 Jan 2020 00:00:00 GMT"
+
+    client.put(f"/news/{news_id}", json={**body, "title": "Edited"}, headers=admin_headers)
+    after = client.get(url, headers=BYPASS_MICROCACHE)
+    assert after.headers["last-modified"] != before
+    assert after.json()[0]["updated_at"] is not None
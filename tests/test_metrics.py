@@ -0,0 +1,49 @@
+from app.utils.metrics import MetricsRegistry, metrics
+
+
+def _samples(text):
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, _, value = line.rpartition(" ")
+            samples[name] = float(value)
+    return samples
+
+
+def test_histogram_is_cumulative():
+    registry = MetricsRegistry((0.1, 0.5))
+    for seconds in (0.05, 0.1, 0.3, 2):
+        registry.observe("GET", '/a"b', 200, seconds)
+    samples = _samples(registry.render())
+
+    labels = 'method="GET",route="/a\\"b"'
+    assert samples[f'http_request_duration_seconds_bucket{{{labels},le="0.1"}}'] == 2
+    assert samples[f'http_request_duration_seconds_bucket{{{labels},le="0.5"}}'] == 3
+    assert samples[f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}}'] == 4
+    assert samples[f"http_request_duration_seconds_count{{{labels}}}"] == 4
+    assert samples[f'http_requests_total{{{labels},status="200"}}'] == 4
+
+
+def test_requests_are_labelled_by_route_template(client, admin_headers):
+    metrics.reset()
+    # 不同 id 的请求归到同一个路由模板下
+    for price_id in (999991, 999992):
+        assert client.delete(f"/prices/{price_id}", headers=admin_headers).status_code == 404
+    # 第二次请求由微缓存直接返回，没有经过路由，仍按模板统计
+    client.get("/faq/")
+    assert client.get("/faq/").headers["x-microcache"] == "HIT"
+    # 方法不匹配 (405) 取部分匹配的模板；完全不匹配的路径归到同一个标签
+    assert client.get("/prices/123").status_code == 405
+    client.get("/no/such/path/1")
+    client.get("/no/such/path/2")
+
+    response = client.get("/metrics")
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    samples = _samples(response.text)
+    assert samples['http_requests_total{method="DELETE",route="/prices/{price_id}",status="404"}'] == 2
+    assert samples['http_requests_total{method="GET",route="/faq/",status="200"}'] == 2
+    assert samples['http_requests_total{method="GET",route="/prices/{price_id}",status="405"}'] == 1
+    assert samples['http_requests_total{method="GET",route="<unmatched>",status="404"}'] == 2
+    assert not any("/no/such" in name for name in samples)
+    # /metrics 自身正在处理中
+    assert samples["http_requests_in_flight"] == 1
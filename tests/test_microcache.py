@@ -0,0 +1,116 @@
+import asyncio
+import logging
+
+import pytest
+
+from app.middleware.microcache import MicroCacheMiddleware, parse_dependents
+
+PREFIXES = ("/prices", "/faq", "/config", "/categories", "/news")
+
+
+def test_parse_dependents():
+    targets = parse_dependents(("/categories=/prices|/faq",), PREFIXES)
+    assert targets["/categories"] == ("/categories", "/prices", "/faq")
+    assert targets["/prices"] == ("/prices",)
+    # 不参与缓存的前缀忽略
+    assert parse_dependents(("/categories=/sync",), PREFIXES)["/categories"] == ("/categories",)
+    with pytest.raises(ValueError):
+        parse_dependents(("categories",), PREFIXES)
+
+
+def test_category_write_purges_cached_prices(client, admin_headers):
+    assert client.get("/prices/matrix").headers["x-microcache"] in ("MISS", "HIT")
+    assert client.get("/prices/matrix").headers["x-microcache"] == "HIT"
+    assert client.get("/categories/").headers["x-microcache"] in ("MISS", "HIT")
+
+    renamed = client.put("/categories/1", json={"name": "Renamed category", "sort_order": 1}, headers=admin_headers)
+    assert renamed.status_code == 200
+
+    matrix = client.get("/prices/matrix")
+    assert matrix.headers["x-microcache"] == "MISS"
+    assert "Renamed category" in [c["name"] for c in matrix.json()["categories"]]
+    assert client.get("/categories/").headers["x-microcache"] == "MISS"
+
+
+def test_faq_write_keeps_other_prefixes(client, admin_headers):
+    client.get("/prices/matrix")
+    created = client.post("/faq/", json={"title": "Q", "content": "A"}, headers=admin_headers)
+    assert created.status_code == 200
+    assert client.get("/prices/matrix").headers["x-microcache"] == "HIT"
+
+
+def _scope():
+    return {"type": "http", "method": "GET", "path": "/faq/", "query_string": b"", "headers": []}
+
+
+async def _receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+def _recorder():
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    return sent, send
+
+
+def test_cancelled_leader_releases_followers(run):
+    async def scenario():
+        calls = 0
+
+        async def app(scope, receive, send):
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                await asyncio.Event().wait()  # 回源一直挂起，直到被取消
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b"ok"})
+
+        cache = MicroCacheMiddleware(app, prefixes=("/faq",), ttl=10, stale_ttl=10, max_entries=10)
+        _, leader_send = _recorder()
+        follower_sent, follower_send = _recorder()
+        leader = asyncio.create_task(cache(_scope(), _receive, leader_send))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(cache(_scope(), _receive, follower_send))
+        await asyncio.sleep(0)
+
+        # 客户端断开：回源的请求被取消，等待者自己回源而不是永远挂起
+        leader.cancel()
+        await asyncio.wait_for(follower, 1)
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return follower_sent, cache._inflight, calls
+
+    sent, inflight, calls = run(scenario)
+    assert sent[0]["status"] == 200 and sent[1]["body"] == b"ok"
+    assert inflight == {}
+    assert calls == 2
+
+
+def test_background_refresh_failure_is_logged(run, caplog):
+    async def scenario():
+        fail = False
+
+        async def app(scope, receive, send):
+            if fail:
+                raise RuntimeError("backend down")
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b"ok"})
+
+        cache = MicroCacheMiddleware(app, prefixes=("/faq",), ttl=0, stale_ttl=60, max_entries=10)
+        await cache(_scope(), _receive, _recorder()[1])
+        fail = True
+        sent, send = _recorder()
+        await cache(_scope(), _receive, send)
+        # 等后台刷新结束
+        await asyncio.gather(*cache._background, return_exceptions=True)
+        await asyncio.sleep(0)
+        return sent, cache._background
+
+    with caplog.at_level(logging.WARNING, logger="app.microcache"):
+        sent, background = run(scenario)
+    assert dict(sent[0]["headers"])[b"x-microcache"] == b"STALE"
+    assert background == set()
+    assert "microcache background refresh failed" in caplog.text
@@ -0,0 +1,79 @@
+def _price(model_name, **overrides):
+    return {"category_id": 1, "repair_type_id": 2, "model_name": model_name, "price": 9800, **overrides}
+
+
+def test_duplicate_natural_key_returns_409(client, admin_headers):
+    first = client.post("/prices/", json=_price("Conflict A"))
+    assert first.status_code == 200
+    price_id = first.json()["id"]
+
+    duplicate = client.post("/prices/", json=_price("Conflict A", price=1))
+    assert duplicate.status_code == 409
+    assert f"id={price_id}" in duplicate.json()["detail"]
+
+    # 会话已回滚，后续写入不受影响
+    other = client.post("/prices/", json=_price("Conflict B"))
+    assert other.status_code == 200
+    other_id = other.json()["id"]
+
+    renamed = client.put(f"/prices/{other_id}", json=_price("Conflict A"), headers=admin_headers)
+    assert renamed.status_code == 409
+    moved = client.post("/prices/", params={"price_id": other_id}, json=_price("Conflict A"))
+    assert moved.status_code == 409
+
+    unchanged = client.get("/prices/", params={"category_id": 1, "repair_type_id": 2}, headers={"Cookie": "t=1"})
+    names = {p["id"]: p["model_name"] for p in unchanged.json()}
+    assert names[price_id] == "Conflict A"
+    assert names[other_id] == "Conflict B"
+
+
+def test_update_missing_price_returns_404(client, admin_headers):
+    assert client.put("/prices/999999", json=_price("Missing"), headers=admin_headers).status_code == 404
+    assert client.post("/prices/", params={"price_id": 999999}, json=_price("Missing")).status_code == 404
+
+
+def test_bulk_upsert_fallback_without_native_upsert(monkeypatch):
+    from app import crud
+    from app.database.database import SessionLocal
+    from app.models.repair_prices import RepairPriceCreate
+
+    # 模拟不支持原生 upsert 的方言：SELECT ... FOR UPDATE 后分别 INSERT / UPDATE
+    monkeypatch.setattr(crud, "_upsert_statement", lambda *args: None)
+    with SessionLocal() as db:
+        assert crud.bulk_upsert_repair_prices(db, [RepairPriceCreate(**_price("Fallback A"))]) == 1
+        written = crud.bulk_upsert_repair_prices(db, [
+            RepairPriceCreate(**_price("Fallback A", price=1200)),
+            RepairPriceCreate(**_price("Fallback B", price=1300)),
+        ])
+        assert written == 2
+        prices = {p.model_name: float(p.price) for p in crud.get_prices_by_filter(db, 1, 2)}
+    assert prices["Fallback A"] == 1200
+    assert prices["Fallback B"] == 1300
+
+
+def test_price_matrix_is_three_queries(client):
+    from app.utils.cache import catalog_cache
+
+    catalog_cache.clear()
+    response = client.get("/prices/matrix", headers={"Cookie": "t=1"})
+    assert response.status_code == 200
+    # 分类、维修种类、价格各一条集合查询，与分类 × 维修种类的组合数无关
+    assert 'desc="3 queries"' in response.headers["server-timing"]
+
+    matrix = response.json()
+    assert {p["category_id"] for p in matrix["prices"]} == {c["id"] for c in matrix["categories"]}
+    assert all(p["is_visible"] for p in matrix["prices"])
+    # 与按组合查询的价格列表内容、顺序一致
+    for category in matrix["categories"]:
+        for repair_type in matrix["repair_types"]:
+            pair = {"category_id": category["id"], "repair_type_id": repair_type["id"]}
+            expected = [p["id"] for p in client.get("/prices/", params=pair, headers={"Cookie": "t=1"}).json()
+                        if p["is_visible"]]
+            assert [p["id"] for p in matrix["prices"]
+                    if (p["category_id"], p["repair_type_id"]) == tuple(pair.values())] == expected
+
+    catalog_cache.clear()
+    one = client.get("/prices/matrix", params={"category_id": 2}, headers={"Cookie": "t=1"})
+    assert 'desc="3 queries"' in one.headers["server-timing"]
+    assert [c["id"] for c in one.json()["categories"]] == [2]
+    assert {p["category_id"] for p in one.json()["prices"]} == {2}
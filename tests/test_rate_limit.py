@@ -0,0 +1,58 @@
+import httpx
+
+from app.main import app
+from app.middleware.rate_limit import RateLimitMiddleware
+from app.utils.token_cache import token_cache
+
+# 限流规则见 conftest：/prices/export 每个客户端 IP 只有 1 个令牌，几乎不补充
+EXPORT = "/prices/export"
+
+
+def _fetch(run, client_ip, headers_list):
+    """以指定的客户端 IP 经完整的中间件栈依次发送请求，返回 (状态码, 查询次数) 列表"""
+    async def send_all():
+        transport = httpx.ASGITransport(app=app, client=(client_ip, 1))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            return [await http.get(EXPORT, headers=headers) for headers in headers_list]
+
+    results = []
+    for response in run(send_all):
+        timing = response.headers.get("server-timing", "")
+        queries = int(timing.split('desc="')[1].split(" ")[0]) if timing else 0
+        results.append((response.status_code, queries))
+    return results
+
+
+def test_invalid_tokens_do_not_reach_db_once_throttled(run):
+    junk = [{"Authorization": f"Bearer junk-{i}"} for i in range(50)]
+    results = _fetch(run, "10.0.0.1", junk)
+
+    # 第一个请求通过限流，get_current_user 查库后返回 401；其余请求在查库之前被拒绝
+    assert results[0][0] == 401 and results[0][1] >= 1
+    assert results[1:] == [(429, 0)] * 49
+
+
+def test_cold_admin_token_exempt_after_first_authenticated_request(run, admin_headers):
+    token = admin_headers["Authorization"].split(" ", 1)[1]
+    # 模拟由其他 worker 签发、本 worker 缓存中不存在的 token
+    token_cache.invalidate(token)
+
+    statuses = [status for status, _ in _fetch(run, "10.0.0.2", [admin_headers, {}, admin_headers, admin_headers])]
+    # 第一次按普通请求消耗令牌并通过认证（写入缓存）；匿名请求被限流；之后的管理员请求不消耗令牌
+    assert statuses == [200, 429, 200, 200]
+    assert token_cache.peek(token) is not None
+
+
+def test_admin_requests_still_count_for_load_shedding(run, admin_headers):
+    limiter = RateLimitMiddleware(app, rules=("/prices=10:10",), global_rate=0, global_burst=0,
+                                  max_clients=10, max_inflight=1, shed_retry_after=1)
+    limiter.inflight = 1
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "path": "/prices/", "client": ("10.0.0.3", 1),
+             "headers": [(b"authorization", admin_headers["Authorization"].encode())]}
+    run(limiter, scope, None, send)
+    assert sent[0]["status"] == 503
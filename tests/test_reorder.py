@@ -0,0 +1,44 @@
+import pytest
+
+NO_CACHE = {"Cookie": "t=1"}
+
+# (列表地址, 查询参数, 排序地址)
+ENDPOINTS = [
+    ("/faq/", {}, "/faq/reorder"),
+    ("/categories/", {}, "/categories/reorder"),
+    ("/categories/repair-types", {}, "/categories/repair-types/reorder"),
+    ("/prices/", {"category_id": 2, "repair_type_id": 1}, "/prices/reorder"),
+]
+
+
+def _ids(client, path, params):
+    response = client.get(path, params=params, headers=NO_CACHE)
+    assert response.status_code == 200
+    return [item["id"] for item in response.json()]
+
+
+@pytest.mark.parametrize("path, params, reorder_path", ENDPOINTS)
+def test_reorder_rewrites_display_order(client, admin_headers, path, params, reorder_path):
+    original = _ids(client, path, params)
+    assert len(original) > 1
+    reordered = original[::-1]
+
+    try:
+        response = client.patch(reorder_path, json={"ids": reordered}, headers=admin_headers)
+        assert response.status_code == 200
+        assert response.json()["updated"] > 0
+        assert _ids(client, path, params) == reordered
+
+        # 顺序未变化时不更新任何行
+        again = client.patch(reorder_path, json={"ids": reordered}, headers=admin_headers)
+        assert again.json() == {"updated": 0}
+    finally:
+        # 恢复原顺序，避免影响其他依赖默认顺序的测试
+        client.patch(reorder_path, json={"ids": original}, headers=admin_headers)
+    assert _ids(client, path, params) == original
+
+
+def test_reorder_validation(client, admin_headers):
+    assert client.patch("/faq/reorder", json={"ids": [1, 2]}).status_code == 401
+    assert client.patch("/faq/reorder", json={"ids": [1, 1]}, headers=admin_headers).status_code == 422
+    assert client.patch("/faq/reorder", json={"ids": []}, headers=admin_headers).status_code == 422
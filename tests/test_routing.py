@@ -0,0 +1,112 @@
+"""
+RoutingSession 的读写分离：主库和副本是两个 SQLite 文件，各自的 items 表内容不同，
+查询结果能看出语句实际在哪个库上执行。
+"""
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.async_crud import run_db
+from app.database.routing import Replica, ReplicaSet, RoutingSession, watch_replica_errors
+
+QUERY = text("SELECT name FROM items")
+
+
+def _create(path, name):
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+        conn.execute("INSERT INTO items (name) VALUES (?)", (name,))
+
+
+def _where(session):
+    return session.execute(QUERY).scalars().first()
+
+
+@pytest.fixture
+def databases(tmp_path):
+    primary, replica = tmp_path / "primary.db", tmp_path / "replica.db"
+    _create(primary, "primary")
+    _create(replica, "replica")
+    return primary, replica
+
+
+def _factory(primary_url, replica_url, sticky_seconds=0.0, use_async=False):
+    if use_async:
+        primary = create_async_engine(primary_url.replace("sqlite:", "sqlite+aiosqlite:"))
+        replica_engine = create_async_engine(replica_url.replace("sqlite:", "sqlite+aiosqlite:")).sync_engine
+    else:
+        primary = create_engine(primary_url)
+        replica_engine = create_engine(replica_url)
+    replicas = ReplicaSet([Replica("replica1", replica_engine)], balance="round_robin",
+                          sticky_seconds=sticky_seconds, retry_seconds=60)
+    watch_replica_errors(replicas)
+    if use_async:
+        return async_sessionmaker(primary, class_=AsyncSession, sync_session_class=RoutingSession,
+                                  replicas=replicas), replicas
+    return sessionmaker(bind=primary, class_=RoutingSession, replicas=replicas), replicas
+
+
+def test_reads_go_to_replica(databases):
+    primary, replica = databases
+    Session, replicas = _factory(f"sqlite:///{primary}", f"sqlite:///{replica}")
+    with Session() as session:
+        assert _where(session) == "replica"
+        # 同一会话固定使用同一个副本
+        assert session.info["replica"] is replicas.replicas[0]
+        assert _where(session) == "replica"
+
+
+def test_reads_stick_to_primary_after_write(databases):
+    primary, replica = databases
+    Session, _ = _factory(f"sqlite:///{primary}", f"sqlite:///{replica}", sticky_seconds=60)
+    with Session() as session:
+        assert _where(session) == "replica"
+        session.execute(text("UPDATE items SET name = 'primary, written'"))
+        # 写之后本会话的读都走主库，能读到自己的写入
+        assert _where(session) == "primary, written"
+        session.commit()
+
+    # 提交后的 sticky_seconds 内，其他会话的读也走主库
+    with Session() as session:
+        assert _where(session) == "primary, written"
+
+
+def test_fallback_to_primary_when_replica_fails(databases, tmp_path):
+    primary, _ = databases
+    Session, replicas = _factory(f"sqlite:///{primary}", f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    with Session() as session:
+        assert session.fallback_to_primary() is False
+        with pytest.raises(DBAPIError):
+            _where(session)
+        # 连接失败后副本被标记为不可用，会话切换到主库
+        assert replicas.replicas[0].healthy is False
+        assert session.fallback_to_primary() is True
+        session.rollback()
+        assert _where(session) == "primary"
+
+    # 副本恢复前，新会话直接走主库
+    with Session() as session:
+        assert _where(session) == "primary"
+    assert replicas.fallbacks == 1
+
+
+@pytest.mark.parametrize("use_async", [False, True], ids=["sync", "async"])
+def test_run_db_retries_on_primary(databases, tmp_path, run, use_async):
+    primary, _ = databases
+    Session, replicas = _factory(f"sqlite:///{primary}", f"sqlite:///{tmp_path / 'missing' / 'replica.db'}",
+                                 use_async=use_async)
+
+    if use_async:
+        async def read():
+            async with Session() as session:
+                return await run_db(session, _where)
+        assert run(read) == "primary"
+    else:
+        with Session() as session:
+            # 第一次在副本上失败，run_db 回滚后在主库上重试
+            assert run(run_db, session, _where) == "primary"
+    assert replicas.stats()["replicas"]["replica1"]["healthy"] is False
@@ -0,0 +1,85 @@
+import asyncio
+import datetime
+
+from app.utils.search import PriceSearchIndex, bigrams, normalize
+
+NAMES = ["iPhone 15 Pro", "iPhone 15", "iPhone 14", "Galaxy S23", "ギャラクシー Z Flip"]
+
+
+def _price(price_id, model_name, category_id=1, is_visible=True):
+    return {"id": price_id, "category_id": category_id, "repair_type_id": 1, "model_name": model_name,
+            "price": 1000, "is_visible": is_visible, "updated_at": datetime.datetime(2024, 1, 1)}
+
+
+def _loader(rows):
+    async def load():
+        return rows
+    return load
+
+
+def _names(hits):
+    return [price.model_name for price, _ in hits]
+
+
+def test_normalize_and_bigrams():
+    assert normalize("ｉＰｈｏｎｅ　１５ Pro") == normalize("iphone15pro") == "iphone15pro"
+    assert normalize("ぎゃらくしー") == normalize("ギャラクシー")
+    assert bigrams("ab") == {"\x02a", "ab", "b\x03"}
+
+
+def test_search_ranks_and_tolerates_typos(run):
+    index = PriceSearchIndex(max_age=60, min_match=0.5)
+    rows = [_price(i, name) for i, name in enumerate(NAMES, 1)] + [_price(9, "iPhone 15", category_id=2),
+                                                                   _price(10, "iPhone 13", is_visible=False)]
+    run(index.ensure_loaded, _loader(rows))
+
+    # 前缀匹配排在前面，同名机型在各分类下的价格都返回
+    assert _names(index.search("iphone15", 10))[:3] == ["iPhone 15", "iPhone 15", "iPhone 15 Pro"]
+    assert _names(index.search("iphone15", 10, category_id=2)) == ["iPhone 15"]
+    # 错字、平假名
+    assert _names(index.search("galaxi s23", 10))[0] == "Galaxy S23"
+    assert _names(index.search("ぎゃらくしー", 10)) == ["ギャラクシー Z Flip"]
+    # 隐藏的价格默认不返回
+    assert "iPhone 13" not in _names(index.search("iphone13", 10))
+    assert _names(index.search("iphone13", 10, include_hidden=True))[0] == "iPhone 13"
+
+    index.upsert(type("Row", (), _price(11, "Pixel 8"))())
+    assert _names(index.search("pixel", 10)) == ["Pixel 8"]
+    index.remove(11)
+    assert index.search("pixel", 10) == []
+
+
+def test_failed_load_reaches_waiters_and_is_retried(run):
+    index = PriceSearchIndex(max_age=60, min_match=0.5)
+    release = None
+
+    async def failing():
+        await release.wait()
+        raise RuntimeError("db down")
+
+    async def scenario():
+        nonlocal release
+        release = asyncio.Event()
+        leader = asyncio.create_task(index.ensure_loaded(failing))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(index.ensure_loaded(_loader([_price(1, "iPhone 15")])))
+        await asyncio.sleep(0)
+        release.set()
+        return await asyncio.gather(leader, waiter, return_exceptions=True)
+
+    # 等待同一次加载的请求也收到异常，而不是检索空索引
+    results = run(scenario)
+    assert [type(r) for r in results] == [RuntimeError, RuntimeError]
+    assert index.stats()["fresh"] is False
+
+    # 下一次检索重新加载
+    run(index.ensure_loaded, _loader([_price(1, "iPhone 15")]))
+    assert _names(index.search("iphone15", 10)) == ["iPhone 15"]
+
+
+def test_search_endpoint(client):
+    response = client.get("/prices/search", params={"q": "model 1-1"})
+    assert response.status_code == 200
+    hits = response.json()
+    assert hits[0]["model_name"] == "Model 1-1"
+    assert [hit["score"] for hit in hits] == sorted((hit["score"] for hit in hits), reverse=True)
@@ -0,0 +1,84 @@
+import logging
+import time
+
+import pytest
+
+from app.utils.cache import catalog_cache
+from app.utils.snapshot import (SharedCatalogSnapshot, catalog_snapshot, categories_key, matrix_key,
+                                prices_key, read_version, repair_types_key, write_snapshot)
+
+NO_CACHE = {"Cookie": "t=1"}
+
+
+def _queries(response):
+    timing = response.headers.get("server-timing", "")
+    return int(timing.split('desc="')[1].split(" ")[0]) if timing else 0
+
+
+@pytest.fixture
+def snapshot(tmp_path):
+    shared = SharedCatalogSnapshot(str(tmp_path / "catalog.snap"), debounce=0, poll_interval=0)
+    assert shared.rebuild()
+    return shared
+
+
+def test_snapshot_matches_live_responses(client, snapshot):
+    # 快照中的响应体与对应路由的输出逐字节一致，ETag 也相同
+    cases = [
+        (categories_key(), "/categories/", {}),
+        (repair_types_key(), "/categories/repair-types", {}),
+        (prices_key(1, 1), "/prices/", {"category_id": 1, "repair_type_id": 1}),
+        (matrix_key(), "/prices/matrix", {}),
+        (matrix_key(2), "/prices/matrix", {"category_id": 2}),
+    ]
+    for key, path, params in cases:
+        entry = snapshot.get(key)
+        live = client.get(path, params=params, headers=NO_CACHE)
+        assert bytes(entry.body) == live.content, key
+        assert entry.etag == live.headers.get("etag"), key
+
+
+def test_rebuild_skips_when_file_is_newer(snapshot):
+    version = read_version(snapshot.path)
+    assert snapshot.rebuild(requested_at=version - 1) is False
+    assert snapshot.rebuild(requested_at=version) is True
+    assert read_version(snapshot.path) > version
+
+
+def test_swap_keeps_old_views_and_ignores_corrupt_files(snapshot, caplog):
+    old = snapshot.current()
+    old_body = bytes(old.get(categories_key()).body)
+
+    write_snapshot(snapshot.path, time.time_ns(), {categories_key(): (b"[]", None, False)})
+    new = snapshot.current()
+    assert new is not old and snapshot.swaps == 2
+    assert bytes(new.get(categories_key()).body) == b"[]"
+    # 仍在发送中的响应体引用旧映射，替换文件后照样可读
+    assert bytes(old.get(categories_key()).body) == old_body
+
+    with open(snapshot.path, "wb") as f:
+        f.write(b"garbage" * 10)
+    with caplog.at_level(logging.WARNING, logger="app.snapshot"):
+        assert snapshot.current() is new
+    assert "failed to map catalog snapshot" in caplog.text
+
+
+def test_routes_serve_snapshot_until_local_write(client, admin_headers, snapshot, monkeypatch):
+    monkeypatch.setattr(catalog_snapshot, "path", snapshot.path)
+    monkeypatch.setattr(catalog_snapshot, "poll_interval", 0)
+    catalog_cache.clear()
+
+    served = client.get("/categories/repair-types", headers=NO_CACHE)
+    assert served.status_code == 200 and _queries(served) == 0
+    matrix = client.get("/prices/matrix", headers=NO_CACHE)
+    assert _queries(matrix) == 0
+    revalidated = client.get("/prices/matrix", headers={**NO_CACHE, "If-None-Match": matrix.headers["etag"]})
+    assert revalidated.status_code == 304
+
+    # 本进程写入后快照过期，回退到查库，读到自己的写入
+    created = client.post("/categories/repair-types", json={"name": "Snapshot RT"}, headers=admin_headers)
+    assert created.status_code == 200
+    assert catalog_snapshot.current() is None
+    fresh = client.get("/categories/repair-types", headers=NO_CACHE)
+    assert _queries(fresh) == 1
+    assert "Snapshot RT" in fresh.text
@@ -0,0 +1,54 @@
+import os
+import time
+
+import pytest
+from sqlalchemy import select, text
+
+from app.config import SYNC_TOMBSTONE_RETENTION_DAYS
+from app.database.database import SessionLocal
+from app.database.models import DBSyncTombstone
+
+
+@pytest.fixture
+def utc_plus_14():
+    """应用服务器的本地时间比数据库 (SQLite CURRENT_TIMESTAMP = UTC) 快 14 小时"""
+    previous = os.environ.get("TZ")
+    os.environ["TZ"] = "Etc/GMT-14"
+    time.tzset()
+    yield
+    if previous is None:
+        del os.environ["TZ"]
+    else:
+        os.environ["TZ"] = previous
+    time.tzset()
+
+
+def test_tombstone_retention_uses_database_clock(client, admin_headers, utc_plus_14):
+    days = SYNC_TOMBSTONE_RETENTION_DAYS
+    with SessionLocal() as db:
+        db.execute(text(
+            "INSERT INTO sync_tombstones (entity, entity_id, deleted_at) VALUES "
+            f"('faq', -1, datetime('now', '-{days} days', '+2 hours')), "
+            f"('faq', -2, datetime('now', '-{days} days', '-2 hours'))"
+        ))
+        db.commit()
+
+    faq_id = client.post("/faq/", json={"title": "Q", "content": "A"}, headers=admin_headers).json()["id"]
+    assert client.delete(f"/faq/{faq_id}", headers=admin_headers).status_code == 200
+
+    with SessionLocal() as db:
+        kept = set(db.scalars(select(DBSyncTombstone.entity_id).where(DBSyncTombstone.entity == "faq")))
+    # 还在保留期内（差 2 小时）的记录保留，超过保留期的被清理
+    assert -1 in kept
+    assert -2 not in kept
+    assert faq_id in kept
+
+
+def test_sync_delta_reports_deletes(client, admin_headers):
+    token = client.get("/sync").json()["token"]
+    faq_id = client.post("/faq/", json={"title": "Q", "content": "A"}, headers=admin_headers).json()["id"]
+    assert client.delete(f"/faq/{faq_id}", headers=admin_headers).status_code == 200
+
+    delta = client.get("/sync", params={"since": token}).json()
+    assert delta["full"] is False
+    assert {"entity": "faq", "id": faq_id} in [{"entity": d["entity"], "id": d["id"]} for d in delta["deleted"]]
@@ -0,0 +1,72 @@
+import datetime
+import time
+
+from sqlalchemy import insert, update
+
+from app.database.database import SessionLocal
+from app.database.models import DBUser
+from app.models.user import UserPublic
+from app.utils.token_cache import TokenCache, token_cache
+
+
+def _user(token):
+    return UserPublic(loginid="u", token=token)
+
+
+def test_hit_expiry_and_eviction():
+    cache = TokenCache(ttl=0.05, max_entries=2)
+    cache.put("a", _user("a"), None)
+    assert cache.get("a").token == "a"
+    assert cache.peek("missing") is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 0  # peek 不计入命中率
+
+    # token 本身的有效期早于缓存 TTL 时以 token 为准
+    cache.put("expired", _user("expired"), datetime.datetime.now() - datetime.timedelta(seconds=1))
+    assert cache.get("expired") is None
+
+    cache.put("b", _user("b"), None)
+    cache.put("c", _user("c"), None)
+    assert cache.get("a") is None  # 超过 max_entries，淘汰最久未使用的
+    time.sleep(0.06)
+    assert cache.get("c") is None  # 超过 TTL
+
+
+def _queries(response):
+    timing = response.headers.get("server-timing", "")
+    return int(timing.split('desc="')[1].split(" ")[0]) if timing else 0
+
+
+def test_token_lookups_use_cache_and_relogin_revokes(client):
+    with SessionLocal() as db:
+        db.execute(insert(DBUser), [{"loginid": "cacheuser", "password": "pw"}])
+        db.commit()
+
+    def login():
+        response = client.post("/user/login", json={"loginid": "cacheuser", "password": "pw"})
+        assert response.status_code == 200
+        return response.json()["token"]
+
+    def stats(token):
+        return client.get("/system/cache", headers={"Authorization": f"Bearer {token}"})
+
+    first = login()
+    # 登录时预热缓存：之后的认证不查库
+    assert stats(first).status_code == 200 and _queries(stats(first)) == 0
+
+    token_cache.invalidate(first)
+    assert _queries(stats(first)) == 1
+    assert _queries(stats(first)) == 0
+
+    # 重新登录后旧 token 立即失效（缓存和数据库中都不再存在）
+    second = login()
+    assert stats(first).status_code == 401
+    assert stats(second).status_code == 200
+
+    # 数据库中已过期的 token 不会重新进入缓存
+    with SessionLocal() as db:
+        db.execute(update(DBUser).where(DBUser.loginid == "cacheuser")
+                   .values(token_expires_at=datetime.datetime.now() - datetime.timedelta(minutes=1)))
+        db.commit()
+    token_cache.invalidate(second)
+    assert stats(second).status_code == 401
+    assert token_cache.peek(second) is None
@@ -0,0 +1,72 @@
+"""
+每个写接口的数据库往返次数（SQLTimingMiddleware 的 Server-Timing: desc="N queries"）。
+SQLite 支持 RETURNING：新增、修改都是一条语句，不再 commit 后 refresh。
+删除是三条语句：sync_tombstones 的 INSERT ... SELECT、清理超过保留期的 tombstone、DELETE 本身；
+前两条是增量同步 (/sync) 报告删除所需，与删除在同一事务中。
+"""
+import re
+
+from sqlalchemy import delete
+
+from app.database.database import SessionLocal
+from app.database.models import DBSiteConfig
+from app.utils.cache import catalog_cache
+
+WRITE = 1
+DELETE = 3
+
+
+def _queries(response) -> int:
+    match = re.search(r'desc="(\d+) queries"', response.headers.get("server-timing", ""))
+    assert match, response.headers
+    return int(match.group(1))
+
+
+def _call(client, headers, method, url, body=None, expected=WRITE):
+    response = client.request(method, url, json=body, headers=headers)
+    assert response.status_code == 200, response.text
+    assert _queries(response) == expected, f"{method} {url}"
+    return response.json()
+
+
+def test_catalog_writes(client, admin_headers):
+    category = _call(client, admin_headers, "POST", "/categories/", {"name": "RT", "sort_order": 90})
+    _call(client, admin_headers, "PUT", f"/categories/{category['id']}", {"name": "RT2", "sort_order": 90})
+    repair_type = _call(client, admin_headers, "POST", "/categories/repair-types", {"name": "RT", "sort_order": 90})
+    _call(client, admin_headers, "PUT", f"/categories/repair-types/{repair_type['id']}",
+          {"name": "RT2", "sort_order": 90})
+
+    price = {"category_id": category["id"], "repair_type_id": repair_type["id"], "model_name": "RT", "price": 1000}
+    price_id = _call(client, admin_headers, "POST", "/prices/", price)["id"]
+    _call(client, admin_headers, "POST", f"/prices/?price_id={price_id}", {**price, "price": 1100})
+    _call(client, admin_headers, "PUT", f"/prices/{price_id}", {**price, "price": 1200})
+    _call(client, admin_headers, "DELETE", f"/prices/{price_id}", expected=DELETE)
+
+    _call(client, admin_headers, "DELETE", f"/categories/repair-types/{repair_type['id']}", expected=DELETE)
+    _call(client, admin_headers, "DELETE", f"/categories/{category['id']}", expected=DELETE)
+
+
+def test_content_writes(client, admin_headers):
+    faq_id = _call(client, admin_headers, "POST", "/faq/", {"title": "RT", "content": "x"})["id"]
+    _call(client, admin_headers, "PUT", f"/faq/{faq_id}", {"title": "RT2", "content": "x"})
+    _call(client, admin_headers, "DELETE", f"/faq/{faq_id}", expected=DELETE)
+
+    news = {"title": "RT", "content": "x", "publish_date": "2024-01-01"}
+    news_id = _call(client, admin_headers, "POST", "/news/", news)["id"]
+    _call(client, admin_headers, "PUT", f"/news/{news_id}", {**news, "title": "RT2"})
+    _call(client, admin_headers, "DELETE", f"/news/{news_id}", expected=DELETE)
+
+    _call(client, admin_headers, "PUT", "/config/", {"hero_title": "RT", "hero_content": "x"})
+
+
+def test_site_config_initialised_without_refresh(client):
+    with SessionLocal() as db:
+        db.execute(delete(DBSiteConfig))
+        db.commit()
+    catalog_cache.clear()
+
+    # SELECT 未找到 + INSERT ... RETURNING
+    response = client.get("/config/", headers={"Cookie": "test=1"})
+    assert response.status_code == 200
+    assert response.json()["hero_title"] == ""
+    assert _queries(response) == 2